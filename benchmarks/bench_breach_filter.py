@@ -0,0 +1,59 @@
+# Benchmark breach lookups with and without the Bloom filter front tier.
+#
+#     python benchmarks/bench_breach_filter.py --keys 1000000 --lookups 200000
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_strength.bloom import build_filter
+from password_strength.breach_index import BreachIndex, password_digest, write_index
+
+
+# Function to time lookups of precomputed digests
+def _lookups_per_second(index, digests):
+    started = time.perf_counter()
+    for digest in digests:
+        index.count_digest(digest)
+    return len(digests) / (time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark breach lookups with and without the Bloom filter.")
+    parser.add_argument("--keys", type=int, default=1000000, help="hashes in the synthetic corpus")
+    parser.add_argument("--lookups", type=int, default=200000, help="lookups per measurement")
+    parser.add_argument("--bits-per-key", type=float, default=10)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "breaches.idx")
+        digests = sorted(password_digest("breached-%d" % i) for i in range(args.keys))
+        write_index(((digest, 1) for digest in digests), path)
+        build_filter(path, args.bits_per_key)
+
+        misses = [password_digest("unique-%d" % i) for i in range(args.lookups)]
+        hits = [password_digest("breached-%d" % i) for i in range(min(args.lookups, args.keys))]
+
+        with BreachIndex(path, use_filter=False) as index:
+            plain_miss = _lookups_per_second(index, misses)
+            plain_hit = _lookups_per_second(index, hits)
+        with BreachIndex(path) as index:
+            bloom = index.filter
+            filtered_miss = _lookups_per_second(index, misses)
+            filtered_hit = _lookups_per_second(index, hits)
+            false_positives = sum(1 for digest in misses if bloom.might_contain(digest))
+
+        print("corpus: %d hashes, filter: %.1f MiB, k=%d" % (args.keys, bloom.memory_bytes / 2 ** 20, bloom.num_hashes))
+        print("false-positive rate: configured %.4f%%, measured %.4f%%"
+              % (bloom.false_positive_rate * 100, false_positives / len(misses) * 100))
+        print("%-22s %14s %14s" % ("", "index only", "with filter"))
+        print("%-22s %14.0f %14.0f" % ("negative lookups/sec", plain_miss, filtered_miss))
+        print("%-22s %14.0f %14.0f" % ("positive lookups/sec", plain_hit, filtered_hit))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
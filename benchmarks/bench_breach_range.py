@@ -0,0 +1,99 @@
+# Benchmark breach lookups through the k-anonymity range server.
+#
+# Writes a synthetic corpus as partitions, runs the range server in a
+# background thread with --latency-ms added to every response (the round
+# trip to a breach host on another machine), and times a batch of
+# lookups three ways: one at a time on pooled connections with a cold
+# cache, the same passwords again from the partition cache, and the whole
+# batch through count_many with its prefixes fetched concurrently.
+#
+#     python benchmarks/bench_breach_range.py --keys 200000 --lookups 2000 --latency-ms 5
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_strength.breach_index import password_digest
+from password_strength.breach_range import RangeClient
+from password_strength.range_server import RangeServer, write_partitions
+
+
+class _DelayedServer(RangeServer):
+    def __init__(self, directory, latency):
+        super().__init__(directory)
+        self.latency = latency
+
+    async def _respond(self, writer, status, body, keep_alive):
+        await asyncio.sleep(self.latency)
+        await super()._respond(writer, status, body, keep_alive)
+
+
+# Function to run the server on its own event loop thread; returns the
+# loop, the server and the port it listens on
+def _start_server(directory, latency):
+    loop = asyncio.new_event_loop()
+    server = _DelayedServer(directory, latency)
+    listening = loop.run_until_complete(server.start("127.0.0.1", 0))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop, server, listening.sockets[0].getsockname()[1]
+
+
+# Function to stop the server and end its open connections
+async def _stop_server(server):
+    await server.close()
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark breach lookups through the range server.")
+    parser.add_argument("--keys", type=int, default=200000, help="hashes in the synthetic corpus")
+    parser.add_argument("--lookups", type=int, default=2000, help="passwords per batch (half of them breached)")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="delay added to every response")
+    parser.add_argument("--pool-size", type=int, default=8, help="connections the client keeps")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, "partitions")
+        digests = sorted(password_digest("breached-%d" % i) for i in range(args.keys))
+        write_partitions(((digest, 1) for digest in digests), directory)
+        loop, server, port = _start_server(directory, args.latency_ms / 1000)
+        url = "http://127.0.0.1:%d" % port
+
+        passwords = ["breached-%d" % i for i in range(args.lookups // 2)]
+        passwords += ["unique-%d" % i for i in range(args.lookups - len(passwords))]
+        expected = [1] * (args.lookups // 2) + [0] * (args.lookups - args.lookups // 2)
+
+        with RangeClient(url, pool_size=args.pool_size) as client:
+            started = time.perf_counter()
+            counts = [client.count(password) for password in passwords]
+            sequential = time.perf_counter() - started
+            started = time.perf_counter()
+            cached = [client.count(password) for password in passwords]
+            warm = time.perf_counter() - started
+        with RangeClient(url, pool_size=args.pool_size) as client:
+            started = time.perf_counter()
+            concurrent_counts = client.count_many(passwords)
+            concurrent = time.perf_counter() - started
+        asyncio.run_coroutine_threadsafe(_stop_server(server), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+        if not counts == cached == concurrent_counts == expected:
+            print("FAIL: range lookups disagree with the corpus")
+            return 1
+        print("%d lookups, %.1f ms added per response" % (args.lookups, args.latency_ms))
+        for name, elapsed in (("one at a time, cold", sequential), ("one at a time, cached", warm),
+                              ("count_many, cold", concurrent)):
+            print("%-22s %9.1f ms %12.0f lookups/s" % (name, elapsed * 1000, args.lookups / elapsed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
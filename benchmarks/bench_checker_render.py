@@ -0,0 +1,64 @@
+# Server-side time-to-meter for the Streamlit checker.
+#
+# Times what a checker rerun does before its single st.markdown call:
+# evaluate the password, check it for breaches and render the result HTML.
+# Cold runs use passwords the result cache has not seen; warm runs repeat
+# them, as Streamlit reruns do. Exits with status 1 when the cold p99
+# exceeds the budget.
+#
+#     python benchmarks/bench_checker_render.py --budget-ms 50
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from password_strength import breach_cached, evaluate_cached
+from password_strength.estimator import get_dictionaries
+from rendering import checker_html
+
+
+# Function to time one checker render in milliseconds
+def _render_ms(password):
+    started = time.perf_counter()
+    result = evaluate_cached(password)
+    breached, seen_count = breach_cached(password)
+    checker_html(result, breached, seen_count)
+    return (time.perf_counter() - started) * 1000
+
+
+# Function to get the value at a percentile of sorted samples
+def _percentile(samples, percent):
+    return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the checker's server-side time-to-meter.")
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="cold p99 budget in milliseconds")
+    parser.add_argument("--count", type=int, default=1000, help="distinct passwords to render")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    get_dictionaries()
+    rng = random.Random(args.seed)
+    alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
+    passwords = ["".join(rng.choice(alphabet) for _ in range(rng.randrange(4, 33))) for _ in range(args.count)]
+
+    cold = sorted(_render_ms(password) for password in passwords)
+    warm = sorted(_render_ms(password) for password in passwords)
+    for name, samples in (("cold", cold), ("warm", warm)):
+        print("%s: p50 %.3f ms, p99 %.3f ms, max %.3f ms"
+              % (name, _percentile(samples, 50), _percentile(samples, 99), samples[-1]))
+    if _percentile(cold, 99) > args.budget_ms:
+        print("FAIL: cold p99 %.3f ms exceeds budget of %.3f ms" % (_percentile(cold, 99), args.budget_ms))
+        return 1
+    print("OK: within %.3f ms budget" % args.budget_ms)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
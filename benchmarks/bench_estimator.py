@@ -0,0 +1,85 @@
+# Latency budget for the guess-number estimator.
+#
+# Times estimate_guesses on 64-character inputs drawn from several shapes
+# (random printable, dictionary words glued together, digits, keyboard
+# walks) and exits with status 1 when the p99 latency exceeds the budget.
+# Every call is timed once, with the garbage collector off, and the
+# percentiles are taken over all calls of all passes, so the gate sees
+# the latency a caller pays rather than each input's best run.
+#
+#     python benchmarks/bench_estimator.py --budget-ms 1.0
+import argparse
+import gc
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_strength.estimator import estimate_guesses, get_dictionaries
+
+WORDS = ("password", "dragon", "summer", "love", "monkey", "qwerty", "correct", "horse", "battery", "staple")
+LENGTH = 64
+
+
+# Function to generate benchmark inputs of a fixed length
+def _inputs(count, seed):
+    rng = random.Random(seed)
+    shapes = (
+        lambda: "".join(rng.choice(string.printable[:94]) for _ in range(LENGTH)),
+        lambda: "".join(rng.choice(WORDS) + rng.choice("0123456789!@") for _ in range(LENGTH))[:LENGTH],
+        lambda: "".join(rng.choice(string.digits) for _ in range(LENGTH)),
+        lambda: ("1qaz2wsx3edcqwertyasdfgzxcvb" * 3)[:LENGTH],
+        lambda: ("P@ssw0rd" * 8)[:LENGTH],
+    )
+    return [shapes[index % len(shapes)]() for index in range(count)]
+
+
+# Function to get the value at a percentile of sorted samples
+def _percentile(samples, percent):
+    return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the estimator's p99 latency on 64-character inputs.")
+    parser.add_argument("--budget-ms", type=float, default=1.0, help="p99 latency budget in milliseconds")
+    parser.add_argument("--count", type=int, default=5000, help="inputs to time")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over the inputs; every call is a sample")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    get_dictionaries()
+    load_ms = (time.perf_counter() - started) * 1000
+
+    inputs = _inputs(args.count, args.seed)
+    for password in inputs[:100]:
+        estimate_guesses(password)
+
+    samples = []
+    gc.disable()
+    try:
+        for _ in range(args.repeat):
+            for password in inputs:
+                started = time.perf_counter()
+                estimate_guesses(password)
+                samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        gc.enable()
+    samples.sort()
+
+    p50, p99 = _percentile(samples, 50), _percentile(samples, 99)
+    print("dictionary load: %.1f ms" % load_ms)
+    print("estimate_guesses, %d calls on %d chars: p50 %.3f ms, p99 %.3f ms, max %.3f ms"
+          % (len(samples), LENGTH, p50, p99, samples[-1]))
+    if p99 > args.budget_ms:
+        print("FAIL: p99 %.3f ms exceeds budget of %.3f ms" % (p99, args.budget_ms))
+        return 1
+    print("OK: within %.3f ms budget" % args.budget_ms)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# History store throughput and query latency at scale.
+#
+# Records --rows synthetic checks spread over --days days into a fresh
+# database through HistoryStore.record (the path the UI takes), then
+# times the queries reports and the UI run against it: the per-day level
+# distribution over the whole range and over the last week, a session's
+# recent list, forgetting a session, and a retention pass that removes
+# the oldest days. Results are scored once up front so the timings are
+# the store's alone.
+#
+#     python benchmarks/bench_history.py --rows 2000000 --days 365
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_strength.history import HistoryStore
+from password_strength.result import evaluate_compact
+
+SAMPLES = ("password1", "Summer2024!", "qwerty", "correct horse battery staple", "Zx9$kLm2#Qp7", "dragon")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the password history store.")
+    parser.add_argument("--rows", type=int, default=1000000, help="checks to record")
+    parser.add_argument("--days", type=int, default=365, help="days the checks are spread over")
+    parser.add_argument("--sessions", type=int, default=1000, help="sessions the checks come from")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per write transaction")
+    parser.add_argument("--database", help="database path (default: a temporary directory)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    directory = tempfile.TemporaryDirectory() if args.database is None else None
+    path = args.database or os.path.join(directory.name, "history.db")
+    rng = random.Random(args.seed)
+    results = [(password, evaluate_compact(password)) for password in SAMPLES]
+    now = time.time()
+    span = args.days * 86400
+
+    store = HistoryStore(path, batch_size=args.batch_size, max_pending=args.batch_size * 20,
+                         retention_days=None, maintenance_interval=float("inf"))
+    started = time.perf_counter()
+    for index in range(args.rows):
+        password, result = results[index % len(results)]
+        # Block instead of dropping, so every row is written
+        while store.stats()["pending"] >= args.batch_size * 19:
+            time.sleep(0.001)
+        store.record(password + str(index), result, session="s%d" % rng.randrange(args.sessions),
+                     when=now - rng.random() * span)
+    store.flush()
+    elapsed = time.perf_counter() - started
+    stats = store.stats()
+    print("record: %d rows in %.2f s, %.0f rows/s (%d dropped)"
+          % (stats["written"], elapsed, stats["written"] / elapsed, stats["dropped"]))
+    print("database: %.1f MiB" % (os.path.getsize(path) / 1048576))
+
+    today = datetime.date.today()
+    timings = (
+        ("distribution, all days", lambda: store.daily_distribution()),
+        ("distribution, last 7 days", lambda: store.daily_distribution(today - datetime.timedelta(days=6), today)),
+        ("recent, one session", lambda: store.recent("s0")),
+    )
+    for name, query in timings:
+        started = time.perf_counter()
+        query()
+        print("%-26s %9.2f ms" % (name, (time.perf_counter() - started) * 1000))
+
+    started = time.perf_counter()
+    store.forget("s1")
+    store.flush()
+    print("%-26s %9.2f ms" % ("forget, one session", (time.perf_counter() - started) * 1000))
+
+    # Keep all but the oldest tenth of the range
+    store.retention_days = args.days * 0.9
+    started = time.perf_counter()
+    store.maintain()
+    store.flush()
+    print("%-26s %9.2f ms" % ("retention, oldest 10%", (time.perf_counter() - started) * 1000))
+    store.close()
+    if directory is not None:
+        directory.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# Compiled policies against the hand-written default.
+#
+# Compiles the built-in rules from their JSON form (as a policy file would
+# declare them) plus a stricter sample policy, checks the compiled default
+# gives exactly the built-in results, then times both scoring paths over
+# the same passwords: the criteria and score alone, where any per-password
+# interpretation cost would show, and the full compact evaluation. The
+# paths take turns, each timed several times with the garbage collector
+# off and its fastest pass kept, so drift hits them alike. Exits with
+# status 1 when the compiled default is more than --tolerance slower than
+# the built-in path.
+#
+#     python benchmarks/bench_policy.py --tolerance 0.10
+import argparse
+import gc
+import json
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_strength.engine import analyze_password, strength_level_index, strength_percentage
+from password_strength.policy import DEFAULT_CONFIG, compile_policy
+from password_strength.result import evaluate_compact
+
+WORDS = ("password", "dragon", "summer", "love", "monkey", "qwerty", "correct", "horse", "battery", "staple")
+STRICT_POLICY = {
+    "name": "strict",
+    "min_length": 14,
+    "criteria": ["length", "uppercase", "lowercase", "numbers", "special", "no_common"],
+    "special_characters": "!@#$%^&*()-_=+[]{};:'\",.<>/?\\|`~",
+    "levels": [{"below": 60, "name": "Rejected", "color": "#FF0000"},
+               {"below": 85, "name": "Acceptable", "color": "#FFCC00"},
+               {"name": "Good", "color": "#00CC00"}],
+}
+
+
+# Function to generate benchmark inputs of mixed shapes and lengths
+def _inputs(count, seed):
+    rng = random.Random(seed)
+    shapes = (
+        lambda: "".join(rng.choice(string.printable[:94]) for _ in range(rng.randint(6, 24))),
+        lambda: rng.choice(WORDS).capitalize() + str(rng.randint(0, 9999)) + rng.choice("!@#$"),
+        lambda: "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12))),
+        lambda: "qwerty" + str(rng.randint(100, 999)),
+    )
+    return [shapes[index % len(shapes)]() for index in range(count)]
+
+
+# Function to time passes of several functions over every input, taking
+# turns so drift affects them alike; returns each one's fastest pass in
+# microseconds per password
+def _fastest(functions, inputs, repeat):
+    fastest = [None] * len(functions)
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for index, function in enumerate(functions):
+                started = time.perf_counter()
+                for password in inputs:
+                    function(password)
+                elapsed = time.perf_counter() - started
+                if fastest[index] is None or elapsed < fastest[index]:
+                    fastest[index] = elapsed
+    finally:
+        gc.enable()
+    return [elapsed / len(inputs) * 1e6 for elapsed in fastest]
+
+
+# Function to score a password with the hand-written engine functions
+def _builtin_score(password):
+    mask, patterned = analyze_password(password)
+    return strength_level_index(strength_percentage(mask, len(password), patterned))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare compiled policies with the built-in scoring.")
+    parser.add_argument("--count", type=int, default=5000, help="passwords to score")
+    parser.add_argument("--repeat", type=int, default=5, help="timed passes; the fastest is kept")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="largest slowdown of the compiled default allowed, as a fraction")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    default = compile_policy(json.loads(json.dumps(DEFAULT_CONFIG)), "default-from-json")
+    strict = compile_policy(STRICT_POLICY)
+    compile_ms = (time.perf_counter() - started) * 1000 / 2
+
+    inputs = _inputs(args.count, args.seed)
+    for password in inputs:
+        if default.evaluate(password) != evaluate_compact(password).to_dict():
+            print("FAIL: compiled default differs from the built-in result for %r" % password)
+            return 1
+
+    def compiled_score(policy):
+        analyze, percentage, level_index = policy.analyze, policy.percentage, policy.level_index
+
+        def score(password):
+            mask, patterned = analyze(password)
+            return level_index(percentage(mask, len(password), patterned))
+        return score
+
+    rows = (
+        ("score", _builtin_score, compiled_score(default), compiled_score(strict)),
+        ("evaluate", evaluate_compact, default.evaluate_compact, strict.evaluate_compact),
+    )
+    print("compile: %.3f ms per policy" % compile_ms)
+    print("%-9s %12s %12s %12s %8s" % ("", "built-in us", "compiled us", "strict us", "ratio"))
+    worst = 0.0
+    for name, builtin, compiled, stricter in rows:
+        builtin_us, compiled_us, strict_us = _fastest((builtin, compiled, stricter), inputs, args.repeat)
+        ratio = compiled_us / builtin_us
+        worst = max(worst, ratio)
+        print("%-9s %12.2f %12.2f %12.2f %8.3f" % (name, builtin_us, compiled_us, strict_us, ratio))
+
+    if worst > 1 + args.tolerance:
+        print("FAIL: compiled default is %.1f%% slower than built-in (tolerance %.0f%%)"
+              % ((worst - 1) * 100, args.tolerance * 100))
+        return 1
+    print("OK: compiled default within %.0f%% of built-in" % (args.tolerance * 100))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+# Benchmark suite with a regression gate.
+#
+# Runs scoring, generation and breach lookups over synthetic corpora, all
+# drawn from a fixed seed so runs compare like for like:
+#
+#     human      short human-style passwords (words, names, years, walks)
+#     secret64   64-character random secrets like generate_password makes
+#     unicode    mixed-script input (accents, Cyrillic, Greek, CJK, Arabic
+#                digits, emoji)
+#
+# Each case is one function on one corpus at one batch size (the number of
+# items a timed sample handles). It reports items per second at the median
+# sample (steadier than the mean under scheduler noise), p50 and p99
+# latency of a sample, and the peak memory traced while one sample runs
+# (measured on a separate, untimed run, since tracing slows code down).
+#
+# --output saves the results as JSON; --baseline compares them with a saved
+# run and exits with status 1 when any case's throughput dropped, or its
+# p99 latency grew, by more than --threshold, or when a baseline case
+# (within --only) did not run. Baselines are only comparable on the same
+# machine and Python version; the suite warns when those differ.
+#
+#     python benchmarks/bench_suite.py --output baseline.json
+#     python benchmarks/bench_suite.py --baseline baseline.json --threshold 0.2
+#     python benchmarks/bench_suite.py --only evaluate/human --scale 0.2
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_strength.banned import configure_banned_terms
+from password_strength.batch import evaluate_many
+from password_strength.bloom import build_filter
+from password_strength.breach import check_password_breach, configure_breach_index
+from password_strength.breach_index import password_digest, write_index
+from password_strength.engine import SPECIAL_CHARACTERS, evaluate_password_strength
+from password_strength.generator import generate_password, generate_passwords
+
+FORMAT_VERSION = 1
+DEFAULT_THRESHOLD = 0.20
+# Fewest timed samples per case, whatever the scale
+MIN_SAMPLES = 20
+
+WORDS = ("password", "dragon", "summer", "monkey", "shadow", "sunshine", "football", "princess", "charlie",
+         "master", "letmein", "welcome", "freedom", "whatever", "michael", "jessica", "london", "tigger")
+WALKS = ("qwerty", "asdfgh", "1qaz2wsx", "zxcvbn", "qazwsx", "123456", "abc123")
+SCRIPTS = ("éèêüöäßçñå", "абвгдежзийклмнопрст", "αβγδεζηθικλμνξΣ", "日本語漢字文字密码安全", "٠١٢٣٤٥٦٧٨٩",
+           "😀🔒🔑🐉⭐", string.ascii_letters + string.digits)
+SECRET_ALPHABET = string.ascii_letters + string.digits + SPECIAL_CHARACTERS
+
+
+# Function to make a short human-style password
+def _human(rng):
+    shape = rng.randrange(4)
+    word = rng.choice(WORDS)
+    if shape == 0:
+        return word.capitalize() + str(rng.randint(0, 99))
+    if shape == 1:
+        return word + str(rng.randint(1950, 2025)) + rng.choice("!@#$")
+    if shape == 2:
+        return rng.choice(WALKS) + word[:rng.randint(2, 5)]
+    return "".join(rng.choice(string.ascii_lowercase + string.digits) for _ in range(rng.randint(6, 12)))
+
+
+# Function to make a 64-character random secret
+def _secret64(rng):
+    return "".join(rng.choice(SECRET_ALPHABET) for _ in range(64))
+
+
+# Function to make a mixed-script password
+def _unicode(rng):
+    return "".join(rng.choice(rng.choice(SCRIPTS)) for _ in range(rng.randint(8, 24)))
+
+
+CORPORA = {"human": _human, "secret64": _secret64, "unicode": _unicode}
+
+
+# Function to build a corpus of a given size from a fixed seed
+def build_corpus(name, size, seed):
+    rng = random.Random("%s:%d" % (name, seed))
+    return [CORPORA[name](rng) for _ in range(size)]
+
+
+# Function to list the cases as (name, function on a batch, corpus, items
+# per case at scale 1); corpus None means the items are ignored
+def _cases(breach_corpus):
+    evaluate = lambda batch: [evaluate_password_strength(password) for password in batch]
+    cases = []
+    for corpus in CORPORA:
+        items = 200 if corpus == "secret64" else 2000
+        for batch_size in (1, 100):
+            cases.append(("evaluate/%s/%d" % (corpus, batch_size), evaluate, corpus, batch_size, items))
+        for batch_size in (100, 10000):
+            cases.append(("evaluate_many/%s/%d" % (corpus, batch_size), evaluate_many, corpus, batch_size,
+                          20 * batch_size))
+    for length in (16, 64):
+        cases.append(("generate/%d/1" % length, lambda batch, length=length: generate_password(length),
+                      None, 1, 5000))
+        cases.append(("generate/%d/1000" % length,
+                      lambda batch, length=length: list(generate_passwords(len(batch), length=length)),
+                      None, 1000, 50000))
+    check = lambda batch: [check_password_breach(password) for password in batch]
+    for corpus in ("human",) + tuple(breach_corpus):
+        label = corpus if corpus == "human" else "index-" + corpus
+        for batch_size in (1, 1000):
+            cases.append(("breach/%s/%d" % (label, batch_size), check, corpus, batch_size, 20000))
+    return cases
+
+
+# Function to get the value at a percentile of sorted samples
+def _percentile(samples, percent):
+    return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+
+# Function to time one case, returning its result record
+def run_case(function, items, batch_size, samples):
+    batches = [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
+    # Warm-up: first-call setup (dictionaries, tables) is not what is measured
+    for batch in batches[:3]:
+        function(batch)
+
+    timings = []
+    gc.collect()
+    gc.disable()
+    try:
+        for index in range(samples):
+            batch = batches[index % len(batches)]
+            started = time.perf_counter()
+            function(batch)
+            timings.append(time.perf_counter() - started)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    try:
+        function(batches[0])
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    p50 = _percentile(timings, 50)
+    return {
+        "batch_size": batch_size,
+        "samples": samples,
+        "ops_per_sec": batch_size / p50 if p50 else None,
+        "p50_ms": p50 * 1000,
+        "p99_ms": _percentile(timings, 99) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+# Function to describe the machine and interpreter a run was made on
+def _environment():
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy_version,
+    }
+
+
+# Function to build a synthetic breach index; returns the passwords it holds
+def _breach_index(directory, keys, seed):
+    rng = random.Random("breach:%d" % seed)
+    passwords = ["breached-%d-%d" % (index, rng.randrange(1 << 30)) for index in range(keys)]
+    path = os.path.join(directory, "breaches.idx")
+    write_index(((digest, 1) for digest in sorted(set(map(password_digest, passwords)))), path)
+    build_filter(path)
+    return path, passwords
+
+
+# Function to compare a run with a baseline; returns the regressions as
+# "case (reason)": throughput or p99 latency worse than the threshold, or
+# a baseline case matching only that did not run
+def compare(results, baseline, threshold, only=()):
+    if baseline.get("version") != FORMAT_VERSION:
+        raise ValueError("baseline has format version %r, expected %d" % (baseline.get("version"), FORMAT_VERSION))
+    for key in ("python", "implementation", "machine"):
+        if baseline["environment"].get(key) != results["environment"].get(key):
+            print("warning: baseline %s is %r, this run %r" % (
+                key, baseline["environment"].get(key), results["environment"].get(key)))
+
+    regressions = []
+    print("\n%-28s %14s %14s %9s %10s %10s %9s %11s" % (
+        "case", "ops/sec", "baseline", "change", "p99 ms", "baseline", "change", "peak KiB"))
+    for name, result in results["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is None or result.get("ops_per_sec") is None or not base.get("ops_per_sec"):
+            print("%-28s %14s %14s %9s" % (name, "-" if result.get("ops_per_sec") is None
+                                           else "%.0f" % result["ops_per_sec"], "-", "new"))
+            continue
+        flags = ""
+        if base["ops_per_sec"] / result["ops_per_sec"] - 1 > threshold:
+            regressions.append("%s (throughput)" % name)
+            flags += "  REGRESSION"
+        if base.get("p99_ms") and result["p99_ms"] / base["p99_ms"] - 1 > threshold:
+            regressions.append("%s (p99)" % name)
+            flags += "  P99 REGRESSION"
+        print("%-28s %14.0f %14.0f %+8.1f%% %10.3f %10.3f %+8.1f%% %5.0f/%-5.0f%s" % (
+            name, result["ops_per_sec"], base["ops_per_sec"], (result["ops_per_sec"] / base["ops_per_sec"] - 1) * 100,
+            result["p99_ms"], base.get("p99_ms", 0.0),
+            (result["p99_ms"] / base["p99_ms"] - 1) * 100 if base.get("p99_ms") else 0.0,
+            result["peak_kib"], base["peak_kib"], flags))
+    skipped = 0
+    for name in baseline["cases"]:
+        if name in results["cases"]:
+            continue
+        if only and not any(part in name for part in only):
+            skipped += 1
+            continue
+        regressions.append("%s (not run)" % name)
+        print("%-28s %14s %14.0f %9s  MISSING" % (name, "-", baseline["cases"][name].get("ops_per_sec") or 0, ""))
+    if skipped:
+        print("(%d baseline case%s left out by --only)" % (skipped, "" if skipped == 1 else "s"))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark scoring, generation and breach lookups.")
+    parser.add_argument("--output", default=None, help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="JSON results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="largest throughput drop or p99 growth allowed against the baseline, as a fraction")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the items timed per case")
+    parser.add_argument("--only", action="append", default=[],
+                        help="run only cases whose name contains this (repeatable)")
+    parser.add_argument("--breach-keys", type=int, default=200000, help="hashes in the synthetic breach index")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+
+    # Built-in dictionaries only, whatever the environment configures
+    configure_banned_terms(None)
+    configure_breach_index(None)
+
+    corpora = {}
+    results = {
+        "version": FORMAT_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "settings": {"scale": args.scale, "seed": args.seed, "breach_keys": args.breach_keys},
+        "cases": {},
+    }
+    print("%-28s %14s %10s %10s %10s" % ("case", "ops/sec", "p50 ms", "p99 ms", "peak KiB"))
+    with tempfile.TemporaryDirectory() as directory:
+        index_path, breached = _breach_index(directory, args.breach_keys, args.seed)
+        rng = random.Random("lookups:%d" % args.seed)
+        corpora["hit"] = [rng.choice(breached) for _ in range(20000)]
+        corpora["miss"] = ["unique-%d-%d" % (index, rng.randrange(1 << 30)) for index in range(20000)]
+
+        for name, function, corpus, batch_size, items in _cases(("hit", "miss")):
+            if args.only and not any(part in name for part in args.only):
+                continue
+            count = max(MIN_SAMPLES * batch_size, int(items * args.scale))
+            samples = max(MIN_SAMPLES, count // batch_size)
+            if corpus is None:
+                data = [None] * min(count, 10000)
+            else:
+                if corpus not in corpora:
+                    corpora[corpus] = build_corpus(corpus, 20000, args.seed)
+                data = corpora[corpus]
+            # Breach cases against the index run with it configured, the rest without
+            configure_breach_index(index_path if name.startswith("breach/index-") else None)
+            try:
+                result = run_case(function, data, batch_size, samples)
+            except ImportError as error:
+                print("%-28s skipped: %s" % (name, error))
+                continue
+            results["cases"][name] = result
+            print("%-28s %14.0f %10.3f %10.3f %10.1f" % (
+                name, result["ops_per_sec"], result["p50_ms"], result["p99_ms"], result["peak_kib"]))
+        configure_breach_index(None)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+            handle.write("\n")
+        print("\nresults written to %s" % args.output)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold, args.only)
+        if regressions:
+            print("\nFAIL: %d regression%s against the baseline (threshold %.0f%%): %s" % (
+                len(regressions), "" if len(regressions) == 1 else "s", args.threshold * 100,
+                ", ".join(regressions)))
+            return 1
+        print("\nOK: every baseline case ran, none slower or with a p99 higher than baseline by more than %.0f%%"
+              % (args.threshold * 100))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
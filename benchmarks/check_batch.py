@@ -0,0 +1,88 @@
+# Regression check for vectorized batch scoring.
+#
+# Scores the same passwords with evaluate_many and one at a time with
+# analyze_password and strength_percentage, and requires every array to
+# agree element for element: criteria mask, length, pattern penalty,
+# percentage and level. The inputs mix random printable text, banned
+# words with leetspeak and capitals, sequences and keyboard walks, and
+# Unicode, and go through a list, a NumPy "U" array and UTF-8 "S" bytes,
+# with a small chunk size so chunk boundaries are crossed. Exits with
+# status 1 on the first mismatch. Needs NumPy.
+#
+#     python benchmarks/check_batch.py --count 100000
+import argparse
+import os
+import random
+import string
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_strength.batch import evaluate_many
+from password_strength.engine import (
+    MAX_PATTERN_PENALTY,
+    PATTERN_PENALTY_PER_CHAR,
+    analyze_password,
+    strength_level_index,
+    strength_percentage,
+)
+
+WORDS = ("password", "dragon", "summer", "monkey", "qwerty", "admin", "letmein", "football")
+LEET = {"a": "4", "e": "3", "i": "1", "o": "0", "s": "$"}
+UNICODE_CHARACTERS = "éÉßçÇñÑöÖ٣٤٥५६７８ΣσЖж€£¿¡–💪"
+
+
+# Function to generate passwords of mixed shapes
+def _inputs(count, seed):
+    rng = random.Random(seed)
+    shapes = (
+        lambda: "".join(rng.choice(string.printable[:94]) for _ in range(rng.randint(0, 24))),
+        lambda: "".join(LEET.get(char, char) if rng.random() < 0.4 else char.upper() if rng.random() < 0.2 else char
+                        for char in rng.choice(WORDS)) + str(rng.randint(0, 999)),
+        lambda: rng.choice(("abcdef", "98765", "qwertyui", "asdfgh", "zzzz", "1qaz2wsx"))[:rng.randint(2, 8)]
+        + rng.choice(string.ascii_letters),
+        lambda: "".join(rng.choice(UNICODE_CHARACTERS + string.ascii_letters) for _ in range(rng.randint(1, 16))),
+    )
+    return [shapes[index % len(shapes)]() for index in range(count)]
+
+
+# Function to compare a batch result with scalar scoring; returns the
+# first password that differs, or None
+def _first_mismatch(passwords, batch):
+    for index, password in enumerate(passwords):
+        mask, patterned = analyze_password(password)
+        percentage = strength_percentage(mask, len(password), patterned)
+        expected = (mask, len(password), min(MAX_PATTERN_PENALTY, patterned * PATTERN_PENALTY_PER_CHAR),
+                    percentage, strength_level_index(percentage))
+        found = (int(batch["criteria_mask"][index]), int(batch["length"][index]),
+                 int(batch["pattern_penalty"][index]), float(batch["strength_percentage"][index]),
+                 int(batch["level_index"][index]))
+        if found != expected:
+            return password
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check evaluate_many against scalar scoring.")
+    parser.add_argument("--count", type=int, default=20000, help="passwords to check")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="evaluate_many chunk size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    import numpy as np
+    passwords = _inputs(args.count, args.seed)
+    for name, data in (("list", passwords), ("U array", np.array(passwords, dtype=str)),
+                       ("S array", np.array([password.encode("utf-8") for password in passwords]))):
+        password = _first_mismatch(passwords, evaluate_many(data, chunk_size=args.chunk_size))
+        if password is not None:
+            print("FAIL: evaluate_many (%s) differs from scalar scoring for %r" % (name, password))
+            return 1
+    if len(evaluate_many([])["level_index"]):
+        print("FAIL: evaluate_many of no passwords is not empty")
+        return 1
+    print("OK: %d passwords score the same in batch and one at a time" % args.count)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
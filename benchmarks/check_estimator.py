@@ -0,0 +1,143 @@
+# Regression check for the pruned guess-sequence search.
+#
+# most_guessable_sequence prunes its search (matches no cheaper than
+# brute force, gaps only ending where a match starts, coverings bounded
+# by the cheapest completion and dominated match counts). This keeps the
+# unpruned minimization as the reference: every covering of the password
+# by matches and brute-force gaps, for every number of parts, scored as
+# log10(l! * product + MIN_GUESSES_BEFORE_GROWING_SEQUENCE**(l - 1)).
+# Both must give the same score, and the sequence returned must cover the
+# password in order and add up to that score. Passwords come from the
+# real matchers, and match sets are also drawn at random (overlapping
+# spans, guess counts above and below brute force) so the pruning is
+# exercised beyond what the dictionaries produce. Exits with status 1 on
+# the first mismatch.
+#
+#     python benchmarks/check_estimator.py --count 5000
+import argparse
+import math
+import os
+import random
+import string
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_strength.estimator import (
+    BRUTEFORCE_CARDINALITY,
+    MAX_ESTIMATE_LENGTH,
+    MIN_SUBMATCH_GUESSES_MULTI_CHAR,
+    MIN_SUBMATCH_GUESSES_SINGLE_CHAR,
+    GuessMatch,
+    _sequence_guesses_log10,
+    find_matches,
+    most_guessable_sequence,
+)
+
+WORDS = ("password", "dragon", "summer", "love", "monkey", "qwerty", "correct", "horse", "battery", "staple")
+# Scores are sums of logarithms added in different orders
+TOLERANCE = 1e-9
+
+
+# Function to generate passwords of mixed shapes and lengths
+def _inputs(count, seed, max_length):
+    rng = random.Random(seed)
+    shapes = (
+        lambda length: "".join(rng.choice(string.printable[:94]) for _ in range(length)),
+        lambda length: "".join(rng.choice(WORDS) + rng.choice(("", "1", "!", "2024", "19/07/1998"))
+                               for _ in range(length))[:length],
+        lambda length: "".join(rng.choice(string.digits) for _ in range(length)),
+        lambda length: ("1qaz2wsx3edcqwertyasdfgzxcvb" * 4)[rng.randrange(8):][:length],
+        lambda length: ("P@ssw0rd" * 13)[:length],
+    )
+    return [shapes[index % len(shapes)](rng.randint(1, max_length)) for index in range(count)]
+
+
+# Function to draw a random set of overlapping matches over a password
+def _random_matches(rng, length):
+    matches = []
+    for _ in range(rng.randint(0, 3 * length)):
+        start = rng.randrange(length)
+        end = rng.randint(start + 1, min(length, start + 12))
+        guesses_log10 = rng.uniform(0, (end - start) * 1.3)
+        matches.append(GuessMatch("dictionary", start, end, guesses_log10, None))
+    return matches
+
+
+# Function to find the lowest score over every covering, unpruned
+def _reference_score(length, matches):
+    if not length:
+        return 0.0
+    log_cardinality = math.log10(BRUTEFORCE_CARDINALITY)
+    ending_at = [[] for _ in range(length + 1)]
+    for match in matches:
+        span = match.end - match.start
+        guesses_log10 = match.guesses_log10
+        if span < length:
+            floor = MIN_SUBMATCH_GUESSES_SINGLE_CHAR if span == 1 else MIN_SUBMATCH_GUESSES_MULTI_CHAR
+            guesses_log10 = max(guesses_log10, math.log10(floor))
+        ending_at[match.end].append((match.start, guesses_log10))
+
+    # by_match[k] / by_gap[k] map a part count to the lowest log product
+    # covering password[:k] with the last part a match / a brute-force
+    # gap; two gaps never follow each other, they would be one gap
+    by_match = [{} for _ in range(length + 1)]
+    by_gap = [{} for _ in range(length + 1)]
+    by_match[0][0] = 0.0
+    for end in range(1, length + 1):
+        for start, guesses_log10 in ending_at[end]:
+            for before in (by_match[start], by_gap[start]):
+                for count, log_product in before.items():
+                    value = log_product + guesses_log10
+                    if value < by_match[end].get(count + 1, math.inf):
+                        by_match[end][count + 1] = value
+        for start in range(end):
+            for count, log_product in by_match[start].items():
+                value = log_product + (end - start) * log_cardinality
+                if value < by_gap[end].get(count + 1, math.inf):
+                    by_gap[end][count + 1] = value
+    return min(_sequence_guesses_log10(log_product, count)
+               for last in (by_match[length], by_gap[length]) for count, log_product in last.items())
+
+
+# Function to check one search against the reference; returns a reason
+# for the mismatch, or None
+def _mismatch(password, matches):
+    score, sequence = most_guessable_sequence(password, matches)
+    expected = _reference_score(len(password), find_matches(password) if matches is None else matches)
+    if abs(score - expected) > TOLERANCE:
+        return "score %.12f, unpruned %.12f" % (score, expected)
+    position = 0
+    for match in sequence:
+        if match.start != position or match.end <= match.start:
+            return "sequence does not cover the password in order"
+        position = match.end
+    if position != len(password):
+        return "sequence stops at %d of %d" % (position, len(password))
+    if sequence and abs(_sequence_guesses_log10(sum(match.guesses_log10 for match in sequence), len(sequence))
+                        - score) > TOLERANCE:
+        return "sequence does not add up to its score"
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the pruned sequence search against an unpruned one.")
+    parser.add_argument("--count", type=int, default=2000, help="passwords and random match sets to check")
+    parser.add_argument("--max-length", type=int, default=40, help="longest input (the reference is cubic)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    max_length = min(args.max_length, MAX_ESTIMATE_LENGTH)
+    rng = random.Random(args.seed)
+    for password in _inputs(args.count, args.seed, max_length):
+        for matches in (None, _random_matches(rng, len(password))):
+            reason = _mismatch(password, matches)
+            if reason is not None:
+                print("FAIL: %r (%s matches): %s" % (password, "real" if matches is None else "random", reason))
+                return 1
+    print("OK: %d passwords, real and random matches, scored as the unpruned search scores them" % args.count)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
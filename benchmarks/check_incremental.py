@@ -0,0 +1,84 @@
+# Regression check for the incremental evaluator.
+#
+# Replays random editing sessions through one IncrementalEvaluator:
+# typing a character, backspacing, pasting text, and editing or replacing
+# part of the password through update. After every step the evaluator's
+# mask, patterned count and percentage must be exactly what
+# analyze_password and strength_percentage give for the whole password,
+# and every so often result() must equal evaluate_password_strength. The
+# typed text mixes banned words, leetspeak, sequences, repeats, keyboard
+# walks and Unicode (including the capital sigma whose lowercase depends
+# on context). Exits with status 1 on the first mismatch.
+#
+#     python benchmarks/check_incremental.py --sessions 2000
+import argparse
+import os
+import random
+import string
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_strength.engine import analyze_password, evaluate_password_strength, strength_percentage
+from password_strength.incremental import IncrementalEvaluator
+
+PIECES = ("password", "P@ssw0rd", "dragon", "qwerty", "letmein", "abcdef", "9876", "aaaa", "1qaz2wsx",
+          "asdfgh", "zxcvbn", "ΣΟΦΙΑ", "όσος", "Straße", "٣٤٥", "７８９", "!!", "2024")
+ALPHABET = string.ascii_letters + string.digits + "!@#$%^&*()-_ " + "éßΣσЖ€💪"
+
+
+# Function to pick the next edit of a session as a new password value
+def _edit(rng, password):
+    action = rng.random()
+    if action < 0.45:
+        return password + rng.choice(ALPHABET)
+    if action < 0.65:
+        return password + rng.choice(PIECES)
+    if action < 0.8:
+        return password[:-rng.randint(1, 3)]
+    if not password:
+        return rng.choice(PIECES)
+    start = rng.randrange(len(password))
+    end = rng.randint(start, len(password))
+    return password[:start] + rng.choice(("", rng.choice(ALPHABET), rng.choice(PIECES))) + password[end:]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the incremental evaluator against full re-evaluation.")
+    parser.add_argument("--sessions", type=int, default=500, help="editing sessions to replay")
+    parser.add_argument("--steps", type=int, default=40, help="edits per session")
+    parser.add_argument("--result-every", type=int, default=10, help="compare result() every this many edits")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    edits = 0
+    for _ in range(args.sessions):
+        evaluator = IncrementalEvaluator()
+        password = ""
+        for _ in range(args.steps):
+            password = _edit(rng, password)
+            # Single characters go through append and truncate, as a meter
+            # would drive them; anything else through update
+            if len(password) == len(evaluator) + 1 and password.startswith(evaluator.password):
+                evaluator.append(password[-1])
+            elif evaluator.password.startswith(password):
+                evaluator.truncate(len(password))
+            else:
+                evaluator.update(password)
+            edits += 1
+
+            mask, patterned = analyze_password(password)
+            if (evaluator.password != password or evaluator.mask != mask or evaluator.patterned != patterned
+                    or evaluator.percentage != strength_percentage(mask, len(password), patterned)):
+                print("FAIL: incremental state differs from full evaluation for %r" % password)
+                return 1
+            if edits % args.result_every == 0 and evaluator.result() != evaluate_password_strength(password):
+                print("FAIL: incremental result() differs from evaluate_password_strength for %r" % password)
+                return 1
+    print("OK: %d edits over %d sessions matched full re-evaluation" % (edits, args.sessions))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
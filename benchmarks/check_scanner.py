@@ -0,0 +1,104 @@
+# Regression check for the single-pass character-class scanner.
+#
+# The scanner replaced one regex search per criterion. This keeps those
+# regexes ([A-Z], [a-z], \d, the special-character class and the length
+# test) and the original score formula (share of criteria met, length
+# bonus, variety bonus) as the reference. It scores random ASCII and
+# Unicode passwords both ways: the scanner's criteria must match the
+# regexes bit for bit, and evaluate_password_strength must give the
+# reference percentage and level. The no_common and no_sequential
+# criteria, and the pattern penalty, come from later matchers with their
+# own checks, so they are taken from analyze_password. Exits with status
+# 1 on the first mismatch.
+#
+#     python benchmarks/check_scanner.py --count 200000
+import argparse
+import os
+import random
+import re
+import string
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_strength.engine import (
+    CRITERIA,
+    LENGTH,
+    LOWERCASE,
+    MAX_PATTERN_PENALTY,
+    NO_COMMON,
+    NO_SEQUENTIAL,
+    NUMBERS,
+    PATTERN_PENALTY_PER_CHAR,
+    SPECIAL,
+    STRENGTH_LEVELS,
+    UPPERCASE,
+    analyze_password,
+    character_classes,
+    evaluate_password_strength,
+)
+
+# The per-criterion regexes the scanner replaced
+REFERENCE_CLASSES = (
+    (UPPERCASE, re.compile(r'[A-Z]')),
+    (LOWERCASE, re.compile(r'[a-z]')),
+    (NUMBERS, re.compile(r'\d')),
+    (SPECIAL, re.compile(r'[!@#$%^&*(),.?":{}|<>]')),
+)
+# Non-ASCII letters, digits (Arabic-Indic, Devanagari, fullwidth), accented
+# capitals and symbols that look like special characters but are not
+UNICODE_CHARACTERS = "éÉßçÇñÑöÖ٣٤٥५६７８ΣσЖж€£¿¡–—“”　💪"
+
+
+# Function to generate passwords of mixed alphabets and lengths
+def _inputs(count, seed):
+    rng = random.Random(seed)
+    alphabets = (string.printable, string.ascii_letters + string.digits,
+                 string.printable[:94] + UNICODE_CHARACTERS, UNICODE_CHARACTERS + string.digits)
+    return ["".join(rng.choice(alphabets[index % len(alphabets)]) for _ in range(rng.randint(0, 24)))
+            for index in range(count)]
+
+
+# Function to score a password the way the regex chain did, given the
+# no_common and no_sequential bits and patterned count from the matchers
+def _reference(password, matcher_bits, patterned):
+    mask = matcher_bits
+    if len(password) >= 8:
+        mask |= LENGTH
+    for bit, pattern in REFERENCE_CLASSES:
+        if pattern.search(password):
+            mask |= bit
+    met = bin(mask).count("1")
+    base_score = (met / len(CRITERIA)) * 100
+    length_bonus = min(20, (len(password) - 8) * 2) if len(password) > 8 else 0
+    variety_bonus = 10 if all(mask & bit for bit, _ in REFERENCE_CLASSES) else 0
+    pattern_penalty = min(MAX_PATTERN_PENALTY, patterned * PATTERN_PENALTY_PER_CHAR)
+    percentage = max(0, min(100, base_score + length_bonus + variety_bonus - pattern_penalty))
+    for bound, name, _ in STRENGTH_LEVELS:
+        if bound is None or percentage < bound:
+            return mask, percentage, name
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the character-class scanner against the regex criteria.")
+    parser.add_argument("--count", type=int, default=50000, help="passwords to check")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    class_bits = UPPERCASE | LOWERCASE | NUMBERS | SPECIAL
+    for password in _inputs(args.count, args.seed):
+        mask, patterned = analyze_password(password)
+        expected_mask, expected_percentage, expected_level = _reference(
+            password, mask & (NO_COMMON | NO_SEQUENTIAL), patterned)
+        result = evaluate_password_strength(password)
+        if (character_classes(password) != expected_mask & class_bits or mask != expected_mask
+                or result["strength_percentage"] != expected_percentage
+                or result["strength_level"]["name"] != expected_level):
+            print("FAIL: scanner differs from the regex criteria for %r" % password)
+            return 1
+    print("OK: %d passwords scored as the regex criteria score them" % args.count)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
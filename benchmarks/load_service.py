@@ -0,0 +1,162 @@
+# Load generator for the JSON scoring service.
+#
+# Opens a number of keep-alive connections, each sending requests back to
+# back for a fixed duration, and reports throughput and latency
+# percentiles. Overloaded (503) responses are counted separately. With
+# --spawn it starts the service itself on a free local port.
+#
+#     python benchmarks/load_service.py --spawn --workers 4 --connections 64 --duration 10
+#     python benchmarks/load_service.py --port 8080 --endpoint evaluate/batch --batch 100
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import string
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = ("evaluate", "evaluate/batch", "breach", "generate")
+
+
+# Function to make a pool of varied request bodies for an endpoint
+def _bodies(endpoint, batch, seed, count=256):
+    rng = random.Random(seed)
+    words = ("password", "dragon", "summer", "monkey", "qwerty", "letmein", "sunshine")
+
+    def password():
+        if rng.random() < 0.5:
+            return rng.choice(words) + str(rng.randrange(10000))
+        return "".join(rng.choice(string.ascii_letters + string.digits + "!@#$") for _ in range(rng.randrange(8, 24)))
+
+    bodies = []
+    for _ in range(count):
+        if endpoint == "evaluate/batch":
+            body = {"passwords": [password() for _ in range(batch)]}
+        elif endpoint == "generate":
+            body = {"count": batch, "length": 16}
+        else:
+            body = {"password": password()}
+        bodies.append(json.dumps(body).encode("utf-8"))
+    return bodies
+
+
+# Function to send one request on an open connection and read the response status
+async def _request(reader, writer, host, path, body):
+    writer.write(b"POST %s HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                 % (path.encode("ascii"), host.encode("ascii"), len(body)) + body)
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+# Function to keep one connection busy until the deadline
+async def _client(host, port, path, bodies, deadline, latencies, counts):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        index = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status = await _request(reader, writer, host, path, bodies[index % len(bodies)])
+            elapsed = time.perf_counter() - started
+            index += 1
+            if status == 200:
+                latencies.append(elapsed * 1000)
+            else:
+                counts[status] = counts.get(status, 0) + 1
+                if status == 503:
+                    await asyncio.sleep(0.01)
+    finally:
+        writer.close()
+
+
+# Function to drive all connections and gather their samples
+async def _run(host, port, endpoint, connections, duration, bodies):
+    latencies = []
+    counts = {}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(_client(host, port, "/" + endpoint, bodies, deadline, latencies, counts)
+                           for _ in range(connections)))
+    return latencies, counts, time.perf_counter() - started
+
+
+# Function to wait until a freshly spawned service accepts connections
+def _wait_for_port(host, port, process, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("service exited with status %d" % process.returncode)
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("service did not start within %.0fs" % timeout)
+
+
+# Function to get the value at a percentile of sorted samples
+def _percentile(samples, percent):
+    return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the scoring service's throughput and latency.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="evaluate")
+    parser.add_argument("--connections", type=int, default=32, help="concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--batch", type=int, default=50, help="passwords per batch or generate request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn", action="store_true", help="start the service on a free port first")
+    parser.add_argument("--workers", type=int, default=None, help="service worker processes with --spawn")
+    args = parser.parse_args(argv)
+
+    process = None
+    if args.spawn:
+        with socket.socket() as probe:
+            probe.bind((args.host, 0))
+            args.port = probe.getsockname()[1]
+        command = [sys.executable, "-m", "password_strength.service", "--host", args.host, "--port", str(args.port)]
+        if args.workers:
+            command += ["--workers", str(args.workers)]
+        process = subprocess.Popen(command, cwd=ROOT)
+        _wait_for_port(args.host, args.port, process)
+
+    try:
+        bodies = _bodies(args.endpoint, args.batch, args.seed)
+        latencies, counts, elapsed = asyncio.run(
+            _run(args.host, args.port, args.endpoint, args.connections, args.duration, bodies))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    latencies.sort()
+    if not latencies:
+        print("no successful requests; errors: %s" % counts)
+        return 1
+    per_request = args.batch if args.endpoint in ("evaluate/batch", "generate") else 1
+    print("%s: %d requests over %d connections in %.1fs" % (args.endpoint, len(latencies), args.connections, elapsed))
+    print("throughput: %.0f requests/s, %.0f passwords/s"
+          % (len(latencies) / elapsed, len(latencies) * per_request / elapsed))
+    print("latency: p50 %.2f ms, p90 %.2f ms, p99 %.2f ms, max %.2f ms" % (
+        _percentile(latencies, 50), _percentile(latencies, 90), _percentile(latencies, 99), latencies[-1]))
+    if counts:
+        print("non-200 responses: %s" % ", ".join("%d x %d" % (count, status) for status, count in sorted(counts.items())))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
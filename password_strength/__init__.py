@@ -0,0 +1,73 @@
+# Headless password scoring core.
+# Pure standard library so batch jobs, services and CLIs can import it
+# without pulling in Streamlit or triggering any UI side effects.
+from .engine import evaluate_password_strength
+from .incremental import IncrementalEvaluator
+from .result import PasswordResult, ResultColumns, evaluate_compact
+from .policy import CompiledPolicy, configure_policies, evaluate_with_policy, get_policy, load_policy
+from .generator import generate_password, generate_passwords, write_passwords
+from .breach import breach_count, breach_counts, check_password_breach, check_password_breaches, configure_breach_index
+from .banned import configure_banned_terms
+from .batch import evaluate_many
+from .cache import breach_cached, cache_stats, configure_result_cache, evaluate_cached
+from .estimator import ATTACK_MODELS, estimate_guesses
+from .metrics import configure_metrics
+from .passphrase import (
+    check_passphrase_settings,
+    generate_passphrase,
+    generate_passphrases,
+    passphrase_entropy,
+    write_passphrases,
+)
+from .wordlist import configure_wordlist
+
+# History pulls in sqlite3 and its writer thread machinery, which scoring
+# never needs, so its names are imported on first use
+_HISTORY_NAMES = ("HistoryStore", "configure_history", "get_history_store")
+
+
+# Function to import the history names on first access
+def __getattr__(name):
+    if name in _HISTORY_NAMES:
+        from . import history
+        return getattr(history, name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+__all__ = [
+    "evaluate_password_strength",
+    "IncrementalEvaluator",
+    "evaluate_compact",
+    "PasswordResult",
+    "ResultColumns",
+    "CompiledPolicy",
+    "configure_policies",
+    "evaluate_with_policy",
+    "get_policy",
+    "load_policy",
+    "generate_password",
+    "generate_passwords",
+    "write_passwords",
+    "generate_passphrase",
+    "generate_passphrases",
+    "passphrase_entropy",
+    "check_passphrase_settings",
+    "write_passphrases",
+    "configure_wordlist",
+    "check_password_breach",
+    "breach_count",
+    "check_password_breaches",
+    "breach_counts",
+    "configure_breach_index",
+    "configure_banned_terms",
+    "evaluate_many",
+    "evaluate_cached",
+    "breach_cached",
+    "configure_result_cache",
+    "cache_stats",
+    "HistoryStore",
+    "configure_history",
+    "get_history_store",
+    "configure_metrics",
+    "estimate_guesses",
+    "ATTACK_MODELS",
+]
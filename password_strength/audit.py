@@ -0,0 +1,277 @@
+# Command-line bulk audit of password files.
+#
+# Passwords are streamed from a text file (one per line) or a CSV column,
+# grouped into chunks and scored in a pool of worker processes, each running
+# evaluate_password_strength and check_password_breaches (a range server
+# URL as --breach-index gets each chunk's prefixes fetched concurrently)
+# and returning its chunk already serialized as JSONL or CSV, together
+# with partial counts.
+# Results are written in input order with a bounded number of chunks in
+# flight, so memory stays flat however large the input is.
+#
+# --metrics records stage timings in every worker and writes them, merged,
+# as Prometheus text when the audit ends; --profile-dir writes sampled
+# cProfile captures of whole chunks.
+#
+#     python -m password_strength.audit passwords.txt -o results.jsonl
+#     python -m password_strength.audit users.csv --csv-column password -o results.csv --report report.json
+#     python -m password_strength.audit passwords.txt -o /dev/null --metrics audit.prom --profile-dir profiles/
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from . import metrics
+from .banned import configure_banned_terms
+from .breach import check_password_breaches, configure_breach_index
+from .engine import CRITERIA, STRENGTH_LEVELS
+from .result import evaluate_compact
+
+OUTPUT_FORMATS = ("jsonl", "csv")
+DEFAULT_CHUNK_SIZE = 2000
+CSV_FIELDS = ("line", "password", "length", "strength_percentage", "strength_level", "guesses_log10",
+              "breached", "failed_criteria")
+
+LEVEL_NAMES = tuple(name for _, name, _ in STRENGTH_LEVELS)
+CRITERIA_KEYS = tuple(key for key, _, _ in CRITERIA)
+
+
+# Function to set up a worker with the same breach index, banned terms and
+# instrumentation as the parent; profiles is (directory, captures, rate) or None
+def _init_worker(breach_index, banned_terms, record_metrics=False, profiles=None):
+    if breach_index:
+        configure_breach_index(breach_index)
+    if banned_terms:
+        configure_banned_terms(banned_terms)
+    if record_metrics:
+        metrics.configure_metrics()
+    if profiles:
+        directory, captures, rate = profiles
+        metrics.request_profiles(captures, rate, directory)
+
+
+# Function to score one chunk of (line number, password) pairs, returning
+# the serialized rows, the chunk's counts and the metrics recorded
+def _audit_chunk(chunk, output_format, include_passwords):
+    with metrics.stage("audit.chunk", sample=True):
+        result = _score_chunk(chunk, output_format, include_passwords)
+    if metrics.enabled:
+        metrics.count("passwords_total", len(chunk), source="cli")
+    return result + (metrics.drain(),)
+
+
+# Function to serialize and count one chunk
+def _score_chunk(chunk, output_format, include_passwords):
+    level_counts = [0] * len(LEVEL_NAMES)
+    failed_counts = [0] * len(CRITERIA_KEYS)
+    breached_count = 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n") if output_format == "csv" else None
+
+    # Checked together, so a range server gets the chunk's prefixes concurrently
+    chunk_breached = check_password_breaches([password for _, password in chunk])
+    for (line, password), breached in zip(chunk, chunk_breached):
+        result = evaluate_compact(password)
+        level = result.level_name
+        failed = result.failed_criteria()
+
+        level_counts[result.level_index] += 1
+        for key in failed:
+            failed_counts[CRITERIA_KEYS.index(key)] += 1
+        breached_count += breached
+
+        row = {
+            "line": line,
+            "password": password if include_passwords else None,
+            "length": len(password),
+            "strength_percentage": round(result.strength_percentage, 2),
+            "strength_level": level,
+            "guesses_log10": round(result.guesses_log10, 3),
+            "breached": breached,
+            "failed_criteria": failed,
+        }
+        if writer is not None:
+            row["failed_criteria"] = " ".join(failed)
+            writer.writerow([row[field] if row[field] is not None else "" for field in CSV_FIELDS])
+        else:
+            if not include_passwords:
+                del row["password"]
+            buffer.write(json.dumps(row, ensure_ascii=False))
+            buffer.write("\n")
+    return buffer.getvalue(), level_counts, failed_counts, breached_count
+
+
+# Function to stream (line number, password) pairs from a text file or CSV column
+def read_passwords(path, csv_column=None):
+    handle = sys.stdin if path == "-" else open(path, encoding="utf-8", errors="replace", newline="")
+    try:
+        if csv_column is None:
+            for number, line in enumerate(handle, 1):
+                password = line.rstrip("\r\n")
+                if password:
+                    yield number, password
+            return
+
+        reader = csv.reader(handle)
+        header = next(reader, None)
+        if header is None:
+            return
+        if csv_column.isdigit():
+            column = int(csv_column)
+        elif csv_column in header:
+            column = header.index(csv_column)
+        else:
+            raise ValueError("%s has no column named %r" % (path, csv_column))
+        for number, row in enumerate(reader, 2):
+            if column < len(row) and row[column]:
+                yield number, row[column]
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+# Function to group any iterable into lists
+def _chunks(items, chunk_size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Function to audit a stream of (line number, password) pairs, writing rows
+# to output and returning the aggregate report
+def audit_passwords(passwords, output, output_format="jsonl", workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                    include_passwords=False, breach_index=None, banned_terms=None, profiles=None):
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError("output format must be one of %s" % ", ".join(OUTPUT_FORMATS))
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    level_counts = [0] * len(LEVEL_NAMES)
+    failed_counts = [0] * len(CRITERIA_KEYS)
+    totals = {"passwords": 0, "breached": 0}
+    started = time.perf_counter()
+
+    if output_format == "csv":
+        csv.writer(output, lineterminator="\n").writerow(CSV_FIELDS)
+
+    # Function to write one finished chunk and fold in its counts
+    def collect(chunk_result):
+        text, chunk_levels, chunk_failed, chunk_breached, chunk_metrics = chunk_result
+        output.write(text)
+        metrics.merge(chunk_metrics)
+        for index, count in enumerate(chunk_levels):
+            level_counts[index] += count
+        for index, count in enumerate(chunk_failed):
+            failed_counts[index] += count
+        totals["passwords"] += sum(chunk_levels)
+        totals["breached"] += chunk_breached
+
+    chunks = _chunks(passwords, chunk_size)
+    if workers <= 1:
+        _init_worker(breach_index, banned_terms, metrics.enabled, profiles)
+        for chunk in chunks:
+            collect(_audit_chunk(chunk, output_format, include_passwords))
+    else:
+        # Chunks are collected in submission order, with at most two per
+        # worker in flight, so output order matches input order
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(breach_index, banned_terms, metrics.enabled, profiles)) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_audit_chunk, chunk, output_format, include_passwords))
+                if len(pending) >= workers * 2:
+                    collect(pending.popleft().result())
+            while pending:
+                collect(pending.popleft().result())
+
+    elapsed = time.perf_counter() - started
+    total = totals["passwords"]
+    return {
+        "passwords": total,
+        "breached": totals["breached"],
+        "strength_levels": dict(zip(LEVEL_NAMES, level_counts)),
+        "failed_criteria": dict(sorted(zip(CRITERIA_KEYS, failed_counts), key=lambda item: -item[1])),
+        "seconds": round(elapsed, 3),
+        "passwords_per_second": round(total / elapsed, 1) if elapsed else None,
+        "workers": workers,
+    }
+
+
+# Function to print the aggregate report for people
+def format_report(report):
+    total = report["passwords"] or 1
+    lines = ["Audited %d passwords in %.1fs (%.0f/s with %d worker%s)" % (
+        report["passwords"], report["seconds"], report["passwords_per_second"] or 0, report["workers"],
+        "" if report["workers"] == 1 else "s")]
+    lines.append("Breached: %d (%.1f%%)" % (report["breached"], 100 * report["breached"] / total))
+    lines.append("Strength levels:")
+    for name, count in report["strength_levels"].items():
+        lines.append("  %-12s %10d  %5.1f%%" % (name, count, 100 * count / total))
+    lines.append("Top failing criteria:")
+    for key, count in report["failed_criteria"].items():
+        if count:
+            lines.append("  %-14s %10d  %5.1f%%" % (key, count, 100 * count / total))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit a file of passwords for strength and breaches.")
+    parser.add_argument("input", help="password file (one per line) or CSV file, '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="results file (default: stdout)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default=None,
+                        help="results format (default: from the output extension, else jsonl)")
+    parser.add_argument("--csv-column", default=None, help="read passwords from this CSV column (name or index)")
+    parser.add_argument("--report", default=None, help="also write the aggregate report as JSON to this file")
+    parser.add_argument("--include-passwords", action="store_true", help="copy the passwords into the results")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="passwords per worker chunk")
+    parser.add_argument("--breach-index", default=None, help="breach index or range server URL to check against")
+    parser.add_argument("--banned-terms", default=None, help="file of extra banned terms")
+    parser.add_argument("--metrics", default=None, help="write stage timings as Prometheus text to this file")
+    parser.add_argument("--profile-dir", default=None, help="write sampled cProfile captures of chunks here")
+    parser.add_argument("--profile-count", type=int, default=1, help="captures per worker")
+    parser.add_argument("--profile-rate", type=float, default=0.1, help="share of chunks considered for capture")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        metrics.configure_metrics()
+    profiles = None
+    if args.profile_dir:
+        if args.profile_count < 1 or not 0 < args.profile_rate <= 1:
+            parser.error("--profile-count must be at least 1 and --profile-rate in (0, 1]")
+        os.makedirs(args.profile_dir, exist_ok=True)
+        profiles = (args.profile_dir, args.profile_count, args.profile_rate)
+
+    output_format = args.format
+    if output_format is None:
+        output_format = "csv" if args.output.endswith(".csv") else "jsonl"
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        report = audit_passwords(read_passwords(args.input, args.csv_column), output, output_format,
+                                 args.workers, args.chunk_size, args.include_passwords,
+                                 args.breach_index, args.banned_terms, profiles)
+    except ValueError as error:
+        parser.error(str(error))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    if args.metrics:
+        metrics.write_metrics(args.metrics)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+    print(format_report(report), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
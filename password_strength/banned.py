@@ -0,0 +1,401 @@
+# Banned-substring matching for the "no_common" criterion.
+#
+# Terms and passwords are lowercased and leetspeak-normalized the same way
+# (so "p@ssw0rd" matches "password"), then matched with an Aho-Corasick
+# automaton: one pass over the password whatever the dictionary size. Small
+# dictionaries such as the built-in common words use a precompiled regex
+# instead, which runs in C and is faster for a handful of terms.
+#
+# Organisation-specific dictionaries are plain text files with one term per
+# line ("#" starts a comment). The built automaton is cached next to the
+# source as "<terms>.ac" and reused until the source file changes.
+#
+# Everything a loaded matcher holds is array-backed, so loading a large
+# dictionary copies a few buffers instead of building millions of Python
+# objects: terms are one joined string plus an offsets array, and each
+# state's transitions are a run of a code array sorted by code, found with
+# bisect. The root state, where the walk spends most of its time outside
+# a match, is also kept as a small dict.
+import hashlib
+import marshal
+import os
+import re
+from array import array
+from bisect import bisect_left
+from itertools import chain
+
+COMMON_WORDS = ("password", "123456", "qwerty", "admin")
+
+# Environment variable naming a banned-terms file to load on first use
+BANNED_TERMS_ENV = "PASSWORD_BANNED_TERMS"
+
+# Dictionaries up to this size are matched with a regex instead of the automaton
+REGEX_MAX_TERMS = 64
+
+CACHE_SUFFIX = ".ac"
+_CACHE_VERSION = 3
+
+# While building, transitions are keyed by (state << _CHAR_BITS | code point)
+_CHAR_BITS = 21
+# Array type codes of the saved automaton tables: first transition of each
+# state, transition codes and targets, failure links, output term,
+# dictionary links, matching flags
+_TABLE_TYPES = ("i", "i", "i", "i", "i", "i", "B")
+
+# Character substitutions undone before matching
+LEET_TABLE = str.maketrans({
+    "0": "o",
+    "1": "i",
+    "!": "i",
+    "|": "i",
+    "3": "e",
+    "4": "a",
+    "@": "a",
+    "5": "s",
+    "$": "s",
+    "7": "t",
+    "+": "t",
+    "8": "b",
+    "9": "g",
+})
+
+
+# Function to normalize text for banned-term matching
+def normalize(text):
+    return text.lower().translate(LEET_TABLE)
+
+
+# Function to read terms from a dictionary file
+def read_terms(path):
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            term = line.split("#", 1)[0].strip()
+            if term:
+                yield term
+
+
+# Function to rebuild a saved table
+def _array_from_bytes(typecode, data):
+    table = array(typecode)
+    table.frombytes(data)
+    return table
+
+
+class TermList:
+    # Read-only sequence of strings stored as one joined string and the
+    # offset where each starts
+    def __init__(self, text, offsets):
+        self.text = text
+        self.offsets = offsets
+
+    # Function to pack a list of strings
+    @classmethod
+    def from_strings(cls, strings):
+        offsets = array("q", [0])
+        total = 0
+        for string in strings:
+            total += len(string)
+            offsets.append(total)
+        return cls("".join(strings), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.offsets) - 1
+        if not 0 <= index < len(self.offsets) - 1:
+            raise IndexError("term index out of range")
+        return self.text[self.offsets[index]:self.offsets[index + 1]]
+
+    def __iter__(self):
+        text, offsets = self.text, self.offsets
+        for index in range(len(offsets) - 1):
+            yield text[offsets[index]:offsets[index + 1]]
+
+    # Function to get the length of one string without slicing it out
+    def length(self, index):
+        return self.offsets[index + 1] - self.offsets[index]
+
+
+# Function to build the Aho-Corasick tables for normalized terms
+def _build_automaton(terms):
+    transitions = {}
+    children = [[]]
+    output = array("i", [-1])
+    for term_index, term in enumerate(terms):
+        state = 0
+        for code in map(ord, term):
+            key = state << _CHAR_BITS | code
+            next_state = transitions.get(key)
+            if next_state is None:
+                next_state = len(children)
+                transitions[key] = next_state
+                children[state].append((code, next_state))
+                children.append([])
+                output.append(-1)
+            state = next_state
+        output[state] = term_index
+
+    # Breadth-first pass: each state's failure link is the longest proper
+    # suffix that is also a trie path, and its dictionary link is the
+    # nearest state along the failure chain that ends a term
+    fail = array("i", bytes(4 * len(children)))
+    dictionary_link = array("i", [-1]) * len(children)
+    queue = [state for _, state in children[0]]
+    for state in queue:
+        for code, next_state in children[state]:
+            queue.append(next_state)
+            link = fail[state]
+            while link and (link << _CHAR_BITS | code) not in transitions:
+                link = fail[link]
+            link = transitions.get(link << _CHAR_BITS | code, 0) if state else 0
+            fail[next_state] = link
+            dictionary_link[next_state] = link if output[link] >= 0 else dictionary_link[link]
+
+    matching = array("B", [term >= 0 or link >= 0 for term, link in zip(output, dictionary_link)])
+
+    # Each state's transitions as a run sorted by code, the run of state s
+    # being first[s]:first[s + 1]
+    first = array("i", [0])
+    codes = array("i")
+    targets = array("i")
+    for edges in children:
+        edges.sort()
+        codes.extend(code for code, _ in edges)
+        targets.extend(next_state for _, next_state in edges)
+        first.append(len(codes))
+    return first, codes, targets, fail, output, dictionary_link, matching
+
+
+class BannedTermMatcher:
+    # Build a matcher for an iterable of terms; duplicates after
+    # normalization keep the first spelling
+    def __init__(self, terms):
+        kept_terms = []
+        kept_normalized = []
+        seen = set()
+        for term in terms:
+            normalized = normalize(term)
+            if normalized and normalized not in seen:
+                seen.add(normalized)
+                kept_terms.append(term)
+                kept_normalized.append(normalized)
+
+        self.terms = TermList.from_strings(kept_terms)
+        self._normalized = TermList.from_strings(kept_normalized)
+        self._tables = None
+        if len(kept_terms) > REGEX_MAX_TERMS:
+            self._tables = _build_automaton(kept_normalized)
+        self._prepare()
+
+    def __len__(self):
+        return len(self.terms)
+
+    # Function to set up the structures used while matching
+    def _prepare(self):
+        self._regex = None
+        self._root = None
+        if self._tables is not None:
+            (self._first, self._codes, self._targets, self._fail, self._output,
+             self._dictionary_link, self._matching) = self._tables
+            self._root = dict(zip(self._codes[:self._first[1]], self._targets[:self._first[1]]))
+        elif self.terms:
+            pattern = "|".join(map(re.escape, sorted(self._normalized, key=len, reverse=True)))
+            self._regex = re.compile(pattern)
+        # Only the regex needs it, to keep the tail a term could start in
+        self._longest = max(map(len, self._normalized), default=0) if self._regex is not None else 0
+
+    # Function to walk the automaton, yielding every state reached
+    def _states(self, text, state=0):
+        root = self._root
+        first, codes, targets, fail = self._first, self._codes, self._targets, self._fail
+        for code in map(ord, text):
+            while state:
+                low, high = first[state], first[state + 1]
+                index = bisect_left(codes, code, low, high)
+                if index < high and codes[index] == code:
+                    state = targets[index]
+                    break
+                state = fail[state]
+            else:
+                state = root.get(code, 0)
+            yield state
+
+    # Function to tell whether text contains any banned term
+    def search(self, text):
+        text = normalize(text)
+        if self._regex is not None:
+            return self._regex.search(text) is not None
+        if self._root is None:
+            return False
+        matching = self._matching
+        for state in self._states(text):
+            if matching[state]:
+                return True
+        return False
+
+    # Function to match text appended to what was fed before: takes the state
+    # returned by the previous call (None to start) and tells whether the
+    # text fed so far contains a term, provided it did not before this call.
+    # The state is the automaton state, or for the regex the normalized tail
+    # that a term ending in the new text could start in, so each call costs
+    # O(len(text)) whatever was fed before.
+    def advance(self, state, text):
+        text = normalize(text)
+        if self._regex is not None:
+            window = (state or "") + text
+            found = self._regex.search(window) is not None
+            return window[-(self._longest - 1):] if self._longest > 1 else "", found
+        if self._root is None:
+            return state, False
+        found = False
+        matching = self._matching
+        for state in self._states(text, state or 0):
+            found = found or bool(matching[state])
+        return state, found
+
+    # Function to list the banned terms found in text, in order of appearance
+    def matches(self, text):
+        text = normalize(text)
+        if self._root is None:
+            found = [(text.find(normalized), index) for index, normalized in enumerate(self._normalized)]
+            return [self.terms[index] for position, index in sorted(found) if position >= 0]
+
+        found = []
+        seen = set()
+        for state in self._states(text):
+            if not self._matching[state]:
+                continue
+            if self._output[state] < 0:
+                state = self._dictionary_link[state]
+            while state >= 0:
+                term_index = self._output[state]
+                if term_index not in seen:
+                    seen.add(term_index)
+                    found.append(self.terms[term_index])
+                state = self._dictionary_link[state]
+        return found
+
+    # Function to find every occurrence of every term as (start, end, term index)
+    def find_all(self, text):
+        normalized = normalize(text)
+        if len(normalized) != len(text):
+            # Some characters lowercase to several; keep positions aligned
+            normalized = "".join(
+                char.lower() if len(char.lower()) == 1 else char for char in text).translate(LEET_TABLE)
+
+        found = []
+        if self._root is None:
+            for term_index, term in enumerate(self._normalized):
+                start = normalized.find(term)
+                while start >= 0:
+                    found.append((start, start + len(term), term_index))
+                    start = normalized.find(term, start + 1)
+            return found
+
+        # The walk of _states, inlined: every guess estimate runs it twice
+        root = self._root
+        first, codes, targets, fail = self._first, self._codes, self._targets, self._fail
+        matching, output, dictionary_link = self._matching, self._output, self._dictionary_link
+        offsets = self._normalized.offsets
+        state = 0
+        for end, code in enumerate(map(ord, normalized), 1):
+            while state:
+                low, high = first[state], first[state + 1]
+                index = bisect_left(codes, code, low, high)
+                if index < high and codes[index] == code:
+                    state = targets[index]
+                    break
+                state = fail[state]
+            else:
+                state = root.get(code, 0)
+            if not matching[state]:
+                continue
+            term_state = state if output[state] >= 0 else dictionary_link[state]
+            while term_state >= 0:
+                term_index = output[term_state]
+                found.append((end - offsets[term_index + 1] + offsets[term_index], end, term_index))
+                term_state = dictionary_link[term_state]
+        return found
+
+    # Function to save the built tables so they can be reloaded without rebuilding
+    def save(self, path, source_digest=b""):
+        tables = None
+        if self._tables is not None:
+            tables = tuple(table.tobytes() for table in self._tables)
+        tmp_path = os.fspath(path) + ".tmp"
+        with open(tmp_path, "wb") as handle:
+            marshal.dump((_CACHE_VERSION, source_digest, self.terms.text, self.terms.offsets.tobytes(),
+                          self._normalized.text, self._normalized.offsets.tobytes(), tables), handle)
+        os.replace(tmp_path, path)
+
+    # Function to load a matcher saved with save(), or None if it is stale
+    @classmethod
+    def load(cls, path, source_digest=b""):
+        try:
+            with open(path, "rb") as handle:
+                saved = marshal.load(handle)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(saved, tuple) or len(saved) != 7 or saved[:2] != (_CACHE_VERSION, source_digest):
+            return None
+
+        matcher = cls.__new__(cls)
+        _, _, terms_text, terms_offsets, normalized_text, normalized_offsets, tables = saved
+        matcher.terms = TermList(terms_text, _array_from_bytes("q", terms_offsets))
+        matcher._normalized = TermList(normalized_text, _array_from_bytes("q", normalized_offsets))
+        matcher._tables = None
+        if tables is not None:
+            matcher._tables = tuple(_array_from_bytes(typecode, data) for typecode, data in zip(_TABLE_TYPES, tables))
+        matcher._prepare()
+        return matcher
+
+    # Function to load a dictionary file (plus any base terms), reusing its
+    # cached automaton if neither has changed
+    @classmethod
+    def from_file(cls, path, base_terms=(), cache=True):
+        path = os.fspath(path)
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+        digest.update("\0".join(base_terms).encode("utf-8"))
+        source_digest = digest.digest()
+        cache_path = path + CACHE_SUFFIX
+        if cache:
+            matcher = cls.load(cache_path, source_digest)
+            if matcher is not None:
+                return matcher
+
+        matcher = cls(chain(base_terms, read_terms(path)))
+        if cache:
+            try:
+                matcher.save(cache_path, source_digest)
+            except OSError:
+                pass
+        return matcher
+
+
+DEFAULT_MATCHER = BannedTermMatcher(COMMON_WORDS)
+
+_banned_matcher = None
+
+
+# Function to ban a file (or an iterable) of terms on top of the common words
+def configure_banned_terms(source=None):
+    global _banned_matcher
+    if source is None:
+        _banned_matcher = DEFAULT_MATCHER
+    elif isinstance(source, (str, os.PathLike)):
+        _banned_matcher = BannedTermMatcher.from_file(source, COMMON_WORDS)
+    else:
+        _banned_matcher = BannedTermMatcher(chain(COMMON_WORDS, source))
+    return _banned_matcher
+
+
+# Function to get the active banned-terms matcher
+def get_banned_matcher():
+    if _banned_matcher is None:
+        configure_banned_terms(os.environ.get(BANNED_TERMS_ENV) or None)
+    return _banned_matcher
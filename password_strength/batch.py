@@ -0,0 +1,239 @@
+# Vectorized batch scoring.
+# NumPy is an optional dependency: it is only imported when evaluate_many
+# is called, so the rest of the package stays free of third-party imports.
+from itertools import islice
+
+from . import metrics
+from .banned import DEFAULT_MATCHER, LEET_TABLE, get_banned_matcher, normalize
+from .engine import (
+    ALL_CRITERIA,
+    LENGTH,
+    LOWERCASE,
+    MAX_PATTERN_PENALTY,
+    MIN_LENGTH,
+    NO_COMMON,
+    NO_SEQUENTIAL,
+    NUMBERS,
+    PATTERN_PENALTY_PER_CHAR,
+    SPECIAL,
+    SPECIAL_CHARACTERS,
+    STRENGTH_LEVELS,
+    UPPERCASE,
+    VARIETY_MASK,
+    _MASK_SCORES,
+    analyze_password,
+)
+from .patterns import (
+    ADJACENT_KEYS,
+    KEYBOARD_LAYOUTS,
+    MIN_KEYBOARD_LENGTH,
+    MIN_REPEAT_LENGTH,
+    MIN_SEQUENCE_LENGTH,
+    SEQUENCE_CODES,
+)
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+# Function to import NumPy only when batch scoring is actually used
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("evaluate_many requires NumPy (pip install numpy)") from None
+    return numpy
+
+
+# Function to build the ASCII class lookup table
+def _class_table(np):
+    table = np.zeros(128, dtype=np.uint8)
+    for chars, bit in (
+        ("ABCDEFGHIJKLMNOPQRSTUVWXYZ", UPPERCASE),
+        ("abcdefghijklmnopqrstuvwxyz", LOWERCASE),
+        ("0123456789", NUMBERS),
+        (SPECIAL_CHARACTERS, SPECIAL),
+    ):
+        table[[ord(char) for char in chars]] = bit
+    return table
+
+
+# Function to build the lookup table that leetspeak-normalizes lowered ASCII
+def _leet_table(np):
+    table = np.arange(128, dtype=np.uint8)
+    for code, replacement in LEET_TABLE.items():
+        table[code] = ord(replacement)
+    return table
+
+
+# Function to build the ASCII sequence-position table; characters outside
+# the two alphabets get codes spaced so no step between them is +1 or -1
+def _sequence_table(np):
+    table = 1000 + 3 * np.arange(128, dtype=np.int16)
+    for char, code in SEQUENCE_CODES.items():
+        table[ord(char)] = code
+    return table
+
+
+# Function to build one ASCII adjacency matrix per keyboard layout
+def _adjacency_tables(np):
+    tables = np.zeros((len(KEYBOARD_LAYOUTS), 128, 128), dtype=bool)
+    for pair, layouts in ADJACENT_KEYS.items():
+        first, second = map(ord, pair)
+        if first < 128 and second < 128:
+            for layout in range(len(KEYBOARD_LAYOUTS)):
+                tables[layout, first, second] = bool(layouts >> layout & 1)
+    return tables
+
+
+# Function to mark the characters of every run of valid steps that spans
+# at least min_length characters
+def _mark_runs(np, steps, min_length, covered):
+    span = min_length - 1
+    width = steps.shape[1] - span + 1
+    if width <= 0:
+        return
+    windows = steps[:, :width].copy()
+    for offset in range(1, span):
+        windows &= steps[:, offset:offset + width]
+    for offset in range(span + 1):
+        covered[:, offset:offset + width] |= windows
+
+
+# Function to check which rows contain a substring anywhere
+def _contains(np, codes, pattern):
+    width = codes.shape[1] - len(pattern) + 1
+    if width <= 0:
+        return np.zeros(codes.shape[0], dtype=bool)
+    found = codes[:, :width] == ord(pattern[0])
+    for offset, char in enumerate(pattern[1:], 1):
+        found &= codes[:, offset:offset + width] == ord(char)
+    return found.any(axis=1)
+
+
+# Function to turn one chunk of input into a 2-D array of character codes
+def _to_codes(np, chunk):
+    if isinstance(chunk, np.ndarray) and chunk.dtype.kind == "S":
+        array = np.ascontiguousarray(chunk)
+        codes = array.view(np.uint8).reshape(len(array), array.dtype.itemsize)
+    else:
+        array = np.asarray(chunk, dtype=str)
+        if array.dtype.itemsize == 0:
+            array = array.astype("U1")
+        array = np.ascontiguousarray(array)
+        codes = array.view(np.uint32).reshape(len(array), array.dtype.itemsize // 4)
+    return array, codes
+
+
+# Function to get one row of the input back as a str
+def _row_text(value):
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return str(value)
+
+
+# Function to compute criteria masks and lengths for one chunk
+def _chunk_masks(np, chunk, tables, matcher):
+    class_table, leet_table, sequence_table, adjacency_tables = tables
+    array, codes = _to_codes(np, chunk)
+    lengths = np.char.str_len(array).astype(np.int64)
+
+    # Rows with non-ASCII characters need Unicode-aware classification and
+    # lowercasing, so they fall back to the scalar engine
+    non_ascii = (codes >= 128).any(axis=1)
+    ascii_codes = np.where(codes >= 128, 0, codes).astype(np.uint8)
+
+    masks = np.bitwise_or.reduce(class_table[ascii_codes], axis=1).astype(np.uint8)
+    masks[lengths >= MIN_LENGTH] |= LENGTH
+
+    is_upper = (ascii_codes >= 65) & (ascii_codes <= 90)
+    lowered = ascii_codes | (is_upper.astype(np.uint8) << 5)
+
+    # The built-in word list is matched in bulk on normalized codes; a
+    # configured organisation dictionary goes through its automaton per row
+    if matcher is DEFAULT_MATCHER:
+        normalized = leet_table[lowered & 127]
+        common = np.zeros(len(masks), dtype=bool)
+        for term in matcher.terms:
+            common |= _contains(np, normalized, normalize(term))
+    else:
+        common = np.array([matcher.search(_row_text(array[row])) for row in range(len(array))], dtype=bool)
+    masks[~common] |= NO_COMMON
+
+    # Steps between neighbouring characters, marked per pattern kind; padding
+    # is code 0, which never repeats into a valid run or sits next to a key
+    covered = np.zeros(ascii_codes.shape, dtype=bool)
+    sequence = sequence_table[ascii_codes]
+    step = sequence[:, 1:] - sequence[:, :-1]
+    _mark_runs(np, step == 1, MIN_SEQUENCE_LENGTH, covered)
+    _mark_runs(np, step == -1, MIN_SEQUENCE_LENGTH, covered)
+    repeats = (ascii_codes[:, 1:] == ascii_codes[:, :-1]) & (ascii_codes[:, 1:] != 0)
+    _mark_runs(np, repeats, MIN_REPEAT_LENGTH, covered)
+    for adjacency in adjacency_tables:
+        _mark_runs(np, adjacency[ascii_codes[:, :-1], ascii_codes[:, 1:]], MIN_KEYBOARD_LENGTH, covered)
+    patterned = covered.sum(axis=1)
+    masks[patterned == 0] |= NO_SEQUENTIAL
+
+    for row in np.flatnonzero(non_ascii):
+        value = _row_text(array[row])
+        masks[row], patterned[row] = analyze_password(value)
+        lengths[row] = len(value)
+    return masks, lengths, patterned
+
+
+# Function to split any iterable or array into chunks
+def _chunks(np, passwords, chunk_size):
+    if isinstance(passwords, np.ndarray):
+        for start in range(0, len(passwords), chunk_size):
+            yield passwords[start:start + chunk_size]
+        return
+    iterator = iter(passwords)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Function to evaluate many passwords at once with vectorized operations
+@metrics.timed("batch")
+def evaluate_many(passwords, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Accepts any iterable of str, or a NumPy array of fixed-width str ("U")
+    # or byte strings ("S"). Byte strings are decoded as UTF-8. Returns a dict
+    # of arrays with the same thresholds as evaluate_password_strength.
+    np = _require_numpy()
+    tables = (_class_table(np), _leet_table(np), _sequence_table(np), _adjacency_tables(np))
+    matcher = get_banned_matcher()
+    mask_scores = np.array(_MASK_SCORES, dtype=np.float64)
+    bounds = np.array([bound for bound, _, _ in STRENGTH_LEVELS[:-1]], dtype=np.float64)
+
+    all_masks = []
+    all_lengths = []
+    all_patterned = []
+    for chunk in _chunks(np, passwords, chunk_size):
+        masks, lengths, patterned = _chunk_masks(np, chunk, tables, matcher)
+        all_masks.append(masks)
+        all_lengths.append(lengths)
+        all_patterned.append(patterned)
+
+    masks = np.concatenate(all_masks) if all_masks else np.zeros(0, dtype=np.uint8)
+    lengths = np.concatenate(all_lengths) if all_lengths else np.zeros(0, dtype=np.int64)
+    patterned = np.concatenate(all_patterned) if all_patterned else np.zeros(0, dtype=np.int64)
+
+    length_bonus = np.clip((lengths - MIN_LENGTH) * 2, 0, 20)
+    variety_bonus = np.where((masks & VARIETY_MASK) == VARIETY_MASK, 10, 0)
+    pattern_penalty = np.minimum(MAX_PATTERN_PENALTY, patterned * PATTERN_PENALTY_PER_CHAR)
+    strength_percentage = np.maximum(
+        0, np.minimum(100, mask_scores[masks & ALL_CRITERIA] + length_bonus - pattern_penalty))
+    level_index = np.searchsorted(bounds, strength_percentage, side="right")
+    if metrics.enabled:
+        metrics.count("passwords_total", len(masks), source="batch")
+
+    return {
+        "criteria_mask": masks,
+        "length": lengths,
+        "length_bonus": length_bonus,
+        "variety_bonus": variety_bonus,
+        "pattern_penalty": pattern_penalty,
+        "strength_percentage": strength_percentage,
+        "level_index": level_index,
+    }
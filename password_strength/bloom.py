@@ -0,0 +1,153 @@
+# Blocked Bloom filter in front of the breach index.
+#
+# Every key sets k bits inside a single 512-bit block, so a lookup only
+# touches one 64-byte cache line of the mapped file. Keys are SHA-1 digests,
+# which are already uniformly distributed, so the block number and bit
+# positions are cut straight from the digest instead of hashing again. The
+# filter answers "definitely not breached" for most passwords without
+# touching the on-disk index.
+#
+#     python -m password_strength.bloom breaches.idx --bits-per-key 10
+import argparse
+import math
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b"PSBLOOM1"
+HEADER = struct.Struct(">8sQQI")
+BLOCK_BYTES = 64
+BLOCK_BITS = BLOCK_BYTES * 8
+BIT_INDEX_BITS = 9
+# Bit positions come from the 96 digest bits not used to pick the block
+MAX_HASHES = 96 // BIT_INDEX_BITS
+DEFAULT_BITS_PER_KEY = 10
+FILTER_SUFFIX = ".bloom"
+
+
+# Function to find the filter file that belongs to an index file
+def filter_path(index_path):
+    return os.fspath(index_path) + FILTER_SUFFIX
+
+
+# Function to pick the block and bit mask a digest maps to
+def _block_and_mask(digest, num_blocks, num_hashes):
+    block = int.from_bytes(digest[:8], "big") % num_blocks
+    bits = int.from_bytes(digest[8:20], "big")
+    mask = 0
+    for _ in range(num_hashes):
+        mask |= 1 << (bits & (BLOCK_BITS - 1))
+        bits >>= BIT_INDEX_BITS
+    return block, mask
+
+
+# Function to estimate the false-positive rate of a blocked Bloom filter
+def estimate_false_positive_rate(num_keys, num_blocks, num_hashes):
+    if num_keys == 0:
+        return 0.0
+    # Keys per block follow a Poisson distribution; average the classic
+    # Bloom formula for a single 512-bit filter over that distribution
+    load = num_keys / num_blocks
+    rate = 0.0
+    probability = math.exp(-load)
+    for keys_in_block in range(int(load + 12 * math.sqrt(load) + 12)):
+        if keys_in_block:
+            probability *= load / keys_in_block
+        filled = 1.0 - (1.0 - 1.0 / BLOCK_BITS) ** (num_hashes * keys_in_block)
+        rate += probability * filled ** num_hashes
+    return rate
+
+
+class BloomFilter:
+    # Open a filter file read-only via mmap
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        with open(self.path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.num_keys, self.num_blocks, self.num_hashes = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or len(self._map) != HEADER.size + self.num_blocks * BLOCK_BYTES:
+            self.close()
+            raise ValueError("%s is not a breach filter" % self.path)
+
+    def __contains__(self, digest):
+        return self.might_contain(digest)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._map.close()
+
+    # Size of the filter's bit array in bytes
+    @property
+    def memory_bytes(self):
+        return self.num_blocks * BLOCK_BYTES
+
+    # Expected false-positive rate for the keys it was built from
+    @property
+    def false_positive_rate(self):
+        return estimate_false_positive_rate(self.num_keys, self.num_blocks, self.num_hashes)
+
+    # Function to test a SHA-1 digest; False means definitely not present.
+    # Bits are probed one at a time so most negatives stop after one or two.
+    def might_contain(self, digest):
+        offset = HEADER.size + int.from_bytes(digest[:8], "big") % self.num_blocks * BLOCK_BYTES
+        bits = int.from_bytes(digest[8:20], "big")
+        data = self._map
+        for _ in range(self.num_hashes):
+            position = bits & (BLOCK_BITS - 1)
+            if not data[offset + (position >> 3)] >> (position & 7) & 1:
+                return False
+            bits >>= BIT_INDEX_BITS
+        return True
+
+
+# Function to write a filter for an iterable of digests
+def write_filter(digests, num_keys, path, bits_per_key=DEFAULT_BITS_PER_KEY):
+    num_blocks = max(1, math.ceil(num_keys * bits_per_key / BLOCK_BITS))
+    num_hashes = min(MAX_HASHES, max(1, round(bits_per_key * math.log(2))))
+    bits = bytearray(num_blocks * BLOCK_BYTES)
+    for digest in digests:
+        block, mask = _block_and_mask(digest, num_blocks, num_hashes)
+        offset = block * BLOCK_BYTES
+        word = int.from_bytes(bits[offset:offset + BLOCK_BYTES], "little") | mask
+        bits[offset:offset + BLOCK_BYTES] = word.to_bytes(BLOCK_BYTES, "little")
+
+    path = os.fspath(path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(HEADER.pack(MAGIC, num_keys, num_blocks, num_hashes))
+        handle.write(bits)
+    os.replace(tmp_path, path)
+    return num_blocks * BLOCK_BYTES
+
+
+# Function to build the filter sidecar for an existing breach index
+def build_filter(index_path, bits_per_key=DEFAULT_BITS_PER_KEY, path=None):
+    from .breach_index import BreachIndex
+
+    with BreachIndex(index_path, use_filter=False) as index:
+        digests = (digest for digest, _ in index.records())
+        return write_filter(digests, len(index), path or filter_path(index_path), bits_per_key)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the Bloom filter that fronts a breach index.")
+    parser.add_argument("index", help="breach index file")
+    parser.add_argument("--bits-per-key", type=float, default=DEFAULT_BITS_PER_KEY, help="filter size per hash (default: 10)")
+    parser.add_argument("-o", "--output", default=None, help="filter file (default: <index>.bloom)")
+    args = parser.parse_args(argv)
+
+    size = build_filter(args.index, args.bits_per_key, args.output)
+    with BloomFilter(args.output or filter_path(args.index)) as bloom:
+        print("Wrote %d-byte filter for %d hashes (k=%d, estimated false-positive rate %.4f%%)"
+              % (size, bloom.num_keys, bloom.num_hashes, bloom.false_positive_rate * 100))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import os
+
+from . import metrics
+from .breach_index import BreachIndex
+
+# Environment variable naming a breach index (or range server URL) to open on first use
+BREACH_INDEX_ENV = "PASSWORD_BREACH_INDEX"
+
+# Fallback list used when no breach corpus is configured (for demonstration)
+DEMO_BREACHED_PASSWORDS = frozenset(["password", "123456", "qwerty", "admin", "welcome", "login", "abc123"])
+
+_breach_index = None
+_index_loaded = False
+
+
+# Function to point breach checks at an on-disk breach index, or at a
+# range server when path is an http(s) URL
+def configure_breach_index(path):
+    global _breach_index, _index_loaded
+    if _breach_index is not None:
+        _breach_index.close()
+    if not path:
+        _breach_index = None
+    elif isinstance(path, str) and path.startswith(("http://", "https://")):
+        # Imported here so local indexes never load asyncio, ssl and http.client
+        from .breach_range import RangeClient
+        _breach_index = RangeClient(path)
+    else:
+        _breach_index = BreachIndex(path)
+    _index_loaded = True
+    return _breach_index
+
+
+# Function to get the configured breach index, if any
+def get_breach_index():
+    global _index_loaded
+    if not _index_loaded:
+        path = os.environ.get(BREACH_INDEX_ENV)
+        if path:
+            configure_breach_index(path)
+        _index_loaded = True
+    return _breach_index
+
+
+# Function to get how often a password was seen in breaches
+# (None when no breach corpus is configured)
+def breach_count(password):
+    index = get_breach_index()
+    if index is None:
+        return None
+    return index.count(password)
+
+
+# Function to get breach counts for many passwords (None each when no
+# breach corpus is configured); a range server is queried concurrently
+def breach_counts(passwords):
+    index = get_breach_index()
+    if index is None:
+        return [None] * len(passwords)
+    if hasattr(index, "count_many"):
+        return index.count_many(passwords)
+    return [index.count(password) for password in passwords]
+
+
+# Function to simulate a breach check (for demonstration)
+def _demo_breached(password):
+    return password.lower() in DEMO_BREACHED_PASSWORDS or len(password) < 6
+
+
+# Function to check a password for breaches with a single lookup;
+# returns (breached, times seen or None)
+@metrics.timed("breach")
+def breach_status(password):
+    count = breach_count(password)
+    if count is not None:
+        return count > 0, count
+    return _demo_breached(password), None
+
+
+# Function to check if password is in common breaches
+def check_password_breach(password):
+    return breach_status(password)[0]
+
+
+# Function to check a batch of passwords for breaches, in order
+@metrics.timed("breach")
+def check_password_breaches(passwords):
+    return [count > 0 if count is not None else _demo_breached(password)
+            for password, count in zip(passwords, breach_counts(passwords))]
@@ -0,0 +1,222 @@
+# Memory-mapped breach corpus index.
+#
+# The index is a sorted array of fixed-width records, each holding the raw
+# 20-byte SHA-1 digest of a breached password (the same hash the HIBP
+# "Pwned Passwords" dumps use) followed by a big-endian uint32 prevalence
+# count. The file is mapped read-only, so a lookup only touches the handful
+# of pages visited by the search and the corpus is never loaded into RAM.
+#
+# An optional "<index>.prefix" sidecar stores, for every 16-bit digest
+# prefix, the number of records whose prefix is smaller. It narrows each
+# lookup to a single bucket before the search starts. The index and its
+# table are renamed into place one after the other, so each build ends the
+# index with a random token that the table repeats; a table whose token
+# does not match the index it sits next to is ignored. An optional
+# "<index>.bloom" sidecar (see bloom.py) answers most negatives in memory
+# before any index page is touched.
+import hashlib
+import mmap
+import os
+import struct
+
+from .bloom import BloomFilter, filter_path
+
+MAGIC = b"PSBRIDX1"
+HEADER = struct.Struct(">8sQ")
+DIGEST_SIZE = 20
+RECORD = struct.Struct(">20sI")
+MAX_COUNT = 0xFFFFFFFF
+PREFIX_BITS = 16
+PREFIX_TABLE = struct.Struct("<%dQ" % ((1 << PREFIX_BITS) + 1))
+PREFIX_SUFFIX = ".prefix"
+TOKEN_SIZE = 16
+
+
+# Function to hash a password the way breach corpora do
+def password_digest(password):
+    return hashlib.sha1(password.encode("utf-8")).digest()
+
+
+# Function to find the prefix table that belongs to an index file
+def prefix_path(path):
+    return os.fspath(path) + PREFIX_SUFFIX
+
+
+class BreachIndex:
+    # Open the index read-only; the prefix table and filter are used when present
+    def __init__(self, path, use_filter=True):
+        self.path = os.fspath(path)
+        self.filter = None
+        self._file = open(self.path, "rb")
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError("%s is not a breach index (file too small)" % self.path)
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        magic, self._count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("%s is not a breach index (bad magic)" % self.path)
+        if HEADER.size + self._count * RECORD.size > size:
+            self.close()
+            raise ValueError("%s is truncated" % self.path)
+
+        self._prefix = None
+        sidecar = prefix_path(self.path)
+        if os.path.exists(sidecar):
+            with open(sidecar, "rb") as handle:
+                table = handle.read()
+            # The token follows the records; a table from another build
+            # would send lookups to the wrong buckets
+            token_offset = HEADER.size + self._count * RECORD.size
+            token = self._map[token_offset:token_offset + TOKEN_SIZE]
+            if len(table) == TOKEN_SIZE + PREFIX_TABLE.size and len(token) == TOKEN_SIZE \
+                    and table[:TOKEN_SIZE] == token:
+                prefix = PREFIX_TABLE.unpack_from(table, TOKEN_SIZE)
+                if prefix[-1] == self._count:
+                    self._prefix = prefix
+
+        if use_filter and os.path.exists(filter_path(self.path)):
+            bloom = BloomFilter(filter_path(self.path))
+            # A filter built for a different key set would give false negatives
+            if bloom.num_keys == self._count:
+                self.filter = bloom
+            else:
+                bloom.close()
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, password):
+        return self.count(password) > 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.filter is not None:
+            self.filter.close()
+            self.filter = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    # Function to read the digest stored in a record
+    def _digest(self, index):
+        offset = HEADER.size + index * RECORD.size
+        return self._map[offset:offset + DIGEST_SIZE]
+
+    # Function to read the leading 64 bits of a record's digest
+    def _key(self, index):
+        offset = HEADER.size + index * RECORD.size
+        return int.from_bytes(self._map[offset:offset + 8], "big")
+
+    # Function to find a digest, returning its record index or -1
+    def find(self, digest):
+        if self._prefix is not None:
+            bucket = int.from_bytes(digest[:2], "big")
+            lo, hi = self._prefix[bucket], self._prefix[bucket + 1]
+        else:
+            lo, hi = 0, self._count
+
+        # SHA-1 digests are uniformly distributed, so interpolation usually
+        # lands within a record or two of the target. Alternating with plain
+        # bisection keeps the worst case logarithmic.
+        key = int.from_bytes(digest[:8], "big")
+        interpolate = True
+        while lo < hi:
+            if interpolate and hi - lo > 2:
+                lo_key = self._key(lo)
+                hi_key = self._key(hi - 1)
+                if key < lo_key or key > hi_key:
+                    return -1
+                if hi_key == lo_key:
+                    mid = lo
+                else:
+                    mid = lo + (key - lo_key) * (hi - 1 - lo) // (hi_key - lo_key)
+            else:
+                mid = (lo + hi) // 2
+            interpolate = not interpolate
+
+            found = self._digest(mid)
+            if found == digest:
+                return mid
+            if found < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        return -1
+
+    # Function to get how many times a digest was seen in breaches
+    def count_digest(self, digest):
+        if self.filter is not None and not self.filter.might_contain(digest):
+            return 0
+        index = self.find(digest)
+        if index < 0:
+            return 0
+        return RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size)[1]
+
+    # Function to get how many times a password was seen in breaches
+    def count(self, password):
+        return self.count_digest(password_digest(password))
+
+    # Function to iterate over all (digest, count) records in order
+    def records(self):
+        for index in range(self._count):
+            yield RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size)
+
+
+# Function to write sorted, unique (digest, count) records as an index
+# plus its prefix table. Files are written next to the target and renamed
+# into place, so readers never see a half-written index, and both carry
+# the same random token, so a reader never pairs an index with the table
+# of another build.
+def write_index(records, path):
+    path = os.fspath(path)
+    sidecar = prefix_path(path)
+    tmp_path = path + ".tmp"
+    tmp_sidecar = sidecar + ".tmp"
+    bucket_counts = [0] * (1 << PREFIX_BITS)
+    written = 0
+    previous = None
+    token = os.urandom(TOKEN_SIZE)
+
+    with open(tmp_path, "wb") as handle:
+        handle.write(HEADER.pack(MAGIC, 0))
+        buffer = bytearray()
+        for digest, count in records:
+            if previous is not None and digest <= previous:
+                raise ValueError("records must be sorted and unique")
+            previous = digest
+            buffer += RECORD.pack(digest, min(count, MAX_COUNT))
+            bucket_counts[(digest[0] << 8) | digest[1]] += 1
+            written += 1
+            if len(buffer) >= 1 << 20:
+                handle.write(buffer)
+                buffer.clear()
+        handle.write(buffer)
+        handle.write(token)
+        handle.seek(0)
+        handle.write(HEADER.pack(MAGIC, written))
+
+    offsets = [0]
+    for bucket_count in bucket_counts:
+        offsets.append(offsets[-1] + bucket_count)
+    with open(tmp_sidecar, "wb") as handle:
+        handle.write(token)
+        handle.write(PREFIX_TABLE.pack(*offsets))
+
+    os.replace(tmp_path, path)
+    os.replace(tmp_sidecar, sidecar)
+    # Any existing filter describes the old key set
+    if os.path.exists(filter_path(path)):
+        os.remove(filter_path(path))
+    return written
@@ -0,0 +1,267 @@
+# Breach checks against a remote k-anonymity range server.
+#
+# The corpus stays on another machine. To check a password, the client
+# sends only the first five hex digits of its SHA-1 (GET /range/ABCDE).
+# The server answers with every "SUFFIX:COUNT" line under that prefix, and
+# the match is made locally, so the server never learns which password
+# was checked. range_server.py is the stand-in server for a corpus built
+# with build_index; the protocol is the one Pwned Passwords serves, so
+# https://api.pwnedpasswords.com works too.
+#
+# Fetched partitions are kept in an LRU capped by the number of suffixes
+# held, so repeated prefixes cost no round trip. Single lookups reuse a
+# pool of keep-alive connections. count_many fetches the missing
+# prefixes of a whole batch concurrently on asyncio, over up to
+# pool_size keep-alive connections.
+#
+#     configure_breach_index("http://breach-host:8081")
+#     PASSWORD_BREACH_INDEX=http://breach-host:8081 python -m password_strength.audit passwords.txt -o out.jsonl
+import asyncio
+import collections
+import hashlib
+import http.client
+import ssl
+import threading
+import urllib.parse
+
+from . import metrics
+
+PREFIX_LENGTH = 5
+RANGE_PATH = "/range/"
+DEFAULT_POOL_SIZE = 8
+# Suffixes kept across cached partitions, each partition counting at
+# least one (a Pwned Passwords partition holds about a thousand)
+DEFAULT_CACHE_RECORDS = 1000000
+DEFAULT_TIMEOUT = 10.0
+USER_AGENT = "password-strength-meter"
+
+
+# Function to split a password's SHA-1 into the prefix sent and the suffix matched
+def range_key(password):
+    digest = hashlib.sha1(password.encode("utf-8")).hexdigest().upper()
+    return digest[:PREFIX_LENGTH], digest[PREFIX_LENGTH:]
+
+
+# Function to parse a range response into {suffix: count}
+def parse_range(body):
+    partition = {}
+    for line in body.decode("ascii").split():
+        suffix, _, count = line.partition(":")
+        partition[suffix.upper()] = int(count) if count else 1
+    return partition
+
+
+class RangeClient:
+    # Connect lazily to the range server at url; pool_size bounds idle
+    # connections kept and concurrent fetches in count_many
+    def __init__(self, url, pool_size=DEFAULT_POOL_SIZE, cache_records=DEFAULT_CACHE_RECORDS,
+                 timeout=DEFAULT_TIMEOUT):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError("%r is not an http(s) URL" % url)
+        self.url = url
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.https else 80)
+        self.base_path = parts.path.rstrip("/") + RANGE_PATH
+        self.pool_size = pool_size
+        self.cache_records = cache_records
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self._ssl = ssl.create_default_context() if self.https else None
+        self._idle = []
+        # prefix -> {suffix: count}, least recently used first
+        self._partitions = collections.OrderedDict()
+        self._cached_records = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Function to close the idle connections
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    # Function to look a prefix up in the partition cache (None on a miss)
+    def _cached(self, prefix):
+        with self._lock:
+            partition = self._partitions.get(prefix)
+            if partition is None:
+                self.misses += 1
+            else:
+                self._partitions.move_to_end(prefix)
+                self.hits += 1
+        if metrics.enabled:
+            metrics.count("breach_range_lookups_total", result="miss" if partition is None else "hit")
+        return partition
+
+    # Function to cache a fetched partition, evicting the least recently used past the cap
+    def _store(self, prefix, partition):
+        with self._lock:
+            previous = self._partitions.pop(prefix, None)
+            if previous is not None:
+                self._cached_records -= len(previous) or 1
+            self._partitions[prefix] = partition
+            self._cached_records += len(partition) or 1
+            while self._cached_records > self.cache_records and len(self._partitions) > 1:
+                _, evicted = self._partitions.popitem(last=False)
+                self._cached_records -= len(evicted) or 1
+
+    # Function to fetch one partition over a pooled keep-alive connection,
+    # retrying once on a fresh connection if a reused one was closed
+    def _fetch(self, prefix):
+        for attempt in (0, 1):
+            with self._lock:
+                connection = self._idle.pop() if self._idle and not attempt else None
+            reused = connection is not None
+            if connection is None:
+                if self.https:
+                    connection = http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout,
+                                                             context=self._ssl)
+                else:
+                    connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                connection.request("GET", self.base_path + prefix, headers={"User-Agent": USER_AGENT})
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if reused:
+                    continue
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                with self._lock:
+                    if len(self._idle) < self.pool_size:
+                        self._idle.append(connection)
+                        connection = None
+                if connection is not None:
+                    connection.close()
+            if response.status != 200:
+                raise ConnectionError("range query %s%s failed: HTTP %d" % (self.url, prefix, response.status))
+            self.fetches += 1
+            return parse_range(body)
+
+    # Function to get the partition for a prefix, from the cache or the server
+    def partition(self, prefix):
+        partition = self._cached(prefix)
+        if partition is None:
+            with metrics.stage("breach.fetch"):
+                partition = self._fetch(prefix)
+            self._store(prefix, partition)
+        return partition
+
+    # Function to get how many times a password was seen in breaches
+    def count(self, password):
+        prefix, suffix = range_key(password)
+        return self.partition(prefix).get(suffix, 0)
+
+    def __contains__(self, password):
+        return self.count(password) > 0
+
+    # Function to get breach counts for many passwords, fetching the
+    # prefixes not cached concurrently
+    def count_many(self, passwords):
+        return asyncio.run(self.count_many_async(passwords))
+
+    # Coroutine form of count_many, for callers already running an event loop
+    async def count_many_async(self, passwords):
+        keys = [range_key(password) for password in passwords]
+        # Partitions are answered from this dict, so a batch with more
+        # prefixes than the cache holds is never fetched twice
+        partitions = {}
+        for prefix, _ in keys:
+            if prefix not in partitions:
+                partitions[prefix] = self._cached(prefix)
+        missing = [prefix for prefix, partition in partitions.items() if partition is None]
+        if missing:
+            with metrics.stage("breach.fetch"):
+                pending = iter(missing)
+                workers = [self._fetch_worker(pending, partitions) for _ in range(min(self.pool_size, len(missing)))]
+                await asyncio.gather(*workers)
+        return [partitions[prefix].get(suffix, 0) for prefix, suffix in keys]
+
+    # Function to fetch prefixes from a shared iterator over one keep-alive
+    # connection until none are left
+    async def _fetch_worker(self, pending, partitions):
+        reader = writer = None
+        try:
+            for prefix in pending:
+                for attempt in (0, 1):
+                    if writer is None:
+                        reader, writer = await asyncio.wait_for(
+                            asyncio.open_connection(self.host, self.port, ssl=self._ssl), self.timeout)
+                    try:
+                        status, body, keep_alive = await asyncio.wait_for(
+                            self._request(reader, writer, prefix), self.timeout)
+                    except (asyncio.IncompleteReadError, ConnectionError):
+                        writer.close()
+                        reader = writer = None
+                        if attempt:
+                            raise
+                        continue
+                    break
+                if status != 200:
+                    raise ConnectionError("range query %s%s failed: HTTP %d" % (self.url, prefix, status))
+                if not keep_alive:
+                    writer.close()
+                    reader = writer = None
+                partitions[prefix] = partition = parse_range(body)
+                self.fetches += 1
+                self._store(prefix, partition)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    # Function to send one range request and read its response; returns
+    # (status, body, whether the connection stays open)
+    async def _request(self, reader, writer, prefix):
+        writer.write(("GET %s%s HTTP/1.1\r\nHost: %s\r\nUser-Agent: %s\r\n\r\n"
+                      % (self.base_path, prefix, self.host, USER_AGENT)).encode("latin-1"))
+        await writer.drain()
+        head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        status = int(head[0].split(" ", 2)[1])
+        headers = {}
+        for line in head[1:]:
+            name, _, value = line.partition(":")
+            if name:
+                headers[name.strip().lower()] = value.strip().lower()
+        if headers.get("transfer-encoding") == "chunked":
+            body = bytearray()
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+                if not size:
+                    # Skip trailers up to the blank line
+                    while await reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    break
+                body += (await reader.readexactly(size + 2))[:-2]
+            body = bytes(body)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            # Neither a length nor chunks: the body runs until the server
+            # closes the connection, which cannot be reused
+            return status, await reader.read(), False
+        return status, body, headers.get("connection") != "close"
+
+    # Function to report cache and fetch counters
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "partitions": len(self._partitions),
+            "records": self._cached_records,
+            "hits": self.hits,
+            "misses": self.misses,
+            "fetches": self.fetches,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
@@ -0,0 +1,240 @@
+# Streaming builder for the breach index.
+#
+# Raw dumps (plaintext password lists or HIBP "HASH:COUNT" files) are read
+# in chunks of lines, hashed and normalized in worker processes, and each
+# chunk comes back as a sorted, deduplicated run of packed records. Runs are
+# collected in memory up to a configurable ceiling, merged and spilled to
+# temporary files, then all spilled runs (and optionally an existing index)
+# are k-way merged into the final index with counts summed.
+#
+#     python -m password_strength.build_index dump.txt -o breaches.idx
+#     python -m password_strength.build_index new.txt -o breaches.idx --merge
+#
+# Unless --bloom-bits-per-key is 0, the Bloom filter sidecar is rebuilt for
+# the new key set after the index is written.
+import argparse
+import hashlib
+import heapq
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import groupby, islice
+from operator import itemgetter
+
+from .bloom import DEFAULT_BITS_PER_KEY, build_filter
+from .breach_index import MAX_COUNT, RECORD, BreachIndex, write_index
+
+FORMATS = ("auto", "plain", "hibp")
+DEFAULT_CHUNK_LINES = 100000
+DEFAULT_MEMORY_MB = 256
+_READ_RECORDS = 65536
+_HEX_DIGITS = frozenset(b"0123456789abcdefABCDEF")
+
+
+# Function to tell whether a line looks like "SHA1HEX" or "SHA1HEX:COUNT"
+def _is_hibp_line(line):
+    digest, _, count = line.partition(b":")
+    return len(digest) == 40 and _HEX_DIGITS.issuperset(digest) and (not count or count.isdigit())
+
+
+# Function to hash or parse one chunk of lines into a sorted, deduplicated run
+def _process_chunk(lines, input_format):
+    counts = {}
+    for line in lines:
+        line = line.rstrip(b"\r\n")
+        if not line:
+            continue
+        if input_format == "hibp":
+            digest, _, count = line.strip().partition(b":")
+            # int() would take a sign, spaces or underscores; only plain
+            # digits are a count
+            if len(digest) != 40 or count and not count.isdigit():
+                continue
+            try:
+                digest = bytes.fromhex(digest.decode("ascii"))
+            except ValueError:
+                continue
+            count = int(count) if count else 1
+        else:
+            digest = hashlib.sha1(line).digest()
+            count = 1
+        counts[digest] = counts.get(digest, 0) + count
+    return b"".join(RECORD.pack(digest, min(counts[digest], MAX_COUNT)) for digest in sorted(counts))
+
+
+# Function to iterate over the records of a packed run
+def _iter_packed(run):
+    return RECORD.iter_unpack(run)
+
+
+# Function to iterate over the records of a run file with buffered reads
+def _iter_run_file(path):
+    with open(path, "rb") as handle:
+        while True:
+            block = handle.read(RECORD.size * _READ_RECORDS)
+            if not block:
+                return
+            yield from RECORD.iter_unpack(block)
+
+
+# Function to merge sorted record streams, summing counts of equal digests
+def merge_records(streams):
+    for digest, group in groupby(heapq.merge(*streams, key=itemgetter(0)), key=itemgetter(0)):
+        yield digest, min(sum(count for _, count in group), MAX_COUNT)
+
+
+# Function to read lines from every input, detecting the format if needed
+def _read_lines(paths, input_format):
+    for path in paths:
+        handle = sys.stdin.buffer if path == "-" else open(path, "rb")
+        try:
+            lines = iter(handle)
+            file_format = input_format
+            if file_format == "auto":
+                first = next(lines, None)
+                if first is None:
+                    continue
+                file_format = "hibp" if _is_hibp_line(first.strip()) else "plain"
+                yield file_format, first
+            for line in lines:
+                yield file_format, line
+        finally:
+            if handle is not sys.stdin.buffer:
+                handle.close()
+
+
+# Function to group lines into chunks that share a single input format
+def _chunks(paths, input_format, chunk_lines):
+    for file_format, group in groupby(_read_lines(paths, input_format), key=itemgetter(0)):
+        group = (line for _, line in group)
+        while True:
+            lines = list(islice(group, chunk_lines))
+            if not lines:
+                break
+            yield lines, file_format
+
+
+class IndexBuilder:
+    # Collect runs from input dumps and write them out as a breach index
+    def __init__(self, memory_mb=DEFAULT_MEMORY_MB, workers=None, chunk_lines=DEFAULT_CHUNK_LINES, tmp_dir=None):
+        self.memory_limit = max(1, int(memory_mb * 1024 * 1024))
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.chunk_lines = chunk_lines
+        self._tmp = tempfile.TemporaryDirectory(prefix="breach-runs-", dir=tmp_dir)
+        self._pending_runs = []
+        self._pending_bytes = 0
+        self._run_files = []
+        self.lines_read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._tmp.cleanup()
+
+    # Function to keep a processed run, spilling to disk over the memory ceiling
+    def _add_run(self, run):
+        self._pending_runs.append(run)
+        self._pending_bytes += len(run)
+        if self._pending_bytes >= self.memory_limit:
+            self._spill()
+
+    # Function to merge the in-memory runs into one sorted run file
+    def _spill(self):
+        if not self._pending_runs:
+            return
+        path = os.path.join(self._tmp.name, "run-%06d.bin" % len(self._run_files))
+        with open(path, "wb") as handle:
+            buffer = bytearray()
+            for record in merge_records([_iter_packed(run) for run in self._pending_runs]):
+                buffer += RECORD.pack(*record)
+                if len(buffer) >= 1 << 20:
+                    handle.write(buffer)
+                    buffer.clear()
+            handle.write(buffer)
+        self._run_files.append(path)
+        self._pending_runs = []
+        self._pending_bytes = 0
+
+    # Function to stream input files through the worker pool
+    def add_files(self, paths, input_format="auto"):
+        chunks = _chunks(paths, input_format, self.chunk_lines)
+        if self.workers <= 1:
+            for lines, file_format in chunks:
+                self.lines_read += len(lines)
+                self._add_run(_process_chunk(lines, file_format))
+            return
+
+        # Keep a bounded number of chunks in flight so reading never runs
+        # ahead of the workers and memory stays under the ceiling
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = set()
+            for lines, file_format in chunks:
+                self.lines_read += len(lines)
+                pending.add(pool.submit(_process_chunk, lines, file_format))
+                if len(pending) >= self.workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._add_run(future.result())
+            for future in pending:
+                self._add_run(future.result())
+
+    # Function to merge every run (and optionally an existing index) into the output
+    def write(self, output, merge_existing=False):
+        self._spill()
+        streams = [_iter_run_file(path) for path in self._run_files]
+        existing = None
+        if merge_existing and os.path.exists(output):
+            existing = BreachIndex(output)
+            streams.append(existing.records())
+        try:
+            return write_index(merge_records(streams), output)
+        finally:
+            if existing is not None:
+                existing.close()
+
+
+# Function to build (or incrementally extend) a breach index from dumps
+def build_index(paths, output, input_format="auto", merge_existing=False, memory_mb=DEFAULT_MEMORY_MB,
+                workers=None, chunk_lines=DEFAULT_CHUNK_LINES, tmp_dir=None, bloom_bits_per_key=DEFAULT_BITS_PER_KEY):
+    with IndexBuilder(memory_mb, workers, chunk_lines, tmp_dir) as builder:
+        builder.add_files(paths, input_format)
+        written = builder.write(output, merge_existing)
+    if bloom_bits_per_key > 0:
+        build_filter(output, bloom_bits_per_key)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a memory-mapped breach index from password dumps.")
+    parser.add_argument("inputs", nargs="+", help="dump files (plaintext or HASH:COUNT), '-' for stdin")
+    parser.add_argument("-o", "--output", required=True, help="index file to write")
+    parser.add_argument("--format", choices=FORMATS, default="auto", help="input format (default: auto-detect per file)")
+    parser.add_argument("--merge", action="store_true", help="merge into the existing output index instead of replacing it")
+    parser.add_argument("--memory-mb", type=float, default=DEFAULT_MEMORY_MB, help="memory ceiling for in-memory runs")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-lines", type=int, default=DEFAULT_CHUNK_LINES, help="lines per worker chunk")
+    parser.add_argument("--tmp-dir", default=None, help="directory for temporary sorted runs")
+    parser.add_argument("--bloom-bits-per-key", type=float, default=DEFAULT_BITS_PER_KEY,
+                        help="size of the Bloom filter sidecar per hash, 0 to skip it (default: 10)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    with IndexBuilder(args.memory_mb, args.workers, args.chunk_lines, args.tmp_dir) as builder:
+        builder.add_files(args.inputs, args.format)
+        written = builder.write(args.output, args.merge)
+        lines_read = builder.lines_read
+    if args.bloom_bits_per_key > 0:
+        build_filter(args.output, args.bloom_bits_per_key)
+    elapsed = time.perf_counter() - started
+    print("Read %d lines, wrote %d unique hashes to %s in %.1fs" % (lines_read, written, args.output, elapsed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+# Command-line bulk password generation, streamed to a file or stdout.
+#
+#     python -m password_strength.bulk_generate -n 500000 --length 16 --unique -o initial.txt
+#     python -m password_strength.bulk_generate -n 500000 --passphrase --words 5 --wordlist eff_large.txt
+import argparse
+import sys
+import time
+
+from .generator import write_passwords
+from .passphrase import CAPITALIZATION, passphrase_entropy, write_passphrases
+from .wordlist import configure_wordlist
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate passwords from the operating system's CSPRNG.")
+    parser.add_argument("-n", "--count", type=int, default=1, help="number of passwords to generate")
+    parser.add_argument("-l", "--length", type=int, default=16)
+    parser.add_argument("-o", "--output", help="file to write (default: standard output)")
+    parser.add_argument("--unique", action="store_true", help="never repeat a password within this run")
+    parser.add_argument("--no-uppercase", dest="include_uppercase", action="store_false")
+    parser.add_argument("--no-lowercase", dest="include_lowercase", action="store_false")
+    parser.add_argument("--no-numbers", dest="include_numbers", action="store_false")
+    parser.add_argument("--no-special", dest="include_special", action="store_false")
+    passphrases = parser.add_argument_group("passphrases")
+    passphrases.add_argument("--passphrase", action="store_true", help="generate diceware passphrases instead")
+    passphrases.add_argument("--words", type=int, default=6)
+    passphrases.add_argument("--separator", default="-")
+    passphrases.add_argument("--capitalize", choices=CAPITALIZATION, default="none")
+    passphrases.add_argument("--digits", type=int, default=0, help="insert a block of this many random digits")
+    passphrases.add_argument("--wordlist", help="word list to draw from (plain text or compiled)")
+    args = parser.parse_args(argv)
+    if args.count < 1 or args.length < 1:
+        parser.error("--count and --length must be positive")
+
+    started = time.perf_counter()
+    destination = args.output or sys.stdout
+    try:
+        if args.passphrase:
+            wordlist = configure_wordlist(args.wordlist)
+            print("%.1f bits of entropy per passphrase (%d-word list)" % (
+                passphrase_entropy(args.words, args.capitalize, args.digits, len(wordlist)), len(wordlist)),
+                file=sys.stderr)
+            written = write_passphrases(destination, args.count, words=args.words, separator=args.separator,
+                                        capitalize=args.capitalize, digits=args.digits, unique=args.unique)
+        else:
+            written = write_passwords(destination, args.count, length=args.length, unique=args.unique,
+                                      include_uppercase=args.include_uppercase,
+                                      include_lowercase=args.include_lowercase,
+                                      include_numbers=args.include_numbers, include_special=args.include_special)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.output:
+        print("wrote %d passwords to %s in %.1fs" % (written, args.output, time.perf_counter() - started),
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
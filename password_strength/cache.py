@@ -0,0 +1,159 @@
+# Bounded result cache for repeated evaluations.
+#
+# Streamlit reruns the whole script on every interaction and signup forms
+# re-check the same password on every keystroke pause, so the same input is
+# scored over and over. Results are kept in an LRU map with a time-to-live,
+# keyed by a BLAKE2b keyed hash of the password: the key is random per
+# process, so the cache never holds plaintext and its keys are useless
+# outside this process. Cached results are dropped whenever the breach
+# index or banned-term list is reconfigured, since either changes them.
+#
+# One cache is shared by everything in the process (the UI, the service
+# workers, library callers) through evaluate_cached and breach_cached.
+# Cached results are shared objects: callers must not modify them.
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from . import metrics
+from .banned import get_banned_matcher
+from .breach import breach_status, get_breach_index
+from .policy import get_policy
+from .result import evaluate_compact
+
+DEFAULT_MAXSIZE = 1024
+DEFAULT_TTL = 300.0
+
+# Random per process, so keys cannot be matched against precomputed hashes
+_PROCESS_KEY = secrets.token_bytes(32)
+
+
+# Function to derive the cache key of a password for one kind of result
+def password_key(password, namespace=b""):
+    return hashlib.blake2b(password.encode("utf-8", "surrogatepass"), digest_size=16, key=_PROCESS_KEY,
+                           person=namespace).digest()
+
+
+class ResultCache:
+    # Set up an empty cache holding at most maxsize results for ttl seconds each
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # Function to get a cached result, or compute and remember it
+    def get(self, key, compute):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    if metrics.enabled:
+                        metrics.count("cache_lookups_total", result="hit")
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+        if metrics.enabled:
+            metrics.count("cache_lookups_total", result="miss")
+
+        # Computed outside the lock: concurrent misses on the same key may
+        # both compute, which is cheaper than serializing all callers
+        value = compute()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    # Function to drop every cached result
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # Function to report the cache counters
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
+
+
+_result_cache = ResultCache()
+# The breach index and banned-term matcher the cached results were computed with
+_cached_config = None
+
+
+# Function to resize the shared cache (drops what it holds)
+def configure_result_cache(maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL):
+    global _result_cache
+    _result_cache = ResultCache(maxsize, ttl)
+    return _result_cache
+
+
+# Function to get the shared cache, emptied if the scoring configuration changed
+def get_result_cache():
+    global _cached_config
+    config = (get_breach_index(), get_banned_matcher())
+    if _cached_config is None or config[0] is not _cached_config[0] or config[1] is not _cached_config[1]:
+        _result_cache.clear()
+        _cached_config = config
+    return _result_cache
+
+
+# Function to evaluate a password into a PasswordResult, reusing a recent
+# result for the same password; policy is a name or CompiledPolicy (None
+# for the built-in rules), and a reloaded policy never reuses old results
+def evaluate_cached(password, policy=None):
+    key = password_key(password, b"evaluate")
+    if policy is not None:
+        policy = get_policy(policy)
+        if policy.result_policy is not None:
+            return get_result_cache().get((policy.key, key), lambda: policy.evaluate_compact(password))
+    return get_result_cache().get(key, lambda: evaluate_compact(password))
+
+
+# Function to check a password for breaches, reusing a recent result;
+# returns (breached, times seen or None)
+def breach_cached(password):
+    return get_result_cache().get(password_key(password, b"breach"), lambda: breach_status(password))
+
+
+# Function to report the shared cache's counters
+def cache_stats():
+    return _result_cache.stats()
+
+
+# Function to compute the hit rate of the lookups counted by the metrics
+# (worker processes included), or None before any lookup
+def _metrics_hit_rate():
+    hits = metrics.counter_value("cache_lookups_total", result="hit")
+    lookups = hits + metrics.counter_value("cache_lookups_total", result="miss")
+    return hits / lookups if lookups else None
+
+
+metrics.register_gauge("cache_hit_ratio", "Share of result cache lookups answered from the cache.", _metrics_hit_rate)
@@ -0,0 +1,185 @@
+from . import metrics
+from .banned import get_banned_matcher
+from .estimator import estimate_guesses
+from .patterns import find_patterns, pattern_coverage
+
+# Criteria in evaluation order: (key, description, suggestion)
+CRITERIA = (
+    ("length", "At least 8 characters", "Make your password longer (at least 8 characters)"),
+    ("uppercase", "Contains uppercase letters", "Add uppercase letters (A-Z)"),
+    ("lowercase", "Contains lowercase letters", "Add lowercase letters (a-z)"),
+    ("numbers", "Contains numbers", "Add numbers (0-9)"),
+    ("special", "Contains special characters", "Add special characters (!@#$%^&*)"),
+    ("no_common", "Not a common password", "Avoid common password patterns"),
+    ("no_sequential", "No sequences, repeats or keyboard patterns",
+     "Avoid sequences, repeated characters and keyboard patterns like 'abc', '111' or 'qwerty'"),
+)
+
+# One bit per criterion, in the same order as CRITERIA
+LENGTH = 1 << 0
+UPPERCASE = 1 << 1
+LOWERCASE = 1 << 2
+NUMBERS = 1 << 3
+SPECIAL = 1 << 4
+NO_COMMON = 1 << 5
+NO_SEQUENTIAL = 1 << 6
+ALL_CRITERIA = (1 << len(CRITERIA)) - 1
+VARIETY_MASK = UPPERCASE | LOWERCASE | NUMBERS | SPECIAL
+
+MIN_LENGTH = 8
+SPECIAL_CHARACTERS = '!@#$%^&*(),.?":{}|<>'
+# Points taken off per character that is part of a sequence, repeat or
+# keyboard walk, mirroring the per-character length bonus
+PATTERN_PENALTY_PER_CHAR = 2
+MAX_PATTERN_PENALTY = 20
+
+# Strength bands: (upper bound of percentage, name, color)
+STRENGTH_LEVELS = (
+    (30, "Very Weak", "#FF0000"),
+    (50, "Weak", "#FF6600"),
+    (70, "Moderate", "#FFCC00"),
+    (90, "Strong", "#99CC00"),
+    (None, "Very Strong", "#00CC00"),
+)
+
+# Attack model whose estimated crack time describes the strength level
+DESCRIBED_ATTACK = "offline_slow_hash"
+
+# Maps every ASCII character to a one-character marker holding its class bit,
+# or deletes it when it belongs to no class. Non-ASCII characters are left
+# untouched by str.translate so they can be classified by the Unicode fallback.
+_CLASS_TABLE = {code: None for code in range(128)}
+for _chars, _bit in (
+    ("ABCDEFGHIJKLMNOPQRSTUVWXYZ", UPPERCASE),
+    ("abcdefghijklmnopqrstuvwxyz", LOWERCASE),
+    ("0123456789", NUMBERS),
+    (SPECIAL_CHARACTERS, SPECIAL),
+):
+    for _char in _chars:
+        _CLASS_TABLE[ord(_char)] = chr(_bit)
+del _chars, _bit, _char
+
+# Base score plus variety bonus for every possible criteria mask
+_MASK_SCORES = tuple(
+    (bin(mask).count("1") / len(CRITERIA)) * 100
+    + (10 if mask & VARIETY_MASK == VARIETY_MASK else 0)
+    for mask in range(ALL_CRITERIA + 1)
+)
+
+
+# Function to find which character classes appear in a password
+def character_classes(password):
+    mask = 0
+    for char in set(password.translate(_CLASS_TABLE)):
+        if char < "\x80":
+            mask |= ord(char)
+        # Unicode fallback: \d matches any decimal digit, not just 0-9
+        elif char.isdecimal():
+            mask |= NUMBERS
+    return mask
+
+
+# Function to compute the criteria mask of a password and how many of its
+# characters belong to sequences, repeats or keyboard walks
+def analyze_password(password):
+    if metrics.enabled:
+        return _analyze_password_timed(password)
+    mask = character_classes(password)
+    if len(password) >= MIN_LENGTH:
+        mask |= LENGTH
+    if not get_banned_matcher().search(password):
+        mask |= NO_COMMON
+    patterned = pattern_coverage(find_patterns(password))
+    if not patterned:
+        mask |= NO_SEQUENTIAL
+    return mask, patterned
+
+
+# Function to analyze a password as analyze_password does, timing each
+# criterion check as its own stage
+def _analyze_password_timed(password):
+    with metrics.stage("criterion.classes"):
+        mask = character_classes(password)
+    if len(password) >= MIN_LENGTH:
+        mask |= LENGTH
+    with metrics.stage("criterion.no_common"):
+        if not get_banned_matcher().search(password):
+            mask |= NO_COMMON
+    with metrics.stage("criterion.no_sequential"):
+        patterned = pattern_coverage(find_patterns(password))
+    if not patterned:
+        mask |= NO_SEQUENTIAL
+    return mask, patterned
+
+
+# Function to compute the bitmask of criteria a password meets
+def criteria_mask(password):
+    return analyze_password(password)[0]
+
+
+# Function to turn a criteria mask, length and patterned character count
+# into a strength percentage
+def strength_percentage(mask, length, patterned=0):
+    length_bonus = min(20, (length - MIN_LENGTH) * 2) if length > MIN_LENGTH else 0
+    pattern_penalty = min(MAX_PATTERN_PENALTY, patterned * PATTERN_PENALTY_PER_CHAR)
+    return max(0, min(100, _MASK_SCORES[mask] + length_bonus - pattern_penalty))
+
+
+# Function to find the index of the strength band for a percentage
+def strength_level_index(percentage):
+    for index, (bound, _, _) in enumerate(STRENGTH_LEVELS):
+        if bound is None or percentage < bound:
+            return index
+
+
+# Function to describe a strength level by the time the described attack needs
+def strength_description(crack_time):
+    if crack_time == "less than a second":
+        return "This password could be cracked instantly!"
+    return "An offline attack on a slow hash would take about %s to crack this password." % crack_time
+
+
+# Function to suggest avoiding the first few banned terms found
+def banned_suggestion(banned_terms):
+    return "Avoid common words and names such as %s" % ", ".join("'%s'" % term for term in banned_terms[:3])
+
+
+# Function to evaluate password strength
+@metrics.timed("score")
+def evaluate_password_strength(password):
+    mask, patterned = analyze_password(password)
+    return evaluation_result(password, mask, patterned)
+
+
+# Function to build the full evaluation of a password from its criteria mask
+# and patterned character count (shared with the incremental evaluator)
+def evaluation_result(password, mask, patterned):
+    percentage = strength_percentage(mask, len(password), patterned)
+    _, name, color = STRENGTH_LEVELS[strength_level_index(percentage)]
+
+    # Crack times come from the guess-number estimate, not from the score
+    estimate = estimate_guesses(password)
+    description = strength_description(estimate["crack_times_display"][DESCRIBED_ATTACK])
+
+    criteria = {}
+    suggestions = []
+    bit = 1
+    for key, criterion_description, suggestion in CRITERIA:
+        met = bool(mask & bit)
+        criteria[key] = {"met": met, "description": criterion_description}
+        if not met:
+            if bit == NO_COMMON:
+                banned_terms = get_banned_matcher().matches(password)
+                if banned_terms:
+                    suggestion = banned_suggestion(banned_terms)
+            suggestions.append(suggestion)
+        bit <<= 1
+
+    return {
+        "criteria": criteria,
+        "strength_percentage": percentage,
+        "strength_level": {"name": name, "color": color, "description": description},
+        "guesses_log10": estimate["guesses_log10"],
+        "crack_times": estimate["crack_times_display"],
+        "suggestions": suggestions
+    }
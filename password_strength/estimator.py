@@ -0,0 +1,578 @@
+# Guess-number estimation in the style of zxcvbn.
+#
+# The password is covered by candidate matches (ranked dictionary words with
+# case and leetspeak variations, sequences, repeats, keyboard walks, years
+# and dates) and a dynamic program picks the sequence of non-overlapping
+# matches, with brute force filling the gaps, that an attacker would guess
+# first. The result is an estimated guess count and the time each attack
+# model would need to reach it.
+#
+# Ranked dictionaries are plain word lists ordered by frequency, compiled
+# into the flat-array Aho-Corasick automaton from banned.py and cached next
+# to the list, so loading them is a handful of array reads and matching all
+# dictionary words in a password is a single linear pass.
+import datetime
+import math
+from bisect import bisect_right
+import os
+import re
+from collections import namedtuple
+from operator import add, itemgetter
+
+from . import metrics
+from .banned import BannedTermMatcher
+from .patterns import ADJACENT_KEYS, KEYBOARD_LAYOUTS, find_patterns
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+RANKED_DICTIONARIES = (
+    ("passwords", os.path.join(DATA_DIR, "passwords.txt")),
+    ("english", os.path.join(DATA_DIR, "english.txt")),
+)
+
+BRUTEFORCE_CARDINALITY = 10
+MIN_GUESSES_BEFORE_GROWING_SEQUENCE = 10000
+MIN_SUBMATCH_GUESSES_SINGLE_CHAR = 10
+MIN_SUBMATCH_GUESSES_MULTI_CHAR = 50
+MIN_YEAR_SPACE = 20
+# Overlapping dates kept over any one character
+MAX_DATES_PER_POSITION = 2
+# Characters the matchers and the search see; anything longer is scored as
+# brute force past this point, as zxcvbn does, so cost stays bounded
+MAX_ESTIMATE_LENGTH = 100
+REFERENCE_YEAR = datetime.date.today().year
+
+# (key, description, guesses per second)
+ATTACK_MODELS = (
+    ("online_throttled", "Online attack, throttled (100 guesses/hour)", 100 / 3600),
+    ("online_unthrottled", "Online attack, unthrottled (10 guesses/second)", 10),
+    ("offline_slow_hash", "Offline attack, slow hash (10k guesses/second)", 1e4),
+    ("offline_fast_hash", "Offline attack, fast hash (10B guesses/second)", 1e10),
+)
+
+GuessMatch = namedtuple("GuessMatch", ["pattern", "start", "end", "guesses_log10", "detail"])
+
+_YEAR_RE = re.compile(r"19\d\d|20\d\d")
+_SEPARATED_DATE_RE = re.compile(r"(?<!\d)(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})(?!\d)")
+_DIGITS_RE = re.compile(r"\d{4,}")
+
+_dictionaries = None
+
+
+# Function to load the ranked dictionaries on first use
+def get_dictionaries():
+    global _dictionaries
+    if _dictionaries is None:
+        _dictionaries = tuple((name, BannedTermMatcher.from_file(path)) for name, path in RANKED_DICTIONARIES)
+    return _dictionaries
+
+
+# Function to count the ways of choosing k items out of n, as a float
+def _choose(n, k):
+    return float(math.comb(n, k)) if 0 <= k <= n else 0.0
+
+
+# Function to count capitalisation variants an attacker would try
+def _uppercase_variations(token):
+    upper = sum(1 for char in token if char.isupper())
+    lower = sum(1 for char in token if char.islower())
+    if not upper:
+        return 1.0
+    if not lower or (upper == 1 and (token[0].isupper() or token[-1].isupper())):
+        return 2.0
+    return sum(_choose(upper + lower, i) for i in range(1, min(upper, lower) + 1))
+
+
+# Function to count leetspeak variants needed to turn the word into the token
+def _l33t_variations(token, word):
+    substituted = {}
+    for token_char, word_char in zip(token.lower(), word.lower()):
+        if token_char != word_char:
+            substituted[word_char] = substituted.get(word_char, 0) + 1
+    variations = 1.0
+    for letter, subbed in substituted.items():
+        unsubbed = word.lower().count(letter) - subbed
+        if not unsubbed:
+            variations *= 2
+        else:
+            variations *= sum(_choose(subbed + unsubbed, i) for i in range(1, min(subbed, unsubbed) + 1))
+    return variations
+
+
+# Function to collect ranked dictionary matches
+def _dictionary_matches(password, matches):
+    for name, dictionary in get_dictionaries():
+        for start, end, term_index in dictionary.find_all(password):
+            token = password[start:end]
+            word = dictionary.terms[term_index]
+            guesses = (term_index + 1) * _uppercase_variations(token) * _l33t_variations(token, word)
+            matches.append(GuessMatch("dictionary", start, end, math.log10(guesses), "%s:%s" % (name, word)))
+
+
+# Position (row, x) and shift state of every key, plus the number of keys
+# and average neighbour count, for each keyboard layout
+def _build_keyboards():
+    keyboards = {}
+    for layout_index, (name, rows) in enumerate(KEYBOARD_LAYOUTS):
+        positions = {}
+        for row_index, (unshifted, shifted, offset) in enumerate(rows):
+            for column, (plain, shift) in enumerate(zip(unshifted, shifted)):
+                positions[plain] = (row_index, offset + column, False)
+                if shift != " ":
+                    positions[shift] = (row_index, offset + column, True)
+        unshifted_keys = [char for char, (_, _, shifted) in positions.items() if not shifted]
+        degrees = [
+            sum(1 for other in unshifted_keys if ADJACENT_KEYS.get(char + other, 0) >> layout_index & 1)
+            for char in unshifted_keys
+        ]
+        keyboards[name] = (positions, len(unshifted_keys), sum(degrees) / len(degrees))
+    return keyboards
+
+
+_KEYBOARDS = _build_keyboards()
+# Walks of each (layout, length, turns) up to MAX_ESTIMATE_LENGTH keys,
+# before shifted keys are counted
+_SPATIAL_WALKS = {}
+
+
+# Function to estimate guesses for a keyboard walk
+def _spatial_guesses(token, layout):
+    positions, starting_keys, average_degree = _KEYBOARDS[layout]
+    turns = 1
+    direction = None
+    shifted = 0
+    for index, char in enumerate(token):
+        row, x, is_shifted = positions[char]
+        shifted += is_shifted
+        if index:
+            previous_row, previous_x, _ = positions[token[index - 1]]
+            step = (row - previous_row, (x > previous_x) - (x < previous_x))
+            if direction is not None and step != direction:
+                turns += 1
+            direction = step
+
+    length = len(token)
+    guesses = _SPATIAL_WALKS.get((layout, length, turns))
+    if guesses is None:
+        guesses = 0.0
+        for i in range(2, length + 1):
+            for j in range(1, min(turns, i - 1) + 1):
+                guesses += _choose(i - 1, j - 1) * starting_keys * average_degree ** j
+        if length <= MAX_ESTIMATE_LENGTH:
+            _SPATIAL_WALKS[layout, length, turns] = guesses
+    if shifted:
+        unshifted = length - shifted
+        if not unshifted:
+            guesses *= 2
+        else:
+            guesses *= sum(_choose(shifted + unshifted, i) for i in range(1, min(shifted, unshifted) + 1))
+    return guesses
+
+
+# Function to collect sequence, repeat and keyboard matches
+def _pattern_matches(password, matches):
+    for pattern in find_patterns(password):
+        token = password[pattern.start:pattern.end]
+        if pattern.kind == "sequence":
+            if token[0] in "aAzZ019":
+                base = 4
+            elif token[0].isdigit():
+                base = 10
+            else:
+                base = 26
+            if pattern.detail == "descending":
+                base *= 2
+            guesses = base * len(token)
+        elif pattern.kind == "repeat":
+            guesses = (BRUTEFORCE_CARDINALITY + 1) * len(token)
+        else:
+            guesses = _spatial_guesses(token, pattern.detail)
+        matches.append(GuessMatch(pattern.kind, pattern.start, pattern.end, math.log10(guesses), pattern.detail))
+
+
+# Function to turn three numbers into a valid (year, month, day), or None
+def _as_date(first, second, third):
+    for year, month, day in ((third, second, first), (third, first, second),
+                             (first, second, third), (first, third, second)):
+        if year < 100:
+            year += 1900 if year > 50 else 2000
+        if 1000 <= year <= 2050 and 1 <= month <= 12 and 1 <= day <= 31:
+            return year, month, day
+    return None
+
+
+# Day and month written together as 2 to 4 digits, in either order, mapped
+# to (month, day); the first reading wins for ambiguous strings like "111"
+_DAY_MONTH = {}
+for _day_first in (True, False):
+    for _month in range(1, 13):
+        for _day in range(1, 32):
+            for _month_text in (str(_month), "%02d" % _month):
+                for _day_text in (str(_day), "%02d" % _day):
+                    _key = _day_text + _month_text if _day_first else _month_text + _day_text
+                    _DAY_MONTH.setdefault(_key, (_month, _day))
+del _day_first, _month, _day, _month_text, _day_text, _key
+# Years written as 4 digits (within the plausible range) and as 2 digits
+_YEARS_4 = {"%04d" % year: year for year in range(1000, 2051)}
+_YEARS_2 = {"%02d" % year: year + (1900 if year > 50 else 2000) for year in range(100)}
+# For each span a date written without separators can take, longest first:
+# (year length, year before the day and month, day-month length) in the
+# order they are tried
+_SPAN_PLACEMENTS = tuple(
+    (span, tuple((year_length, year_first, span - year_length)
+                 for year_length, year_first in ((2, True), (4, True), (4, False), (2, False))
+                 if 2 <= span - year_length <= 4))
+    for span in range(8, 3, -1)
+)
+
+
+# Function to find the dates written without separators in a run of digits:
+# a 2 or 4 digit year with the day and month (2 to 4 digits) on either side,
+# as (start, end, (year, month, day)). A date inside a longer one saves
+# fewer guesses and _date_matches would drop it, so each start tries the
+# longest spans first, stops at the first date, and skips spans ending
+# inside the dates already found; the year closest to today wins within a
+# span.
+def _unseparated_dates(digits):
+    length = len(digits)
+    # The 2, 3 and 4 digits starting at each position, read as a day and
+    # month and as a year (None when they are not one), padded so spans
+    # running past the end read None
+    pairs = list(map(add, digits, digits[1:]))
+    triples = map(add, pairs, digits[2:])
+    quads = list(map(add, pairs, pairs[2:]))
+    padding = [None] * 8
+    month_days = (None, None, list(map(_DAY_MONTH.get, pairs)) + padding,
+                  list(map(_DAY_MONTH.get, triples)) + padding, list(map(_DAY_MONTH.get, quads)) + padding)
+    years = (None, None, list(map(_YEARS_2.get, pairs)) + padding, None, list(map(_YEARS_4.get, quads)) + padding)
+
+    found = []
+    covered_to = 0
+    for start in range(length - 3):
+        for span, placements in _SPAN_PLACEMENTS:
+            end = start + span
+            if end <= covered_to:
+                break
+            if end > length:
+                continue
+            best = None
+            # Leftmost year first, then the shorter one, on ties
+            for year_length, year_first, rest_length in placements:
+                if year_first:
+                    year = years[year_length][start]
+                    month_day = month_days[rest_length][start + year_length]
+                else:
+                    year = years[year_length][end - year_length]
+                    month_day = month_days[rest_length][start]
+                if month_day is not None and year is not None and (
+                        best is None or abs(year - REFERENCE_YEAR) < abs(best[0] - REFERENCE_YEAR)):
+                    best = (year,) + month_day
+            if best is not None:
+                found.append((start, end, best))
+                covered_to = end
+                break
+    return found
+
+
+# Function to estimate guesses for a date in a given year
+def _date_guesses(year, separated):
+    guesses = max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE) * 365
+    return guesses * 4 if separated else guesses
+
+
+# log10 of _date_guesses by (year, separated); digit runs hold dozens of
+# dates over a handful of years
+_DATE_GUESSES_LOG10 = {}
+_LOG10_BRUTEFORCE = math.log10(BRUTEFORCE_CARDINALITY)
+# Adds one to every byte, to count the dates over each character
+_ONE_MORE = bytes(range(1, 256)) + b"\xff"
+
+
+# Function to collect year and date matches
+def _date_matches(password, matches):
+    for match in _YEAR_RE.finditer(password):
+        year_space = max(abs(int(match.group()) - REFERENCE_YEAR), MIN_YEAR_SPACE)
+        matches.append(GuessMatch("year", match.start(), match.end(), math.log10(year_space), match.group()))
+
+    dates = []
+    for match in _SEPARATED_DATE_RE.finditer(password):
+        date = _as_date(int(match.group(1)), int(match.group(3)), int(match.group(4)))
+        if date is not None:
+            dates.append(_date_candidate(match.start(), match.end(), date, True))
+    for run in _DIGITS_RE.finditer(password):
+        offset = run.start()
+        for start, end, date in _unseparated_dates(run.group()):
+            dates.append(_date_candidate(offset + start, offset + end, date, False))
+    if not dates:
+        return
+
+    # A long digit run reads as a date at almost every position, and every
+    # date the sequence search weighs costs it time. Dates are kept in order
+    # of the guesses they save over brute force (the longer on a tie) until
+    # MAX_DATES_PER_POSITION of them cover a character, so a run holds a few
+    # dates instead of one per digit
+    dates.sort()
+    covering = bytearray(len(password))
+    kept = []
+    for candidate in dates:
+        start, end = candidate[2], candidate[3]
+        if covering.find(MAX_DATES_PER_POSITION, start, end) < 0:
+            covering[start:end] = covering[start:end].translate(_ONE_MORE)
+            kept.append(candidate)
+    kept.sort(key=itemgetter(2))
+    for _, _, start, end, guesses_log10, date in kept:
+        matches.append(GuessMatch("date", start, end, guesses_log10, "%04d-%02d-%02d" % date))
+
+
+# Function to describe a date found at [start, end) as (log10 guesses over
+# those of brute force, -length, start, end, log10 guesses, date), which
+# sorts the dates saving the most first
+def _date_candidate(start, end, date, separated):
+    guesses_log10 = _DATE_GUESSES_LOG10.get((date[0], separated))
+    if guesses_log10 is None:
+        guesses_log10 = _DATE_GUESSES_LOG10[date[0], separated] = math.log10(_date_guesses(date[0], separated))
+    return guesses_log10 - (end - start) * _LOG10_BRUTEFORCE, start - end, start, end, guesses_log10, date
+
+
+# Function to find every candidate match in a password
+def find_matches(password):
+    matches = []
+    _dictionary_matches(password, matches)
+    _pattern_matches(password, matches)
+    _date_matches(password, matches)
+    return matches
+
+
+_LOG10_FACTORIALS = [0.0]
+_LOG10_MIN_GUESSES = math.log10(MIN_GUESSES_BEFORE_GROWING_SEQUENCE)
+_LOG10_2 = math.log10(2)
+_LOG10_MIN_SUBMATCH_SINGLE_CHAR = math.log10(MIN_SUBMATCH_GUESSES_SINGLE_CHAR)
+_LOG10_MIN_SUBMATCH_MULTI_CHAR = math.log10(MIN_SUBMATCH_GUESSES_MULTI_CHAR)
+
+
+# Function to score l matches with a guess product of 10**log_product,
+# i.e. log10(l! * product + MIN_GUESSES_BEFORE_GROWING_SEQUENCE**(l - 1)),
+# kept in log space so very long passwords cannot overflow a float
+def _sequence_guesses_log10(log_product, length):
+    while len(_LOG10_FACTORIALS) <= length:
+        _LOG10_FACTORIALS.append(_LOG10_FACTORIALS[-1] + math.log10(len(_LOG10_FACTORIALS)))
+    first = _LOG10_FACTORIALS[length] + log_product
+    second = (length - 1) * _LOG10_MIN_GUESSES
+    high, low = max(first, second), min(first, second)
+    return high + math.log10(1 + 10 ** (low - high))
+
+
+# Function to find the most guessable match sequence for a password; only
+# the first MAX_ESTIMATE_LENGTH characters are matched, the rest is scored
+# as one brute-force segment
+@metrics.timed("estimate")
+def most_guessable_sequence(password, matches=None):
+    length = len(password)
+    if length <= MAX_ESTIMATE_LENGTH:
+        return _most_guessable_sequence(password, matches)
+
+    if matches is not None:
+        matches = [match for match in matches if match.end <= MAX_ESTIMATE_LENGTH]
+    _, sequence = _most_guessable_sequence(password[:MAX_ESTIMATE_LENGTH], matches)
+    tail = (length - MAX_ESTIMATE_LENGTH) * math.log10(BRUTEFORCE_CARDINALITY)
+    last = sequence[-1]
+    if last.pattern == "bruteforce":
+        sequence[-1] = last._replace(end=length, guesses_log10=last.guesses_log10 + tail)
+    else:
+        sequence.append(GuessMatch("bruteforce", MAX_ESTIMATE_LENGTH, length, tail, None))
+    score = _sequence_guesses_log10(sum(match.guesses_log10 for match in sequence), len(sequence))
+    return score, sequence
+
+
+# Function to find the most guessable match sequence for the whole password
+def _most_guessable_sequence(password, matches=None):
+    length = len(password)
+    if matches is None:
+        matches = find_matches(password)
+    if not length:
+        return 0.0, []
+    _sequence_guesses_log10(0.0, length + 2)
+    log_cardinality = math.log10(BRUTEFORCE_CARDINALITY)
+
+    # Matches that do not cover the whole password get a minimum guess count;
+    # a match no cheaper than brute-forcing its characters can never help
+    kept = []
+    segment_ends = {length}
+    for match in matches:
+        span = match.end - match.start
+        if span < length:
+            floor = _LOG10_MIN_SUBMATCH_SINGLE_CHAR if span == 1 else _LOG10_MIN_SUBMATCH_MULTI_CHAR
+            if match.guesses_log10 < floor:
+                match = match._replace(guesses_log10=floor)
+        if match.guesses_log10 < span * log_cardinality:
+            kept.append(match)
+            segment_ends.add(match.start)
+    segment_ends = sorted(segment_ends)
+
+    # remaining[k] is the smallest log product that can cover password[k:],
+    # ignoring how many matches it takes. Following those choices from the
+    # start, or brute-forcing everything, gives the ceiling to beat.
+    starting_at = [[] for _ in range(length + 1)]
+    for match in kept:
+        starting_at[match.start].append(match)
+    remaining = [0.0] * (length + 1)
+    choice = [None] * (length + 1)
+    for position in range(length - 1, -1, -1):
+        remaining[position] = log_cardinality + remaining[position + 1]
+        for match in starting_at[position]:
+            if match.guesses_log10 + remaining[match.end] < remaining[position]:
+                remaining[position] = match.guesses_log10 + remaining[match.end]
+                choice[position] = match
+    position = count = 0
+    while position < length:
+        count += 1
+        if choice[position] is not None:
+            position = choice[position].end
+        else:
+            while position < length and choice[position] is None:
+                position += 1
+    ceiling = min(_sequence_guesses_log10(remaining[0], count),
+                  _sequence_guesses_log10(length * log_cardinality, 1)) + 1e-9
+
+    # Layer l holds the lowest log product of the prefix coverings by
+    # exactly l segments, per position where one ends in a match and per
+    # position where one ends in a brute-force segment, with back pointers
+    # kept apart. A gap never follows a gap, and only ends where a match can
+    # start or at the end. Scores only grow with l and with the product, so
+    # a covering whose product plus the cheapest possible rest already
+    # scores above the ceiling (lowered to the best complete covering as
+    # layers finish) is dropped. Each layer only walks the positions still
+    # alive, and the layers stop when none are.
+    factorials = _LOG10_FACTORIALS
+    infinity = float("inf")
+    # Matches by start as (end, guesses, remaining at the end, rank, match);
+    # on equal products the match found first wins
+    leaving = [[] for _ in range(length + 1)]
+    for rank, match in enumerate(kept):
+        leaving[match.start].append((match.end, match.guesses_log10, remaining[match.end], rank, match))
+    by_match, by_gap = {0: 0.0}, {}
+    # Lowest log10(l! * product) of the coverings kept so far that end at
+    # each position in a match and in a gap
+    match_weight = [infinity] * (length + 1)
+    gap_weight = [infinity] * (length + 1)
+    layers = [(None, None)]
+    best_score, best_count, best_gap = None, 0, False
+    count = 0
+    while by_match or by_gap:
+        count += 1
+        if (count - 1) * _LOG10_MIN_GUESSES > ceiling:
+            break
+        # A covering that stops short of the end needs another segment
+        bound = ceiling - factorials[count + 1]
+        final_bound = ceiling - factorials[count]
+        next_match, next_gap = {}, {}
+        match_from, gap_from = {}, {}
+        # After a match first, so on equal products no gap is inserted
+        for after_gap, reached in ((False, by_match), (True, by_gap)):
+            for start, value in reached.items():
+                for end, guesses, rest, rank, match in leaving[start]:
+                    total = value + guesses
+                    if total + rest > (bound if end < length else final_bound):
+                        continue
+                    current = next_match.get(end)
+                    if current is None or total < current or total == current and rank < match_from[end][2]:
+                        next_match[end] = total
+                        match_from[end] = (match, after_gap, rank)
+
+        if by_match:
+            sources = sorted(by_match)
+            sources.append(length)
+            lowest = infinity
+            lowest_start = None
+            index = 0
+            for end in segment_ends[bisect_right(segment_ends, sources[0]):]:
+                while sources[index] < end:
+                    start = sources[index]
+                    value = by_match[start] - start * log_cardinality
+                    if value < lowest:
+                        lowest, lowest_start = value, start
+                    index += 1
+                value = lowest + end * log_cardinality
+                if value + remaining[end] <= (bound if end < length else final_bound):
+                    next_gap[end] = value
+                    gap_from[end] = lowest_start
+
+        layers.append((match_from, gap_from))
+        for at_gap, value in ((False, next_match.pop(length, infinity)), (True, next_gap.pop(length, infinity))):
+            if value < infinity:
+                score = _sequence_guesses_log10(value, count)
+                if best_score is None or score < best_score:
+                    best_score, best_count, best_gap = score, count, at_gap
+                    # Later layers only have to beat the best found so far
+                    ceiling = min(ceiling, score + 1e-9)
+        # A covering of the same prefix by fewer segments wins every
+        # completion unless its product is larger by more than the factorial
+        # it saves ((l + k)! / l! only grows with the k segments still to
+        # come), and one ending in a match can go on as one ending in a gap
+        # can, so states no lighter than such an earlier one are dropped
+        offset = factorials[count]
+        for end, value in list(next_match.items()):
+            if value + offset >= match_weight[end]:
+                del next_match[end]
+            else:
+                match_weight[end] = value + offset
+        for end, value in list(next_gap.items()):
+            if value + offset >= match_weight[end] or value + offset >= gap_weight[end]:
+                del next_gap[end]
+            else:
+                gap_weight[end] = value + offset
+        by_match, by_gap = next_match, next_gap
+
+    sequence = []
+    position = length
+    at_gap = best_gap
+    for count in range(best_count, 0, -1):
+        match_from, gap_from = layers[count]
+        if at_gap:
+            start = gap_from[position]
+            sequence.append(GuessMatch("bruteforce", start, position, (position - start) * log_cardinality, None))
+            position, at_gap = start, False
+        else:
+            match, at_gap, _ = match_from[position]
+            sequence.append(match)
+            position = match.start
+    sequence.reverse()
+    return best_score, sequence
+
+
+# Function to describe a duration the way people think about crack times
+def display_time(seconds):
+    if seconds < 1:
+        return "less than a second"
+    for unit, size in (("century", 100 * 365.25 * 86400), ("year", 365.25 * 86400), ("month", 30.44 * 86400),
+                       ("day", 86400), ("hour", 3600), ("minute", 60), ("second", 1)):
+        if seconds >= size:
+            if unit == "century" and seconds >= 100 * size:
+                return "centuries"
+            amount = int(round(seconds / size))
+            if amount == 1:
+                return "1 %s" % unit
+            return "%d %s" % (amount, "centuries" if unit == "century" else unit + "s")
+
+
+# Function to get the time every attack model needs for a guess count,
+# in seconds and as display text
+def crack_times(guesses_log10):
+    crack_times_seconds = {}
+    crack_times_display = {}
+    for key, _, rate in ATTACK_MODELS:
+        seconds = 10 ** min(guesses_log10, 300) / rate
+        crack_times_seconds[key] = seconds
+        crack_times_display[key] = display_time(seconds)
+    return crack_times_seconds, crack_times_display
+
+
+# Function to estimate guesses and crack times for a password
+def estimate_guesses(password):
+    guesses_log10, sequence = most_guessable_sequence(password)
+    crack_times_seconds, crack_times_display = crack_times(guesses_log10)
+    return {
+        "guesses_log10": guesses_log10,
+        "sequence": sequence,
+        "crack_times_seconds": crack_times_seconds,
+        "crack_times_display": crack_times_display,
+    }
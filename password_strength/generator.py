@@ -0,0 +1,138 @@
+# Password generation from the operating system's CSPRNG.
+#
+# Random bytes are drawn from secrets.token_bytes in large blocks and mapped
+# to the alphabet with one bytes.translate call: a byte b is kept as
+# alphabet[b % n] only when b < 256 - 256 % n and deleted otherwise, so every
+# character is exactly equally likely (rejection sampling) and the hot loop
+# runs in C. Passwords that miss a selected category are rejected as a whole,
+# which keeps the output uniform over all passwords meeting the guarantees.
+#
+# Bulk output from the command line goes through bulk_generate.py.
+import os
+import secrets
+import string
+from itertools import islice
+
+# Character categories in the order of the include_* options
+CATEGORIES = (
+    string.ascii_uppercase,
+    string.ascii_lowercase,
+    string.digits,
+    string.punctuation,
+)
+# Used when no category is selected
+DEFAULT_CHARACTERS = string.ascii_letters + string.digits
+
+# Random bytes requested from the operating system at a time
+BLOCK_SIZE = 1 << 16
+
+
+# Function to pick the categories a password must contain
+def _selected_categories(include_uppercase, include_lowercase, include_numbers, include_special):
+    flags = (include_uppercase, include_lowercase, include_numbers, include_special)
+    return tuple(category for category, include in zip(CATEGORIES, flags) if include)
+
+
+# Function to build the byte translation that maps random bytes onto an
+# alphabet, deleting the bytes that would bias it
+def _sampling_table(alphabet):
+    alphabet = alphabet.encode("ascii")
+    limit = 256 - 256 % len(alphabet)
+    table = bytes(alphabet[value % len(alphabet)] if value < limit else 0 for value in range(256))
+    return table, bytes(range(limit, 256))
+
+
+# Function to stream unbiased random characters from an alphabet, one block at a time
+def random_characters(alphabet, block_size=BLOCK_SIZE):
+    table, rejected = _sampling_table(alphabet)
+    while True:
+        yield secrets.token_bytes(block_size).translate(table, rejected).decode("ascii")
+
+
+# Function to count the passwords of a length over the alphabet that hold
+# at least one character of every category, by inclusion-exclusion over
+# the categories left out (they never share characters)
+def password_space(length, categories, alphabet):
+    total = 0
+    for mask in range(1 << len(categories)):
+        excluded = sum(len(category) for index, category in enumerate(categories) if mask >> index & 1)
+        total += (-1) ** bin(mask).count("1") * (len(alphabet) - excluded) ** length
+    return total
+
+
+# Function to generate passwords lazily; count=None streams forever
+def generate_passwords(count=None, length=12, include_uppercase=True, include_lowercase=True,
+                       include_numbers=True, include_special=True, unique=False):
+    if count is not None:
+        if count < 0:
+            raise ValueError("count must not be negative")
+        if not count:
+            return
+    if length < 1:
+        raise ValueError("length must be at least 1")
+    categories = _selected_categories(include_uppercase, include_lowercase, include_numbers, include_special)
+    alphabet = "".join(categories) or DEFAULT_CHARACTERS
+    # Room for one character of every selected category, as before
+    length = max(length, len(categories))
+    required = tuple(frozenset(category) for category in categories)
+    # Unique mode remembers what it has produced in a set: O(1) per password
+    seen = None
+    if unique:
+        if count is not None and count > password_space(length, categories, alphabet):
+            raise ValueError("cannot generate %d unique passwords of length %d with these character sets"
+                             % (count, length))
+        seen = set()
+
+    # Small requests only read what they are likely to need
+    block_size = BLOCK_SIZE if count is None else min(BLOCK_SIZE, max(256, 4 * count * length))
+    produced = 0
+    pending = ""
+    for block in random_characters(alphabet, max(block_size, 2 * length)):
+        block = pending + block
+        end = len(block) - len(block) % length
+        for start in range(0, end, length):
+            password = block[start:start + length]
+            if any(category.isdisjoint(password) for category in required):
+                continue
+            if seen is not None:
+                if password in seen:
+                    continue
+                seen.add(password)
+            yield password
+            produced += 1
+            if produced == count:
+                return
+        pending = block[end:]
+
+
+# Function to generate a secure password
+def generate_password(length=12, include_uppercase=True, include_lowercase=True,
+                      include_numbers=True, include_special=True):
+    return next(generate_passwords(1, length, include_uppercase, include_lowercase,
+                                   include_numbers, include_special))
+
+
+# Function to write lines to a text file (or file object) in chunks
+def _write_lines(destination, lines, chunk_size=10000):
+    if isinstance(destination, (str, os.PathLike)):
+        handle = open(destination, "w", encoding="utf-8")
+    else:
+        handle = destination
+    try:
+        written = 0
+        while True:
+            chunk = list(islice(lines, chunk_size))
+            if not chunk:
+                break
+            handle.write("\n".join(chunk))
+            handle.write("\n")
+            written += len(chunk)
+    finally:
+        if handle is not destination:
+            handle.close()
+    return written
+
+
+# Function to write generated passwords to a text file (or file object), one per line
+def write_passwords(destination, count, chunk_size=10000, **options):
+    return _write_lines(destination, generate_passwords(count, **options), chunk_size)
@@ -0,0 +1,412 @@
+# Password-check history.
+#
+# Every check is kept in two places:
+#
+# - In memory, a ring of the last few checks per session (masked the way
+#   the UI shows them), bounded in both entries per session and sessions,
+#   so the history view never touches the database.
+# - On disk, when a database is configured, one row per check in SQLite
+#   (WAL mode, so readers never block the writer). Rows hold a keyed
+#   BLAKE2b hash of the password and its length, never the password or its
+#   masked form. A background thread batches inserts into one transaction
+#   per batch, so recording a check costs a queue put; when the queue is
+#   full, checks are dropped from disk (and counted) rather than blocking.
+#   A batch the database refuses is dropped and counted the same way, with
+#   a RuntimeWarning, and the writer carries on.
+#   Requests (forget, maintain, flush, close) wait a bounded time for room
+#   and return False rather than hang behind a backed-up writer.
+#
+# The same transaction adds each check to a per-day rollup of strength
+# levels, so daily_distribution reads a few rows per day whatever the size
+# of the checks table. Retention deletes old rows (and rows past max_rows)
+# in bounded chunks along the timestamp index, then frees pages with an
+# incremental vacuum and truncates the WAL.
+#
+#     PASSWORD_HISTORY_DB=/var/lib/password-strength/history.db streamlit run app.py
+import atexit
+import collections
+import datetime
+import hashlib
+import os
+import queue
+import secrets
+import threading
+import time
+import warnings
+
+from . import metrics
+
+# Environment variable naming the history database to open on first use
+HISTORY_ENV = "PASSWORD_HISTORY_DB"
+# Environment variable holding the hash key (hex); otherwise one is kept in "<db>.key"
+HISTORY_KEY_ENV = "PASSWORD_HISTORY_KEY"
+KEY_SUFFIX = ".key"
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 0.5
+DEFAULT_MAX_PENDING = 100000
+DEFAULT_RECENT_SIZE = 10
+DEFAULT_MAX_SESSIONS = 10000
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_MAINTENANCE_INTERVAL = 3600.0
+# Seconds forget and maintain wait for room in a full queue before giving up
+DEFAULT_REQUEST_TIMEOUT = 1.0
+# Rows deleted per statement during retention, so no delete holds the lock long
+DELETE_CHUNK = 10000
+# Pages freed per incremental vacuum
+VACUUM_PAGES = 4096
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checks (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    session TEXT,
+    digest BLOB NOT NULL,
+    length INTEGER NOT NULL,
+    level TEXT NOT NULL,
+    percentage REAL NOT NULL,
+    guesses_log10 REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS checks_ts ON checks (ts);
+CREATE INDEX IF NOT EXISTS checks_session ON checks (session) WHERE session IS NOT NULL;
+CREATE TABLE IF NOT EXISTS daily_levels (
+    day INTEGER NOT NULL,
+    level TEXT NOT NULL,
+    checks INTEGER NOT NULL,
+    PRIMARY KEY (day, level)
+) WITHOUT ROWID;
+"""
+INSERT_CHECK = ("INSERT INTO checks (ts, session, digest, length, level, percentage, guesses_log10) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)")
+ADD_TO_ROLLUP = ("INSERT INTO daily_levels (day, level, checks) VALUES (?, ?, ?) "
+                 "ON CONFLICT (day, level) DO UPDATE SET checks = checks + excluded.checks")
+
+
+# Function to mask a password for display, keeping at most three
+# characters at each end
+def mask_password(password):
+    if len(password) > 6:
+        return password[:3] + "*" * (len(password) - 6) + password[-3:]
+    return "*" * len(password)
+
+
+# Function to get the UTC day number of a timestamp
+def day_number(timestamp):
+    return int(timestamp // 86400)
+
+
+# Function to load the hash key of a database, creating it on first use
+def _history_key(path):
+    key = os.environ.get(HISTORY_KEY_ENV)
+    if key:
+        return bytes.fromhex(key)
+    key_path = path + KEY_SUFFIX
+    try:
+        with open(key_path, "rb") as handle:
+            return handle.read()
+    except FileNotFoundError:
+        pass
+    key = secrets.token_bytes(32)
+    try:
+        descriptor = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Another process created it first
+        with open(key_path, "rb") as handle:
+            return handle.read()
+    with os.fdopen(descriptor, "wb") as handle:
+        handle.write(key)
+    return key
+
+
+# Function to open a connection with the pragmas every history connection uses
+def _connect(path, read_only=False):
+    import sqlite3
+    if read_only:
+        import pathlib
+        # as_uri escapes the characters ("?", "#", "%") a URI would misread
+        uri = pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+        connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    else:
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.executescript(SCHEMA)
+    connection.execute("PRAGMA busy_timeout = 5000")
+    return connection
+
+
+class HistoryStore:
+    # Keep recent checks in memory and, when path is given, every check in
+    # that SQLite database; retention_days and max_rows bound the database
+    # (None for no bound)
+    def __init__(self, path=None, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 max_pending=DEFAULT_MAX_PENDING, recent_size=DEFAULT_RECENT_SIZE, max_sessions=DEFAULT_MAX_SESSIONS,
+                 retention_days=DEFAULT_RETENTION_DAYS, max_rows=None,
+                 maintenance_interval=DEFAULT_MAINTENANCE_INTERVAL):
+        self.path = os.fspath(path) if path is not None else None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.recent_size = recent_size
+        self.max_sessions = max_sessions
+        self.retention_days = retention_days
+        self.max_rows = max_rows
+        self.maintenance_interval = maintenance_interval
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        # session -> deque of display entries, least recently used first
+        self._recent = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        if self.path is not None:
+            self._key = _history_key(self.path)
+            # Created here so schema errors surface to the caller, then
+            # handed to the writer thread, the only one that uses it
+            self._connection = _connect(self.path)
+            self._queue = queue.Queue(max_pending)
+            self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    # Function to record one check: returns the display entry added to the
+    # session's recent list and queues the row for the database
+    def record(self, password, result, session=None, when=None):
+        when = time.time() if when is None else when
+        entry = {
+            "password": mask_password(password),
+            "strength": result.level_name,
+            "timestamp": datetime.datetime.fromtimestamp(when).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with self._lock:
+            recent = self._recent.get(session)
+            if recent is None:
+                recent = self._recent[session] = collections.deque(maxlen=self.recent_size)
+                if len(self._recent) > self.max_sessions:
+                    self._recent.popitem(last=False)
+            else:
+                self._recent.move_to_end(session)
+            recent.append(entry)
+
+        if self._queue is not None:
+            digest = hashlib.blake2b(password.encode("utf-8", "surrogatepass"), digest_size=16, key=self._key).digest()
+            row = (when, session, digest, len(password), result.level_name, result.strength_percentage,
+                   result.guesses_log10)
+            try:
+                self._queue.put_nowait(("check", row))
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+        return entry
+
+    # Function to list a session's recent checks, oldest first
+    def recent(self, session=None):
+        with self._lock:
+            return list(self._recent.get(session, ()))
+
+    # Function to forget a session: its recent list now, its rows once the
+    # writer reaches the request (the anonymous daily counts are kept);
+    # returns False when the queue stayed full and the rows are kept
+    def forget(self, session, timeout=DEFAULT_REQUEST_TIMEOUT):
+        with self._lock:
+            self._recent.pop(session, None)
+        if self._queue is not None and session is not None:
+            return self._request("forget", session, timeout)
+        return True
+
+    # Function to run retention now instead of at the next interval;
+    # returns False when the queue stayed full
+    def maintain(self, timeout=DEFAULT_REQUEST_TIMEOUT):
+        if self._queue is None:
+            return True
+        return self._request("maintain", None, timeout)
+
+    # Function to wait until everything queued so far is written; returns
+    # False on timeout
+    def flush(self, timeout=None):
+        if self._queue is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self._request("flush", done, timeout):
+            return False
+        return done.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    # Function to write what is queued and stop the writer; returns False
+    # when the writer is still running after timeout
+    def close(self, timeout=10.0):
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        deadline = time.monotonic() + timeout
+        if not self._request("close", None, timeout):
+            return False
+        self._thread.join(max(0.0, deadline - time.monotonic()))
+        return not self._thread.is_alive()
+
+    # Function to queue a request for the writer thread, waiting at most
+    # timeout for room (None waits as long as it takes); a request that
+    # finds the queue still full is not queued, and is warned about
+    def _request(self, kind, value, timeout):
+        try:
+            self._queue.put((kind, value), timeout=timeout)
+        except queue.Full:
+            warnings.warn("history %s request not queued: the writer's queue is full" % kind, RuntimeWarning)
+            return False
+        return True
+
+    # Function to report the writer's counters
+    def stats(self):
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "sessions": len(self._recent),
+        }
+
+    # Function to count checks per strength level for each UTC day, as
+    # {"YYYY-MM-DD": {level: checks}}; start and end are dates, inclusive
+    def daily_distribution(self, start=None, end=None):
+        if self.path is None:
+            return {}
+        first = (start - datetime.date(1970, 1, 1)).days if start is not None else -(1 << 62)
+        last = (end - datetime.date(1970, 1, 1)).days if end is not None else 1 << 62
+        connection = _connect(self.path, read_only=True)
+        try:
+            rows = connection.execute(
+                "SELECT day, level, checks FROM daily_levels WHERE day BETWEEN ? AND ? ORDER BY day",
+                (first, last)).fetchall()
+        finally:
+            connection.close()
+        distribution = {}
+        for day, level, checks in rows:
+            date = (datetime.date(1970, 1, 1) + datetime.timedelta(days=day)).isoformat()
+            distribution.setdefault(date, {})[level] = checks
+        return distribution
+
+    # Function to count how often a password was checked since a timestamp,
+    # by its hash (uses the timestamp index)
+    def times_checked(self, password, since=0.0):
+        if self.path is None:
+            return 0
+        digest = hashlib.blake2b(password.encode("utf-8", "surrogatepass"), digest_size=16, key=self._key).digest()
+        connection = _connect(self.path, read_only=True)
+        try:
+            return connection.execute("SELECT count(*) FROM checks WHERE ts >= ? AND digest = ?",
+                                      (since, digest)).fetchone()[0]
+        finally:
+            connection.close()
+
+    # Writer thread: take up to batch_size items, waiting at most
+    # flush_interval for a batch to fill, and apply them in order
+    def _run(self):
+        connection = self._connection
+        next_maintenance = time.monotonic()
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1][0] == "check":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            rows = [value for kind, value in batch if kind == "check"]
+            if rows:
+                try:
+                    with metrics.stage("history.write"):
+                        self._write(connection, rows)
+                except Exception as error:
+                    with self._lock:
+                        self.dropped += len(rows)
+                    self._report_error("writing %d checks" % len(rows), error)
+            for kind, value in batch:
+                if kind == "forget":
+                    try:
+                        with connection:
+                            connection.execute("DELETE FROM checks WHERE session = ?", (value,))
+                    except Exception as error:
+                        self._report_error("forgetting a session", error)
+                elif kind == "maintain":
+                    next_maintenance = 0.0
+                elif kind == "flush":
+                    value.set()
+                elif kind == "close":
+                    running = False
+            if time.monotonic() >= next_maintenance:
+                try:
+                    self._retain(connection)
+                except Exception as error:
+                    self._report_error("retention", error)
+                next_maintenance = time.monotonic() + self.maintenance_interval
+        connection.close()
+
+    # Function to count and warn about a failed database step; the writer
+    # keeps running, so a locked or full database costs the batch, not the
+    # thread (flush would otherwise wait forever)
+    def _report_error(self, action, error):
+        self.errors += 1
+        if metrics.enabled:
+            metrics.count("history_errors_total")
+        warnings.warn("history %s failed: %s: %s" % (action, type(error).__name__, error), RuntimeWarning)
+
+    # Function to insert a batch of rows and add them to the daily rollup
+    # in one transaction
+    def _write(self, connection, rows):
+        rollup = collections.Counter((day_number(row[0]), row[4]) for row in rows)
+        with connection:
+            connection.executemany(INSERT_CHECK, rows)
+            connection.executemany(ADD_TO_ROLLUP, ((day, level, checks) for (day, level), checks in rollup.items()))
+        self.written += len(rows)
+
+    # Function to delete rows past the retention period or the row cap, a
+    # chunk at a time, then give the freed pages back
+    def _retain(self, connection):
+        deleted = 0
+        if self.retention_days is not None:
+            cutoff = time.time() - self.retention_days * 86400
+            while True:
+                with connection:
+                    count = connection.execute(
+                        "DELETE FROM checks WHERE id IN (SELECT id FROM checks WHERE ts < ? LIMIT ?)",
+                        (cutoff, DELETE_CHUNK)).rowcount
+                deleted += count
+                if count < DELETE_CHUNK:
+                    break
+        if self.max_rows is not None:
+            # Row ids only grow, so the newest max_rows rows are the ids above
+            # max(id) - max_rows; this never counts the table
+            newest = connection.execute("SELECT max(id) FROM checks").fetchone()[0] or 0
+            oldest = connection.execute("SELECT min(id) FROM checks").fetchone()[0] or 0
+            limit = newest - self.max_rows
+            for start in range(oldest, limit + 1, DELETE_CHUNK):
+                with connection:
+                    deleted += connection.execute("DELETE FROM checks WHERE id >= ? AND id < ?",
+                                                  (start, min(start + DELETE_CHUNK, limit + 1))).rowcount
+        if deleted:
+            connection.execute("PRAGMA incremental_vacuum(%d)" % VACUUM_PAGES)
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+_history_store = None
+
+
+# Function to keep history in a database (None for memory only)
+def configure_history(path=None, **options):
+    global _history_store
+    if _history_store is not None:
+        _history_store.close()
+    _history_store = HistoryStore(path, **options)
+    return _history_store
+
+
+# Function to get the active history store
+def get_history_store():
+    if _history_store is None:
+        configure_history(os.environ.get(HISTORY_ENV) or None)
+    return _history_store
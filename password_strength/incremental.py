@@ -0,0 +1,158 @@
+# Incremental evaluation for live strength meters.
+#
+# While a password is typed, each keystroke appends one character, so the
+# criteria and score can be kept up to date from a small state instead of
+# re-analyzing the whole password: the character classes seen, the current
+# run length of every sequence, repeat and keyboard-walk kind, how many
+# characters patterns cover, and the banned-term matcher's state. Appending
+# a character updates that state in O(1); a snapshot is kept per character,
+# so deleting from the end is a truncation and an edit in the middle resumes
+# from the snapshot just before it.
+#
+# mask, percentage and level are always current and exactly what
+# analyze_password and strength_percentage give for the whole password.
+# result() builds the same dict as evaluate_password_strength; its crack
+# times come from the guess estimator, which still looks at the whole
+# password, so call it when the text settles rather than on every key.
+from .banned import get_banned_matcher
+from .engine import (
+    LENGTH,
+    MIN_LENGTH,
+    NO_COMMON,
+    NO_SEQUENTIAL,
+    NUMBERS,
+    STRENGTH_LEVELS,
+    _CLASS_TABLE,
+    evaluation_result,
+    strength_level_index,
+    strength_percentage,
+)
+from .patterns import REPEAT, STEP_FLAGS, _RUN_KINDS
+
+_RUN_FLAGS = tuple(flag for flag, _, _, _ in _RUN_KINDS)
+# Steps (not characters) a run needs before it counts as a pattern
+_RUN_MIN_STEPS = tuple(min_length - 1 for _, _, min_length, _ in _RUN_KINDS)
+# Lowercasing a capital sigma depends on the characters around it (final
+# sigma), so banned terms are matched over the whole text once one appears
+_CONTEXTUAL_LOWERCASE = "Σ"
+
+
+class IncrementalEvaluator:
+    # Start tracking a password (empty by default)
+    def __init__(self, password=""):
+        self._matcher = None
+        self._reset()
+        self.update(password)
+
+    def _reset(self):
+        self._matcher = get_banned_matcher()
+        self._chars = []
+        # State after each prefix: (class mask, run lengths, covered characters,
+        # end of the covered span, matcher state, banned term found, contextual)
+        self._states = [(0, (0,) * len(_RUN_KINDS), 0, 0, None, False, False)]
+
+    @property
+    def password(self):
+        return "".join(self._chars)
+
+    def __len__(self):
+        return len(self._chars)
+
+    # Function to move to a new value of the password, reusing the state of
+    # the prefix it shares with the current one
+    def update(self, password):
+        if get_banned_matcher() is not self._matcher:
+            self._reset()
+        current = self.password
+        if password.startswith(current):
+            keep = len(current)
+        elif current.startswith(password):
+            keep = len(password)
+        else:
+            keep = 0
+            while current[keep] == password[keep]:
+                keep += 1
+        self.truncate(keep)
+        self.extend(password[keep:])
+        return self
+
+    # Function to drop characters from the end, back to a given length
+    def truncate(self, length):
+        del self._chars[length:]
+        del self._states[length + 1:]
+
+    # Function to append text one character at a time
+    def extend(self, text):
+        for char in text:
+            self.append(char)
+
+    # Function to append one character in O(1)
+    def append(self, char):
+        classes, runs, covered, covered_end, banned_state, banned, contextual = self._states[-1]
+        index = len(self._chars)
+
+        if char < "\x80":
+            marker = _CLASS_TABLE[ord(char)]
+            if marker:
+                classes |= ord(marker)
+        elif char.isdecimal():
+            classes |= NUMBERS
+
+        # Every run ending here covers [index - steps, index]; runs reaching
+        # their minimum never start before an existing covered gap, so the
+        # covered span only grows at its end
+        if index:
+            previous = self._chars[-1]
+            step = STEP_FLAGS.get(previous + char, 0)
+            if previous == char:
+                step |= REPEAT
+            runs = tuple(run + 1 if step & flag else 0 for run, flag in zip(runs, _RUN_FLAGS))
+            longest = max((run for run, min_steps in zip(runs, _RUN_MIN_STEPS) if run >= min_steps), default=0)
+            if longest:
+                covered += index + 1 - max(index - longest, covered_end)
+                covered_end = index + 1
+
+        if not banned:
+            banned_state, banned = self._matcher.advance(banned_state, char)
+        contextual = contextual or char == _CONTEXTUAL_LOWERCASE
+
+        self._chars.append(char)
+        self._states.append((classes, runs, covered, covered_end, banned_state, banned, contextual))
+
+    # Function to tell whether the password contains a banned term
+    def _banned(self):
+        _, _, _, _, _, banned, contextual = self._states[-1]
+        if contextual:
+            return self._matcher.search(self.password)
+        return banned
+
+    # Number of characters in sequences, repeats or keyboard walks
+    @property
+    def patterned(self):
+        return self._states[-1][2]
+
+    # Bitmask of the criteria the password meets, as criteria_mask gives it
+    @property
+    def mask(self):
+        mask = self._states[-1][0]
+        if len(self._chars) >= MIN_LENGTH:
+            mask |= LENGTH
+        if not self._banned():
+            mask |= NO_COMMON
+        if not self.patterned:
+            mask |= NO_SEQUENTIAL
+        return mask
+
+    @property
+    def percentage(self):
+        return strength_percentage(self.mask, len(self._chars), self.patterned)
+
+    # (name, color) of the strength band, for the meter
+    @property
+    def level(self):
+        _, name, color = STRENGTH_LEVELS[strength_level_index(self.percentage)]
+        return name, color
+
+    # Function to build the full evaluation, identical to evaluate_password_strength
+    def result(self):
+        return evaluation_result(self.password, self.mask, self.patterned)
@@ -0,0 +1,389 @@
+# Opt-in instrumentation: stage latency histograms, counters and sampled
+# cProfile captures, exported in the Prometheus text format.
+#
+# Recording is off unless PASSWORD_METRICS (or PASSWORD_METRICS_FILE /
+# PASSWORD_METRICS_PORT) is set or configure_metrics() turns it on. Hot
+# paths check the module-level `enabled` flag before doing anything, so
+# when it is off the cost is one global lookup per instrumented call.
+#
+# The same hooks serve every entry point:
+#
+#     with metrics.stage("ui.check", sample=True):   # time a block
+#     @metrics.timed("breach")                        # time every call
+#     metrics.count("passwords_total", source="cli")  # count events
+#
+# A stage opened with sample=True is also profiled with cProfile when
+# captures have been requested (request_profiles, POST /profile on the
+# metrics endpoint or the service) and the sampling rate picks it; each
+# capture is written as a .prof file that pstats or snakeviz can read.
+#
+# Worker processes hand what they recorded back with drain() and the
+# parent folds it in with merge(), so a pool reports as one process.
+# render_metrics() gives the Prometheus text; serve_metrics() exposes it
+# on a local HTTP endpoint and export_metrics() writes it to a file
+# (for node_exporter's textfile collector) at an interval.
+#
+# Every entry point imports this module, so the profiler, the HTTP server
+# and what they need are imported only when a capture or the endpoint is
+# first used.
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+
+METRICS_ENV = "PASSWORD_METRICS"
+METRICS_FILE_ENV = "PASSWORD_METRICS_FILE"
+METRICS_PORT_ENV = "PASSWORD_METRICS_PORT"
+PROFILE_DIR_ENV = "PASSWORD_PROFILE_DIR"
+
+PREFIX = "password_strength_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_EXPORT_INTERVAL = 15.0
+# Created under the temporary directory unless PASSWORD_PROFILE_DIR is set
+PROFILE_DIR_NAME = "password-strength-profiles"
+
+# Upper bounds of the latency histogram buckets, in seconds
+BUCKETS = (0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+           0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Help text of the counters the package records
+COUNTER_HELP = {
+    "requests_total": "Service requests answered, by route and status.",
+    "passwords_total": "Passwords scored, by entry point.",
+    "cache_lookups_total": "Result cache lookups, by result.",
+    "profiles_total": "cProfile captures written, by stage.",
+}
+
+# Checked on hot paths before anything is recorded
+enabled = any(os.environ.get(name, "") not in ("", "0") for name in (METRICS_ENV, METRICS_FILE_ENV, METRICS_PORT_ENV))
+
+_lock = threading.Lock()
+# stage -> observations per bucket (the last one past every bound), then the sum
+_histograms = {}
+# (name, ((label, value), ...)) -> value
+_counters = {}
+# name -> (help, function returning the value or None)
+_gauges = {}
+# [directory, captures left, sampling rate] while captures are requested
+_profiles = None
+# Running exporters, by file path or (host, port)
+_exporters = {}
+
+
+# Function to record how long one stage took
+def observe(stage, seconds):
+    index = bisect_left(BUCKETS, seconds)
+    with _lock:
+        histogram = _histograms.get(stage)
+        if histogram is None:
+            histogram = _histograms[stage] = [0] * (len(BUCKETS) + 2)
+        histogram[index] += 1
+        histogram[-1] += seconds
+
+
+# Function to add to a counter
+def count(name, amount=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+# Function to read a counter back (0 if never counted)
+def counter_value(name, **labels):
+    return _counters.get((name, tuple(sorted(labels.items()))), 0)
+
+
+# Function to add a gauge computed when the metrics are rendered
+def register_gauge(name, help_text, function):
+    _gauges[name] = (help_text, function)
+
+
+# Function to consume one profile capture, if captures are requested and
+# the sampling rate picks this call; returns the directory to write to
+def take_profile_sample():
+    global _profiles
+    if _profiles is None:
+        return None
+    import random
+    with _lock:
+        profiles = _profiles
+        if profiles is None or random.random() >= profiles[2]:
+            return None
+        profiles[1] -= 1
+        if profiles[1] <= 0:
+            _profiles = None
+        return profiles[0]
+
+
+# Function to request cProfile captures of the next sampled stages
+def request_profiles(captures=1, rate=1.0, directory=None):
+    global _profiles
+    if captures < 1 or not 0 < rate <= 1:
+        raise ValueError("captures must be at least 1 and rate in (0, 1]")
+    if not directory:
+        import tempfile
+        directory = os.environ.get(PROFILE_DIR_ENV) or os.path.join(tempfile.gettempdir(), PROFILE_DIR_NAME)
+    os.makedirs(directory, exist_ok=True)
+    with _lock:
+        _profiles = [directory, captures, rate]
+    return directory
+
+
+class _Stage:
+    __slots__ = ("name", "sample", "started", "profiler", "directory")
+
+    def __init__(self, name, sample):
+        self.name = name
+        self.sample = sample
+        self.profiler = None
+
+    def __enter__(self):
+        if self.sample:
+            self.directory = take_profile_sample()
+            if self.directory is not None:
+                import cProfile
+                profiler = cProfile.Profile()
+                try:
+                    profiler.enable()
+                    self.profiler = profiler
+                except ValueError:
+                    # Another profiler is running (a capture in another thread)
+                    pass
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        if self.profiler is not None:
+            self.profiler.disable()
+            name = "%s-%d-%d.prof" % (self.name.replace("/", "_"), os.getpid(), time.time_ns() // 1000)
+            self.profiler.dump_stats(os.path.join(self.directory, name))
+            if enabled:
+                count("profiles_total", stage=self.name)
+        if enabled:
+            observe(self.name, elapsed)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+# Function to time a block as one stage (and, with sample=True, profile it
+# when a capture is requested); a shared no-op when there is nothing to do
+def stage(name, sample=False):
+    if enabled or (sample and _profiles is not None):
+        return _Stage(name, sample)
+    return _NULL_STAGE
+
+
+# Function to time every call of a function as one stage
+def timed(name):
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+# Function to take (and reset) what this process recorded, for a parent
+# process to merge(); None when recording is off
+def drain():
+    global _histograms, _counters
+    if not enabled:
+        return None
+    with _lock:
+        snapshot = {"histograms": _histograms, "counters": list(_counters.items())}
+        _histograms = {}
+        _counters = {}
+    return snapshot
+
+
+# Function to fold in what another process recorded
+def merge(snapshot):
+    if not snapshot:
+        return
+    with _lock:
+        for stage_name, counts in snapshot["histograms"].items():
+            histogram = _histograms.get(stage_name)
+            if histogram is None:
+                _histograms[stage_name] = list(counts)
+            else:
+                for index, value in enumerate(counts):
+                    histogram[index] += value
+        for key, value in snapshot["counters"]:
+            key = (key[0], tuple(map(tuple, key[1])))
+            _counters[key] = _counters.get(key, 0) + value
+
+
+# Function to clear everything recorded
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+# Function to format label pairs
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{%s}" % ",".join('%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+                             for name, value in pairs)
+
+
+# Function to render everything recorded in the Prometheus text format
+def render_metrics():
+    with _lock:
+        histograms = {name: list(counts) for name, counts in _histograms.items()}
+        counters = sorted(_counters.items())
+
+    lines = []
+    if histograms:
+        name = PREFIX + "stage_seconds"
+        lines += ["# HELP %s Time spent in each instrumented stage." % name, "# TYPE %s histogram" % name]
+        for stage_name in sorted(histograms):
+            counts = histograms[stage_name]
+            cumulative = 0
+            for bound, observations in zip(BUCKETS, counts):
+                cumulative += observations
+                lines.append("%s_bucket%s %d" % (name, _labels((("stage", stage_name), ("le", repr(bound)))),
+                                                 cumulative))
+            cumulative += counts[len(BUCKETS)]
+            lines.append("%s_bucket%s %d" % (name, _labels((("stage", stage_name), ("le", "+Inf"))), cumulative))
+            lines.append("%s_sum%s %r" % (name, _labels((("stage", stage_name),)), counts[-1]))
+            lines.append("%s_count%s %d" % (name, _labels((("stage", stage_name),)), cumulative))
+
+    current = None
+    for (counter, labels), value in counters:
+        if counter != current:
+            current = counter
+            lines += ["# HELP %s%s %s" % (PREFIX, counter, COUNTER_HELP.get(counter, counter.replace("_", " "))),
+                      "# TYPE %s%s counter" % (PREFIX, counter)]
+        lines.append("%s%s%s %s" % (PREFIX, counter, _labels(labels), value))
+
+    for gauge, (help_text, function) in sorted(_gauges.items()):
+        value = function()
+        if value is not None:
+            lines += ["# HELP %s%s %s" % (PREFIX, gauge, help_text), "# TYPE %s%s gauge" % (PREFIX, gauge),
+                      "%s%s %r" % (PREFIX, gauge, value)]
+    return "\n".join(lines) + "\n"
+
+
+# Function to write the metrics to a file in one step, so a collector
+# reading it never sees half a file
+def write_metrics(path):
+    tmp_path = os.fspath(path) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        handle.write(render_metrics())
+    os.replace(tmp_path, path)
+
+
+# Function to keep rewriting the metrics file from a background thread
+def export_metrics(path, interval=DEFAULT_EXPORT_INTERVAL):
+    path = os.fspath(path)
+    if path in _exporters:
+        return _exporters[path]
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                write_metrics(path)
+            except OSError:
+                pass
+
+    thread = threading.Thread(target=run, name="metrics-export", daemon=True)
+    _exporters[path] = thread
+    thread.start()
+    return thread
+
+
+_handler_class = None
+
+
+# Function to build the request handler of the metrics endpoint on first use
+def _metrics_handler():
+    global _handler_class
+    if _handler_class is not None:
+        return _handler_class
+    import json
+    from http.server import BaseHTTPRequestHandler
+    from urllib.parse import parse_qs, urlsplit
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if urlsplit(self.path).path != "/metrics":
+                return self._reply(404, "text/plain", "not found\n")
+            self._reply(200, CONTENT_TYPE, render_metrics())
+
+        # POST /profile?captures=5&rate=0.1 requests cProfile captures
+        def do_POST(self):
+            url = urlsplit(self.path)
+            if url.path != "/profile":
+                return self._reply(404, "text/plain", "not found\n")
+            query = parse_qs(url.query)
+            try:
+                directory = request_profiles(int(query.get("captures", ["1"])[0]), float(query.get("rate", ["1"])[0]))
+            except ValueError as error:
+                return self._reply(400, "text/plain", "%s\n" % error)
+            self._reply(200, "application/json", json.dumps({"directory": directory}))
+
+        def _reply(self, status, content_type, text):
+            data = text.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    _handler_class = _MetricsHandler
+    return _handler_class
+
+
+# Function to serve GET /metrics and POST /profile from a background thread
+def serve_metrics(port, host="127.0.0.1"):
+    if (host, port) in _exporters:
+        return _exporters[host, port]
+    from http.server import ThreadingHTTPServer
+    server = ThreadingHTTPServer((host, port), _metrics_handler())
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    _exporters[host, port] = server
+    return server
+
+
+# Function to turn recording on or off, optionally exporting to a file
+# and/or a local HTTP port
+def configure_metrics(on=True, path=None, port=None, interval=DEFAULT_EXPORT_INTERVAL):
+    global enabled
+    enabled = bool(on)
+    if enabled and path:
+        export_metrics(path, interval)
+    if enabled and port:
+        serve_metrics(int(port))
+
+
+# Function to start the exporters PASSWORD_METRICS_FILE and
+# PASSWORD_METRICS_PORT name; safe to call on every rerun
+def start_exporters():
+    if enabled:
+        configure_metrics(True, os.environ.get(METRICS_FILE_ENV) or None, os.environ.get(METRICS_PORT_ENV) or None)
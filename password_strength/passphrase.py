@@ -0,0 +1,170 @@
+# Diceware-style passphrases.
+#
+# Words are picked uniformly from the memory-mapped word list (see
+# wordlist.py) using 32-bit integers cut from large blocks of CSPRNG output,
+# with values above the last multiple of the list size rejected so no word
+# is favoured. The entropy figure counts every equally likely outcome of
+# the generator, which is the passphrase's entropy only if no two outcomes
+# read the same. check_passphrase_settings refuses the settings where they
+# can, and generate_passphrases applies it: an empty separator, one found
+# inside a word or (with digits) in the digit block, words that read like
+# the digit block, and capitalization that makes two words read the same
+# or (for "random") leaves a word unchanged.
+import math
+import secrets
+import threading
+from array import array
+from collections import OrderedDict
+from itertools import chain
+
+from .generator import BLOCK_SIZE, _write_lines
+from .wordlist import get_wordlist
+
+# How words are capitalized: left alone, all capitalized, or each one
+# capitalized at random (one extra bit per word)
+CAPITALIZATION = ("none", "words", "random")
+MAX_DIGITS = 9
+# Passphrases whose words are read from the list in one go
+PASSPHRASE_BATCH = 1024
+# Accepted settings remembered, so a caller cycling through separators
+# cannot grow the memory without bound
+MAX_CHECKED_SETTINGS = 256
+
+
+# Function to stream lists of unbiased random integers in [0, n), one list
+# per block of random bytes
+def random_below_blocks(n, block_size=BLOCK_SIZE):
+    if not 0 < n <= 1 << 32:
+        raise ValueError("n must be between 1 and 2**32")
+    limit = (1 << 32) - (1 << 32) % n
+    while True:
+        values = array("I", secrets.token_bytes(block_size - block_size % 4))
+        yield [value % n for value in values if value < limit]
+
+
+# Function to stream unbiased random integers in [0, n)
+def random_below(n, block_size=BLOCK_SIZE):
+    return chain.from_iterable(random_below_blocks(n, block_size))
+
+
+# Settings already checked, as (word list, separator, capitalize, digits),
+# least recently used first
+_checked_settings = OrderedDict()
+_checked_lock = threading.Lock()
+
+
+# Function to refuse passphrase settings under which two different draws
+# can give the same passphrase, so passphrase_entropy would overstate it
+def check_passphrase_settings(separator="-", capitalize="none", digits=0, wordlist=None):
+    if wordlist is None:
+        wordlist = get_wordlist()
+    key = (wordlist, separator, capitalize, digits)
+    with _checked_lock:
+        if key in _checked_settings:
+            _checked_settings.move_to_end(key)
+            return
+    if not separator:
+        raise ValueError("the separator must not be empty: words run together can be split more than one way")
+    if digits and separator.isdigit():
+        raise ValueError("the separator must not be digits when a digit block is added")
+    forms = set()
+    for word in wordlist.raw_words(range(len(wordlist))):
+        word = word.decode("utf-8")
+        if separator in word:
+            raise ValueError("the separator %r occurs in the word %r; choose another" % (separator, word))
+        if digits and len(word) == digits and word.isdigit():
+            raise ValueError("the word %r reads like the digit block" % word)
+        if capitalize == "none":
+            continue
+        capitalized = word.capitalize()
+        if capitalize == "random" and capitalized == word:
+            raise ValueError("capitalize='random' leaves the word %r unchanged" % word)
+        for form in (capitalized, word) if capitalize == "random" else (capitalized,):
+            if form in forms:
+                raise ValueError("capitalize=%r makes two words read %r" % (capitalize, form))
+            forms.add(form)
+    with _checked_lock:
+        _checked_settings[key] = True
+        if len(_checked_settings) > MAX_CHECKED_SETTINGS:
+            _checked_settings.popitem(last=False)
+
+
+# Function to compute the entropy in bits of a passphrase setting, exact
+# for the settings check_passphrase_settings accepts
+def passphrase_entropy(words=6, capitalize="none", digits=0, list_size=None):
+    if list_size is None:
+        list_size = len(get_wordlist())
+    bits = words * math.log2(list_size)
+    if capitalize == "random":
+        bits += words
+    if digits:
+        # The digit block can sit before, between or after the words
+        bits += digits * math.log2(10) + math.log2(words + 1)
+    return bits
+
+
+# Function to generate passphrases lazily; count=None streams forever
+def generate_passphrases(count=None, words=6, separator="-", capitalize="none", digits=0,
+                         unique=False, wordlist=None):
+    if count is not None:
+        if count < 0:
+            raise ValueError("count must not be negative")
+        if not count:
+            return
+    if words < 1:
+        raise ValueError("a passphrase needs at least one word")
+    if capitalize not in CAPITALIZATION:
+        raise ValueError("capitalize must be one of %s" % ", ".join(CAPITALIZATION))
+    if not 0 <= digits <= MAX_DIGITS:
+        raise ValueError("digits must be between 0 and %d" % MAX_DIGITS)
+    if wordlist is None:
+        wordlist = get_wordlist()
+    check_passphrase_settings(separator, capitalize, digits, wordlist)
+    if unique and count is not None and math.log2(count) > passphrase_entropy(words, capitalize, digits, len(wordlist)):
+        raise ValueError("cannot generate %d unique passphrases with these settings" % count)
+
+    # Small requests only read what they are likely to need
+    block_size = BLOCK_SIZE if count is None else min(BLOCK_SIZE, max(256, 8 * count * words))
+    index_blocks = random_below_blocks(len(wordlist), block_size)
+    word_indexes = []
+    coin_flips = random_below(2, block_size) if capitalize == "random" else None
+    digit_blocks = random_below(10 ** digits) if digits else None
+    positions = random_below(words + 1) if digits else None
+    seen = set() if unique else None
+    # Words stay UTF-8 bytes until the passphrase is joined
+    joiner = separator.encode("utf-8")
+
+    produced = 0
+    while count is None or produced < count:
+        # Words are fetched for a batch of passphrases at a time
+        batch = PASSPHRASE_BATCH if count is None else min(PASSPHRASE_BATCH, count - produced)
+        while len(word_indexes) < batch * words:
+            word_indexes += next(index_blocks)
+        chosen = wordlist.raw_words(word_indexes[:batch * words])
+        del word_indexes[:batch * words]
+        if capitalize == "words":
+            chosen = [word.decode("utf-8").capitalize().encode("utf-8") for word in chosen]
+        elif capitalize == "random":
+            chosen = [word.decode("utf-8").capitalize().encode("utf-8") if flip else word
+                      for word, flip in zip(chosen, coin_flips)]
+        for start in range(0, len(chosen), words):
+            parts = chosen[start:start + words]
+            if digits:
+                parts.insert(next(positions), b"%0*d" % (digits, next(digit_blocks)))
+            passphrase = joiner.join(parts).decode("utf-8")
+            if seen is not None:
+                if passphrase in seen:
+                    continue
+                seen.add(passphrase)
+            yield passphrase
+            produced += 1
+
+
+# Function to generate a single passphrase
+def generate_passphrase(words=6, separator="-", capitalize="none", digits=0):
+    return next(generate_passphrases(1, words, separator, capitalize, digits))
+
+
+# Function to write generated passphrases to a text file (or file object), one per line
+def write_passphrases(destination, count, chunk_size=10000, **options):
+    return _write_lines(destination, generate_passphrases(count, **options), chunk_size)
@@ -0,0 +1,176 @@
+# Sequence, repeat and keyboard-walk detection.
+#
+# Every step between neighbouring characters is classified with a single
+# lookup in a table built at import time, giving one flag per pattern kind:
+# ascending and descending runs within the alphabet or the digits ("xyz",
+# "987"), repeated characters ("aaaa") and walks across adjacent keys on
+# several keyboard layouts ("qwerty", "1qaz", "azer"). Runs of flagged steps
+# are then found by regex scans over the encoded steps, so the whole pass is
+# O(length) and runs mostly in C.
+import re
+from collections import namedtuple
+from functools import reduce
+from operator import add, and_, or_
+
+MIN_SEQUENCE_LENGTH = 3
+MIN_REPEAT_LENGTH = 3
+MIN_KEYBOARD_LENGTH = 4
+
+PatternMatch = namedtuple("PatternMatch", ["kind", "start", "end", "detail"])
+
+# Keyboard layouts as rows of (unshifted keys, shifted keys, x offset of the
+# first key in key widths). Spaces mark keys without a printable character.
+KEYBOARD_LAYOUTS = (
+    ("qwerty", (
+        ("`1234567890-=", "~!@#$%^&*()_+", 0.0),
+        ("qwertyuiop[]\\", "QWERTYUIOP{}|", 1.5),
+        ("asdfghjkl;'", "ASDFGHJKL:\"", 1.75),
+        ("zxcvbnm,./", "ZXCVBNM<>?", 2.25),
+    )),
+    ("qwertz", (
+        ("^1234567890ß´", "°!\"§$%&/()=?`", 0.0),
+        ("qwertzuiopü+", "QWERTZUIOPÜ*", 1.5),
+        ("asdfghjklöä#", "ASDFGHJKLÖÄ'", 1.75),
+        ("<yxcvbnm,.-", ">YXCVBNM;:_", 1.25),
+    )),
+    ("azerty", (
+        ("²&é\"'(-è_çà)=", " 1234567890°+", 0.0),
+        ("azertyuiop^$", "AZERTYUIOP¨£", 1.5),
+        ("qsdfghjklmù*", "QSDFGHJKLM%µ", 1.75),
+        ("<wxcvbn,;:!", ">WXCVBN?./§", 1.25),
+    )),
+    ("dvorak", (
+        ("`1234567890[]", "~!@#$%^&*(){}", 0.0),
+        ("',.pyfgcrl/=\\", "\"<>PYFGCRL?+|", 1.5),
+        ("aoeuidhtns-", "AOEUIDHTNS_", 1.75),
+        (";qjkxbmwvz", ":QJKXBMWVZ", 2.25),
+    )),
+)
+LAYOUT_NAMES = tuple(name for name, _ in KEYBOARD_LAYOUTS)
+
+
+# Function to build the table of adjacent key pairs for every layout
+def _build_adjacency():
+    pairs = {}
+    for layout_index, (_, rows) in enumerate(KEYBOARD_LAYOUTS):
+        keys = []
+        for row_index, (unshifted, shifted, offset) in enumerate(rows):
+            for column, chars in enumerate(zip(unshifted, shifted)):
+                keys.append((row_index, offset + column, "".join(set(chars) - {" "})))
+        for row, x, chars in keys:
+            for other_row, other_x, other_chars in keys:
+                same_row_neighbour = row == other_row and abs(x - other_x) == 1
+                next_row_neighbour = abs(row - other_row) == 1 and abs(x - other_x) < 1
+                if same_row_neighbour or next_row_neighbour:
+                    for char in chars:
+                        for other_char in other_chars:
+                            pair = char + other_char
+                            pairs[pair] = pairs.get(pair, 0) | (1 << layout_index)
+    return pairs
+
+
+# Two-character strings mapped to the bitmask of layouts where the keys touch
+ADJACENT_KEYS = _build_adjacency()
+
+# Position of every letter and digit in its alphabet; the two alphabets are
+# far enough apart that no step between them can look like +1 or -1
+SEQUENCE_CODES = {}
+for _index, _char in enumerate("abcdefghijklmnopqrstuvwxyz"):
+    SEQUENCE_CODES[_char] = SEQUENCE_CODES[_char.upper()] = _index
+for _index, _char in enumerate("0123456789"):
+    SEQUENCE_CODES[_char] = 100 + _index
+del _index, _char
+
+# Flags describing the step between two neighbouring characters
+ASCENDING = 1 << 0
+DESCENDING = 1 << 1
+REPEAT = 1 << 2
+KEYBOARD_SHIFT = 3
+
+# (flag, kind, minimum run length in characters, detail) for every run type
+_RUN_KINDS = (
+    (ASCENDING, "sequence", MIN_SEQUENCE_LENGTH, "ascending"),
+    (DESCENDING, "sequence", MIN_SEQUENCE_LENGTH, "descending"),
+    (REPEAT, "repeat", MIN_REPEAT_LENGTH, None),
+) + tuple(
+    (1 << (KEYBOARD_SHIFT + layout), "keyboard", MIN_KEYBOARD_LENGTH, name)
+    for layout, name in enumerate(LAYOUT_NAMES)
+)
+_ALL_FLAGS = (1 << (KEYBOARD_SHIFT + len(KEYBOARD_LAYOUTS))) - 1
+
+
+# Function to build the step flags for every ASCII pair and every adjacent
+# key pair; only repeats and alphabet neighbours are visited, not all
+# 128 x 128 pairs, so the table costs little at import
+def _build_step_flags():
+    flags = {char + char: REPEAT for char in map(chr, range(128))}
+    chars_by_code = {}
+    for char, code in SEQUENCE_CODES.items():
+        chars_by_code.setdefault(code, []).append(char)
+    for first, code in SEQUENCE_CODES.items():
+        for difference, step in ((1, ASCENDING), (-1, DESCENDING)):
+            for second in chars_by_code.get(code + difference, ()):
+                flags[first + second] = flags.get(first + second, 0) | step
+    for pair, layouts in ADJACENT_KEYS.items():
+        flags[pair] = flags.get(pair, 0) | layouts << KEYBOARD_SHIFT
+    return flags
+
+
+STEP_FLAGS = _build_step_flags()
+
+# One regex per run type matching consecutive steps that carry its flag,
+# applied to the steps encoded as one character per flag value
+_RUN_PATTERNS = tuple(
+    re.compile("[%s]{%d,}" % ("".join(re.escape(chr(value)) for value in range(_ALL_FLAGS + 1) if value & flag),
+                              min_length - 1))
+    for flag, _, min_length, _ in _RUN_KINDS
+)
+
+
+# Function to find every sequence, repeat and keyboard walk in a password
+def find_patterns(password):
+    matches = []
+    if len(password) < MIN_SEQUENCE_LENGTH:
+        return matches
+
+    # Classify every step with one dict lookup; the only step the table can
+    # miss is a repeated non-ASCII character
+    steps = [STEP_FLAGS.get(pair, 0) for pair in map(add, password, password[1:])]
+    if not password.isascii():
+        for index, (first, second) in enumerate(zip(password, password[1:])):
+            if first == second:
+                steps[index] |= REPEAT
+    # Every run spans at least two consecutive steps, so only flags shared by
+    # neighbouring steps can start one
+    present = reduce(or_, map(and_, steps, steps[1:]), 0)
+    if not present:
+        return matches
+
+    encoded = "".join(map(chr, steps))
+    keyboard_spans = set()
+    for (flag, kind, _, detail), pattern in zip(_RUN_KINDS, _RUN_PATTERNS):
+        if not present & flag:
+            continue
+        for run in pattern.finditer(encoded):
+            start, end = run.start(), run.end() + 1
+            if kind == "keyboard":
+                if (start, end) in keyboard_spans:
+                    continue
+                keyboard_spans.add((start, end))
+            elif kind == "repeat":
+                detail = password[start]
+            matches.append(PatternMatch(kind, start, end, detail))
+
+    matches.sort(key=lambda match: (match.start, match.end))
+    return matches
+
+
+# Function to count the characters covered by at least one pattern
+def pattern_coverage(matches):
+    covered = 0
+    end = 0
+    for match in sorted(matches, key=lambda match: match.start):
+        if match.end > end:
+            covered += match.end - max(match.start, end)
+            end = match.end
+    return covered
@@ -0,0 +1,401 @@
+# Configurable password policies.
+#
+# The built-in rules (the criteria, 8 characters, the 30/50/70/90 bands,
+# the length and variety bonuses, the pattern penalty and the suggestion
+# text) are one policy. Others are declared in JSON files, for example:
+#
+#     {
+#         "name": "tenant-a",
+#         "min_length": 12,
+#         "criteria": ["length", "uppercase", "lowercase", "numbers", "no_common"],
+#         "levels": [{"below": 40, "name": "Rejected", "color": "#FF0000"},
+#                    {"below": 80, "name": "Acceptable", "color": "#FFCC00"},
+#                    {"name": "Good", "color": "#00CC00"}],
+#         "suggestions": {"length": "Use at least 12 characters"}
+#     }
+#
+# Any key left out keeps its built-in value (see DEFAULT_CONFIG). A policy
+# is compiled once, when its file is loaded: the character-class table for
+# its special characters, the score of every criteria mask, the length
+# bonus for every length below the cap and the band bounds are all
+# precomputed, and the analysis is a closure bound to them that skips the
+# checks the policy does not use. Scoring a password against a policy
+# therefore costs the same as the hand-written default path.
+#
+# PASSWORD_POLICIES (or configure_policies) names a policy file or a
+# directory of them. Files are checked for changes at most once every
+# RELOAD_INTERVAL seconds (MISS_RELOAD_INTERVAL for a name not yet
+# defined) and recompiled when they change; a file that no longer loads
+# keeps its last good policy. Policies are chosen per call by name with
+# get_policy.
+import json
+import os
+import time
+import warnings
+from bisect import bisect_right
+from itertools import count
+
+from . import metrics
+from .banned import get_banned_matcher
+from .engine import (
+    ALL_CRITERIA,
+    CRITERIA,
+    LENGTH,
+    MAX_PATTERN_PENALTY,
+    MIN_LENGTH,
+    NO_COMMON,
+    NO_SEQUENTIAL,
+    NUMBERS,
+    PATTERN_PENALTY_PER_CHAR,
+    SPECIAL_CHARACTERS,
+    STRENGTH_LEVELS,
+    VARIETY_MASK,
+)
+from .estimator import most_guessable_sequence
+from .patterns import find_patterns, pattern_coverage
+from .result import PasswordResult
+
+# Environment variable naming a policy file or directory to load on first use
+POLICIES_ENV = "PASSWORD_POLICIES"
+POLICY_SUFFIX = ".json"
+DEFAULT_NAME = "default"
+# Seconds between checks of the policy files for changes
+RELOAD_INTERVAL = 1.0
+# Seconds a name that is not defined stays unknown before another lookup
+# of it checks the files again; "default" and unknown names would
+# otherwise rescan the source on every call
+MISS_RELOAD_INTERVAL = 0.1
+
+CRITERIA_KEYS = tuple(key for key, _, _ in CRITERIA)
+_CRITERIA_BITS = {key: 1 << index for index, key in enumerate(CRITERIA_KEYS)}
+_CHARACTER_SETS = (
+    ("ABCDEFGHIJKLMNOPQRSTUVWXYZ", _CRITERIA_BITS["uppercase"]),
+    ("abcdefghijklmnopqrstuvwxyz", _CRITERIA_BITS["lowercase"]),
+    ("0123456789", NUMBERS),
+)
+
+# The built-in policy, as a policy file would spell it
+DEFAULT_CONFIG = {
+    "name": DEFAULT_NAME,
+    "min_length": MIN_LENGTH,
+    "criteria": list(CRITERIA_KEYS),
+    "special_characters": SPECIAL_CHARACTERS,
+    "length_bonus_per_char": 2,
+    "max_length_bonus": 20,
+    "variety_bonus": 10,
+    "pattern_penalty_per_char": PATTERN_PENALTY_PER_CHAR,
+    "max_pattern_penalty": MAX_PATTERN_PENALTY,
+    "levels": [{"below": bound, "name": name, "color": color} if bound is not None else {"name": name, "color": color}
+               for bound, name, color in STRENGTH_LEVELS],
+    "descriptions": {},
+    "suggestions": {},
+}
+_NUMBER_KEYS = ("length_bonus_per_char", "max_length_bonus", "variety_bonus", "pattern_penalty_per_char",
+                "max_pattern_penalty")
+
+# Distinguishes recompiled versions of a policy in cache keys
+_versions = count(1)
+
+
+# Function to check a number field of a policy
+def _number(config, key, name):
+    value = config[key]
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError("policy %r: %r must be a non-negative number" % (name, key))
+    return value
+
+
+# Function to check and complete the strength bands of a policy
+def _levels(config, name):
+    levels = config["levels"]
+    if not isinstance(levels, list) or not levels:
+        raise ValueError("policy %r: 'levels' must be a non-empty list" % name)
+    compiled = []
+    previous = None
+    for position, level in enumerate(levels):
+        if not isinstance(level, dict) or not isinstance(level.get("name"), str):
+            raise ValueError("policy %r: every level needs a 'name'" % name)
+        bound = level.get("below")
+        last = position == len(levels) - 1
+        if last != (bound is None):
+            raise ValueError("policy %r: every level but the last needs a 'below' bound" % name)
+        if bound is not None:
+            if isinstance(bound, bool) or not isinstance(bound, (int, float)):
+                raise ValueError("policy %r: 'below' must be a number" % name)
+            if previous is not None and bound <= previous:
+                raise ValueError("policy %r: level bounds must increase" % name)
+            previous = bound
+        compiled.append((bound, level["name"], level.get("color", "#888888")))
+    return tuple(compiled)
+
+
+# Function to build the class table for a policy's special characters, in
+# the form engine._CLASS_TABLE has
+def _class_table(special_characters):
+    table = {code: None for code in range(128)}
+    for chars, bit in _CHARACTER_SETS + ((special_characters, _CRITERIA_BITS["special"]),):
+        for char in chars:
+            table[ord(char)] = chr(bit)
+    return table
+
+
+# Function to build the criteria analysis of a policy, doing only the
+# checks it uses
+def _compile_analyzer(class_table, min_length, enabled, need_patterns):
+    check_common = bool(enabled & NO_COMMON)
+    check_sequential = bool(enabled & NO_SEQUENTIAL)
+
+    def analyze(password):
+        mask = 0
+        for char in set(password.translate(class_table)):
+            if char < "\x80":
+                mask |= ord(char)
+            elif char.isdecimal():
+                mask |= NUMBERS
+        if len(password) >= min_length:
+            mask |= LENGTH
+        if check_common and not get_banned_matcher().search(password):
+            mask |= NO_COMMON
+        patterned = pattern_coverage(find_patterns(password)) if need_patterns else 0
+        if check_sequential and not patterned:
+            mask |= NO_SEQUENTIAL
+        return mask & enabled, patterned
+
+    return analyze
+
+
+class CompiledPolicy:
+    # Compile a policy from its config; keys left out keep their built-in values
+    def __init__(self, config, name=None):
+        unknown = set(config) - set(DEFAULT_CONFIG)
+        name = config.get("name", name or DEFAULT_NAME)
+        if unknown:
+            raise ValueError("policy %r: unknown keys %s" % (name, ", ".join(sorted(unknown))))
+        config = dict(DEFAULT_CONFIG, **config)
+        if not isinstance(name, str) or not name:
+            raise ValueError("'name' must be a non-empty string")
+        config["name"] = self.name = name
+        self.version = next(_versions)
+        self.config = config
+
+        keys = config["criteria"]
+        if not isinstance(keys, list) or not keys:
+            raise ValueError("policy %r: 'criteria' must be a non-empty list" % name)
+        for key in keys:
+            if key not in _CRITERIA_BITS:
+                raise ValueError("policy %r: unknown criterion %r" % (name, key))
+        min_length = config["min_length"]
+        if isinstance(min_length, bool) or not isinstance(min_length, int) or min_length < 0:
+            raise ValueError("policy %r: 'min_length' must be a non-negative integer" % name)
+        if not isinstance(config["special_characters"], str):
+            raise ValueError("policy %r: 'special_characters' must be a string" % name)
+        per_char, max_bonus, variety_bonus, penalty_per_char, max_penalty = (
+            _number(config, key, name) for key in _NUMBER_KEYS)
+        for field in ("descriptions", "suggestions"):
+            texts = config[field]
+            if not isinstance(texts, dict) or not all(isinstance(text, str) for text in texts.values()):
+                raise ValueError("policy %r: %r must map criteria to text" % (name, field))
+            if set(texts) - set(CRITERIA_KEYS):
+                raise ValueError("policy %r: %r names unknown criteria" % (name, field))
+
+        # Criteria in evaluation order: (bit, key, description, suggestion)
+        criteria = []
+        for bit, (key, description, suggestion) in zip((1 << index for index in range(len(CRITERIA))), CRITERIA):
+            if key not in keys:
+                continue
+            if key == "length" and min_length != MIN_LENGTH:
+                description = "At least %d characters" % min_length
+                suggestion = "Make your password longer (at least %d characters)" % min_length
+            criteria.append((bit, key, config["descriptions"].get(key, description),
+                             config["suggestions"].get(key, suggestion)))
+        self.criteria = tuple(criteria)
+        self.criteria_index = {key: bit for bit, key, _, _ in self.criteria}
+        self.enabled = sum(self.criteria_index.values())
+        self.levels = _levels(config, name)
+        self._bounds = tuple(bound for bound, _, _ in self.levels[:-1])
+
+        # Base score plus variety bonus for every possible criteria mask
+        variety = self.enabled & VARIETY_MASK
+        self._scores = tuple(
+            (bin(mask & self.enabled).count("1") / len(self.criteria)) * 100
+            + (variety_bonus if variety and mask & variety == variety else 0)
+            for mask in range(ALL_CRITERIA + 1)
+        )
+        # Length bonus for every length short of the cap
+        self._max_length_bonus = max_bonus if per_char else 0
+        bonuses = []
+        while True:
+            length = len(bonuses)
+            bonus = min(max_bonus, (length - min_length) * per_char) if length > min_length else 0
+            if bonus >= self._max_length_bonus:
+                break
+            bonuses.append(bonus)
+        self._length_bonuses = tuple(bonuses)
+        self._penalty_per_char = penalty_per_char
+        self._max_penalty = max_penalty
+        self.analyze = _compile_analyzer(_class_table(config["special_characters"]), min_length, self.enabled,
+                                         bool(self.enabled & NO_SEQUENTIAL or penalty_per_char and max_penalty))
+        # Policy recorded on the results (None on those of the built-in policy)
+        self.result_policy = self
+
+    # Key that tells this version of the policy apart in caches
+    @property
+    def key(self):
+        return self.name, self.version
+
+    def __repr__(self):
+        return "CompiledPolicy(%r, %d criteria, %d levels)" % (self.name, len(self.criteria), len(self.levels))
+
+    # Function to turn a criteria mask, length and patterned character count
+    # into a strength percentage
+    def percentage(self, mask, length, patterned=0):
+        bonuses = self._length_bonuses
+        length_bonus = bonuses[length] if length < len(bonuses) else self._max_length_bonus
+        pattern_penalty = min(self._max_penalty, patterned * self._penalty_per_char)
+        return max(0, min(100, self._scores[mask] + length_bonus - pattern_penalty))
+
+    # Function to find the index of the strength band for a percentage
+    def level_index(self, percentage):
+        return bisect_right(self._bounds, percentage)
+
+    # Function to evaluate a password into a compact result
+    @metrics.timed("score")
+    def evaluate_compact(self, password):
+        mask, patterned = self.analyze(password)
+        percentage = self.percentage(mask, len(password), patterned)
+        banned_terms = None
+        if self.enabled & NO_COMMON and not mask & NO_COMMON:
+            banned_terms = tuple(get_banned_matcher().matches(password)[:3]) or None
+        return PasswordResult(mask, percentage, bisect_right(self._bounds, percentage),
+                              most_guessable_sequence(password)[0], banned_terms, self.result_policy)
+
+    # Function to evaluate a password into the dict evaluate_password_strength returns
+    def evaluate(self, password):
+        return self.evaluate_compact(password).to_dict()
+
+
+# Function to compile a policy from a config dict
+def compile_policy(config, name=None):
+    if not isinstance(config, dict):
+        raise ValueError("a policy must be a JSON object")
+    return CompiledPolicy(config, name)
+
+
+# Function to load and compile a policy file; its name defaults to the file name
+def load_policy(path):
+    path = os.fspath(path)
+    with open(path, encoding="utf-8") as handle:
+        try:
+            config = json.load(handle)
+        except ValueError as error:
+            raise ValueError("%s: %s" % (path, error)) from None
+    return compile_policy(config, os.path.splitext(os.path.basename(path))[0])
+
+
+DEFAULT_POLICY = compile_policy(DEFAULT_CONFIG)
+# Results of the built-in policy are plain built-in results
+DEFAULT_POLICY.result_policy = None
+
+
+class PolicySet:
+    # Load the policies in a file or directory (None for none)
+    def __init__(self, source=None):
+        self.source = os.fspath(source) if source is not None else None
+        self.policies = {}
+        # path -> ((mtime, size), policy)
+        self._files = {}
+        self._checked = 0.0
+        self.reload(strict=True)
+
+    # Function to list the policy files of the source
+    def _paths(self):
+        if self.source is None:
+            return []
+        if os.path.isdir(self.source):
+            return sorted(os.path.join(self.source, name) for name in os.listdir(self.source)
+                          if name.endswith(POLICY_SUFFIX))
+        return [self.source]
+
+    # Function to recompile the files that changed since the last check;
+    # unless strict, a file that fails keeps its last good policy
+    def reload(self, strict=False):
+        files = {}
+        for path in self._paths():
+            previous = self._files.get(path)
+            try:
+                stat = os.stat(path)
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                if previous is not None and previous[0] == stamp:
+                    files[path] = previous
+                    continue
+                files[path] = (stamp, load_policy(path))
+            except (OSError, ValueError) as error:
+                if strict:
+                    raise
+                warnings.warn("keeping the last good policy: %s" % error, RuntimeWarning)
+                if previous is not None:
+                    files[path] = previous
+
+        policies = {}
+        for path, (_, policy) in files.items():
+            if policy.name in policies:
+                message = "policy %r is defined more than once (%s)" % (policy.name, path)
+                if strict:
+                    raise ValueError(message)
+                warnings.warn(message, RuntimeWarning)
+                continue
+            policies[policy.name] = policy
+        self._files = files
+        self.policies = policies
+        self._checked = time.monotonic()
+
+    # Function to get a policy by name, or None; picks up changed files first
+    # when they were last checked long enough ago, and sooner on a miss so a
+    # newly added file is found quickly
+    def get(self, name):
+        elapsed = time.monotonic() - self._checked
+        if elapsed >= RELOAD_INTERVAL:
+            self.reload()
+            elapsed = 0.0
+        policy = self.policies.get(name)
+        if policy is None and elapsed >= MISS_RELOAD_INTERVAL:
+            self.reload()
+            policy = self.policies.get(name)
+        return policy
+
+
+_policy_set = None
+
+
+# Function to load policies from a file or directory (None for the built-in only)
+def configure_policies(source=None):
+    global _policy_set
+    _policy_set = PolicySet(source)
+    return _policy_set
+
+
+# Function to get the active policy set
+def get_policy_set():
+    if _policy_set is None:
+        configure_policies(os.environ.get(POLICIES_ENV) or None)
+    return _policy_set
+
+
+# Function to get a policy by name; None, and "default" unless a file
+# defines it, give the built-in policy
+def get_policy(name=None):
+    if isinstance(name, CompiledPolicy):
+        return name
+    if name is None:
+        return DEFAULT_POLICY
+    policy = get_policy_set().get(name)
+    if policy is None:
+        if name == DEFAULT_NAME:
+            return DEFAULT_POLICY
+        raise ValueError("unknown password policy %r" % name)
+    return policy
+
+
+# Function to evaluate a password against a policy (by name or compiled)
+def evaluate_with_policy(password, policy=None):
+    return get_policy(policy).evaluate(password)
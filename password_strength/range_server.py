@@ -0,0 +1,266 @@
+# Stand-in k-anonymity range server for the breach corpus.
+#
+# The corpus is split into one partition file per 5-hex-digit SHA-1
+# prefix. Each file holds the response body for that prefix ("SUFFIX:COUNT"
+# lines, the Pwned Passwords format), so a request costs one file read,
+# and recently served partitions are kept in memory up to --cache-mb.
+# Files sit two levels deep (ABC/DE) so no directory holds more than 4096
+# entries. A prefix with no records has no file and gets an empty 200.
+#
+# Partitions are written from a breach index (see build_index.py), with
+# records streamed in order, into a temporary directory that replaces
+# the old one when complete. Restart the server after rebuilding.
+# Connections are HTTP/1.1 keep-alive, as in service.py.
+#
+#     python -m password_strength.range_server partitions/ --from-index breaches.idx --build-only
+#     python -m password_strength.range_server partitions/ --port 8081
+#
+#     GET /range/ABCDE      SUFFIX:COUNT lines for SHA-1 prefix ABCDE
+#     GET /health
+import argparse
+import asyncio
+import collections
+import json
+import os
+import shutil
+import signal
+import sys
+import time
+
+from . import metrics
+from .breach_index import BreachIndex
+from .breach_range import PREFIX_LENGTH, RANGE_PATH
+
+DEFAULT_PORT = 8081
+DEFAULT_CACHE_MB = 64
+MANIFEST = "manifest.json"
+MAX_HEADER_BYTES = 16384
+IDLE_TIMEOUT = 15.0
+_HEX_UPPER = frozenset("0123456789ABCDEF")
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+# Function to find the partition file of a prefix
+def partition_path(directory, prefix):
+    return os.path.join(directory, prefix[:3], prefix[3:])
+
+
+# Function to write sorted (digest, count) records as partition files,
+# replacing any partitions already in directory; returns the manifest
+def write_partitions(records, directory):
+    directory = os.fspath(directory).rstrip(os.sep)
+    tmp_directory = directory + ".tmp"
+    if os.path.exists(tmp_directory):
+        shutil.rmtree(tmp_directory)
+    os.makedirs(tmp_directory)
+
+    written = partitions = 0
+    current = None
+    lines = []
+
+    def flush():
+        folder = os.path.join(tmp_directory, current[:3])
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, current[3:]), "w", encoding="ascii", newline="") as handle:
+            handle.write("".join(lines))
+
+    for digest, count in records:
+        hex_digest = digest.hex().upper()
+        prefix = hex_digest[:PREFIX_LENGTH]
+        if prefix != current:
+            if lines:
+                flush()
+                partitions += 1
+            current, lines = prefix, []
+        lines.append("%s:%d\r\n" % (hex_digest[PREFIX_LENGTH:], count))
+        written += 1
+    if lines:
+        flush()
+        partitions += 1
+
+    manifest = {"records": written, "partitions": partitions, "prefix_length": PREFIX_LENGTH,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+    with open(os.path.join(tmp_directory, MANIFEST), "w") as handle:
+        json.dump(manifest, handle)
+
+    # Swap the complete tree into place
+    old_directory = directory + ".old"
+    if os.path.exists(directory):
+        if os.path.exists(old_directory):
+            shutil.rmtree(old_directory)
+        os.rename(directory, old_directory)
+    os.rename(tmp_directory, directory)
+    if os.path.exists(old_directory):
+        shutil.rmtree(old_directory)
+    return manifest
+
+
+# Function to write the partitions of an existing breach index
+def build_partitions(index_path, directory):
+    with BreachIndex(index_path, use_filter=False) as index:
+        return write_partitions(index.records(), directory)
+
+
+class PartitionStore:
+    # Serve partitions from directory, keeping up to cache_bytes of them in memory
+    def __init__(self, directory, cache_bytes=DEFAULT_CACHE_MB << 20):
+        self.directory = os.fspath(directory)
+        try:
+            with open(os.path.join(self.directory, MANIFEST)) as handle:
+                self.manifest = json.load(handle)
+        except FileNotFoundError:
+            raise ValueError("%s has no %s; write partitions with --from-index" % (self.directory, MANIFEST)) from None
+        if self.manifest.get("prefix_length") != PREFIX_LENGTH:
+            raise ValueError("%s holds %s-digit partitions, expected %d"
+                             % (self.directory, self.manifest.get("prefix_length"), PREFIX_LENGTH))
+        self.cache_bytes = cache_bytes
+        # prefix -> body, least recently used first
+        self._cache = collections.OrderedDict()
+        self._cached_bytes = 0
+
+    # Function to get the response body for a prefix (uppercase hex)
+    def get(self, prefix):
+        body = self._cache.get(prefix)
+        if body is not None:
+            self._cache.move_to_end(prefix)
+            return body
+        try:
+            with open(partition_path(self.directory, prefix), "rb") as handle:
+                body = handle.read()
+        except FileNotFoundError:
+            body = b""
+        self._cache[prefix] = body
+        self._cached_bytes += len(body)
+        while self._cached_bytes > self.cache_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+        return body
+
+
+class RangeServer:
+    def __init__(self, directory, cache_bytes=DEFAULT_CACHE_MB << 20):
+        self.store = PartitionStore(directory, cache_bytes)
+        self._server = None
+
+    # Function to start listening
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self._server = await asyncio.start_server(self._handle_connection, host, port, limit=MAX_HEADER_BYTES)
+        return self._server
+
+    # Function to stop listening
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    # Function to answer one request; returns (status, body)
+    def dispatch(self, method, path):
+        if path == "/health":
+            return 200, json.dumps({"status": "ok", "records": self.store.manifest["records"]}).encode("ascii")
+        if not path.startswith(RANGE_PATH):
+            return 404, b"not found"
+        if method != "GET":
+            return 405, b"use GET"
+        prefix = path[len(RANGE_PATH):].upper()
+        if len(prefix) != PREFIX_LENGTH or not _HEX_UPPER.issuperset(prefix):
+            return 400, b"the range prefix must be 5 hex digits"
+        return 200, self.store.get(prefix)
+
+    # Function to serve requests on one connection until it closes or idles out
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 413, b"headers too large", False)
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, path, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, b"malformed request line", False)
+                    break
+                connection = ""
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name.strip().lower() == "connection":
+                        connection = value.strip().lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                try:
+                    status, body = self.dispatch(method, path.split("?", 1)[0])
+                except Exception as error:
+                    status, body = 500, ("%s: %s" % (type(error).__name__, error)).encode("utf-8")
+                if metrics.enabled:
+                    metrics.count("range_requests_total", status=status)
+                await self._respond(writer, status, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    # Function to write a plain-text response
+    async def _respond(self, writer, status, body, keep_alive):
+        head = "\r\n".join(("HTTP/1.1 %d %s" % (status, REASONS.get(status, "Error")),
+                            "Content-Type: text/plain",
+                            "Content-Length: %d" % len(body),
+                            "Connection: %s" % ("keep-alive" if keep_alive else "close")))
+        writer.write(head.encode("latin-1") + b"\r\n\r\n" + body)
+        await writer.drain()
+
+
+# Function to run the range server until interrupted or terminated
+async def serve(directory, host="127.0.0.1", port=DEFAULT_PORT, cache_bytes=DEFAULT_CACHE_MB << 20):
+    server = RangeServer(directory, cache_bytes)
+    await server.start(host, port)
+    print("Serving %d breach records from %s on http://%s:%d"
+          % (server.store.manifest["records"], directory, host, port), file=sys.stderr)
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stopped.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    try:
+        await stopped.wait()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve breach corpus prefix ranges (k-anonymity lookups).")
+    parser.add_argument("directory", help="partition directory")
+    parser.add_argument("--from-index", default=None, help="breach index to write the partitions from first")
+    parser.add_argument("--build-only", action="store_true", help="write the partitions and exit")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cache-mb", type=float, default=DEFAULT_CACHE_MB, help="memory for recently served partitions")
+    parser.add_argument("--metrics-port", type=int, default=None, help="serve request counts as Prometheus text on this port")
+    args = parser.parse_args(argv)
+
+    if args.from_index:
+        started = time.perf_counter()
+        manifest = build_partitions(args.from_index, args.directory)
+        print("Wrote %d records in %d partitions to %s in %.1fs" % (
+            manifest["records"], manifest["partitions"], args.directory, time.perf_counter() - started))
+    if args.build_only:
+        return 0
+    if args.metrics_port:
+        metrics.configure_metrics(port=args.metrics_port)
+    try:
+        asyncio.run(serve(args.directory, args.host, args.port, int(args.cache_mb * (1 << 20))))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
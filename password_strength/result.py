@@ -0,0 +1,215 @@
+# Compact evaluation results.
+#
+# evaluate_password_strength returns nested dicts that repeat the same
+# descriptions, colors and suggestions for every password. A PasswordResult
+# keeps only what differs between passwords (criteria bitmask, score, level
+# index, guess count and any banned terms found) and resolves the text
+# from the shared tables in engine.py when it is read (or from its policy's
+# tables, for results scored against a policy). ResultColumns stores many
+# results as parallel arrays, about 18 bytes per password.
+#
+# Both read like the dict form: result["strength_level"]["name"] works, and
+# to_dict() gives exactly what evaluate_password_strength returns.
+from array import array
+
+from . import metrics
+from .banned import get_banned_matcher
+from .engine import (
+    CRITERIA,
+    DESCRIBED_ATTACK,
+    NO_COMMON,
+    STRENGTH_LEVELS,
+    analyze_password,
+    banned_suggestion,
+    strength_description,
+    strength_level_index,
+    strength_percentage,
+)
+from .estimator import crack_times, most_guessable_sequence
+
+# (bit, key, description, suggestion) for every criterion
+_CRITERIA_BITS = tuple((1 << index, key, description, suggestion)
+                       for index, (key, description, suggestion) in enumerate(CRITERIA))
+_CRITERIA_INDEX = {key: bit for bit, key, _, _ in _CRITERIA_BITS}
+
+
+class PasswordResult:
+    __slots__ = ("criteria_mask", "strength_percentage", "level_index", "guesses_log10", "banned_terms", "policy")
+
+    # Keys of the dict form, readable as result[key]
+    KEYS = ("criteria", "strength_percentage", "strength_level", "guesses_log10", "crack_times", "suggestions")
+
+    def __init__(self, criteria_mask, strength_percentage, level_index, guesses_log10, banned_terms=None,
+                 policy=None):
+        self.criteria_mask = criteria_mask
+        self.strength_percentage = strength_percentage
+        self.level_index = level_index
+        self.guesses_log10 = guesses_log10
+        # Up to three banned terms found, or None
+        self.banned_terms = banned_terms
+        # CompiledPolicy scored against, or None for the built-in rules
+        self.policy = policy
+
+    # (bit, key, description, suggestion) of the criteria scored
+    @property
+    def _criteria(self):
+        return _CRITERIA_BITS if self.policy is None else self.policy.criteria
+
+    @property
+    def level_name(self):
+        levels = STRENGTH_LEVELS if self.policy is None else self.policy.levels
+        return levels[self.level_index][1]
+
+    @property
+    def level_color(self):
+        levels = STRENGTH_LEVELS if self.policy is None else self.policy.levels
+        return levels[self.level_index][2]
+
+    @property
+    def crack_times(self):
+        return crack_times(self.guesses_log10)[1]
+
+    @property
+    def description(self):
+        return strength_description(self.crack_times[DESCRIBED_ATTACK])
+
+    @property
+    def strength_level(self):
+        return {"name": self.level_name, "color": self.level_color, "description": self.description}
+
+    # Function to tell whether one criterion, by key, is met
+    def met(self, key):
+        index = _CRITERIA_INDEX if self.policy is None else self.policy.criteria_index
+        return bool(self.criteria_mask & index[key])
+
+    # Function to list the keys of the criteria not met
+    def failed_criteria(self):
+        return [key for bit, key, _, _ in self._criteria if not self.criteria_mask & bit]
+
+    @property
+    def criteria(self):
+        return {key: {"met": bool(self.criteria_mask & bit), "description": description}
+                for bit, key, description, _ in self._criteria}
+
+    @property
+    def suggestions(self):
+        suggestions = []
+        for bit, _, _, suggestion in self._criteria:
+            if not self.criteria_mask & bit:
+                if bit == NO_COMMON and self.banned_terms:
+                    suggestion = banned_suggestion(self.banned_terms)
+                suggestions.append(suggestion)
+        return suggestions
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __eq__(self, other):
+        if not isinstance(other, PasswordResult):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return "PasswordResult(%s, %.1f%%, 10^%.2f guesses)" % (
+            self.level_name, self.strength_percentage, self.guesses_log10)
+
+    # Function to expand into the dict evaluate_password_strength returns
+    def to_dict(self):
+        return {
+            "criteria": self.criteria,
+            "strength_percentage": self.strength_percentage,
+            "strength_level": self.strength_level,
+            "guesses_log10": self.guesses_log10,
+            "crack_times": self.crack_times,
+            "suggestions": self.suggestions,
+        }
+
+
+# Function to evaluate a password into a compact result
+@metrics.timed("score")
+def evaluate_compact(password):
+    mask, patterned = analyze_password(password)
+    percentage = strength_percentage(mask, len(password), patterned)
+    banned_terms = None
+    if not mask & NO_COMMON:
+        banned_terms = tuple(get_banned_matcher().matches(password)[:3]) or None
+    return PasswordResult(mask, percentage, strength_level_index(percentage),
+                          most_guessable_sequence(password)[0], banned_terms)
+
+
+class ResultColumns:
+    # Start an empty column store for results scored against one policy
+    # (None for the built-in rules)
+    def __init__(self, policy=None):
+        self.policy = policy.result_policy if policy is not None else None
+        self.criteria_mask = array("B")
+        self.strength_percentage = array("d")
+        self.level_index = array("B")
+        self.guesses_log10 = array("d")
+        # Banned terms are rare, so they are kept by row
+        self.banned_terms = {}
+
+    # Function to evaluate passwords straight into a column store
+    @classmethod
+    def from_passwords(cls, passwords, policy=None):
+        columns = cls(policy)
+        evaluate = evaluate_compact if policy is None else policy.evaluate_compact
+        for password in passwords:
+            columns.append(evaluate(password))
+        return columns
+
+    def __len__(self):
+        return len(self.criteria_mask)
+
+    # Function to add one result
+    def append(self, result):
+        if result.policy is not self.policy:
+            raise ValueError("result was scored against a different policy")
+        if result.banned_terms:
+            self.banned_terms[len(self.criteria_mask)] = result.banned_terms
+        self.criteria_mask.append(result.criteria_mask)
+        self.strength_percentage.append(result.strength_percentage)
+        self.level_index.append(result.level_index)
+        self.guesses_log10.append(result.guesses_log10)
+
+    # Function to add many results
+    def extend(self, results):
+        for result in results:
+            self.append(result)
+
+    # Function to read one row back as a PasswordResult
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("result index out of range")
+        return PasswordResult(self.criteria_mask[index], self.strength_percentage[index], self.level_index[index],
+                              self.guesses_log10[index], self.banned_terms.get(index), self.policy)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    # Function to count the results in each strength level
+    def level_counts(self):
+        levels = STRENGTH_LEVELS if self.policy is None else self.policy.levels
+        counts = [0] * len(levels)
+        for level_index in self.level_index:
+            counts[level_index] += 1
+        return dict(zip((name for _, name, _ in levels), counts))
+
+    # Function to count, per criterion key, the results failing it
+    def failed_counts(self):
+        counts = [0] * (1 << len(CRITERIA))
+        for mask in self.criteria_mask:
+            counts[mask] += 1
+        return {key: sum(count for mask, count in enumerate(counts) if not mask & bit)
+                for bit, key, _, _ in (_CRITERIA_BITS if self.policy is None else self.policy.criteria)}
+
+    # Memory held by the columns, in bytes (banned terms excluded)
+    @property
+    def nbytes(self):
+        return sum(column.itemsize * len(column) for column in (
+            self.criteria_mask, self.strength_percentage, self.level_index, self.guesses_log10))
@@ -0,0 +1,453 @@
+# Local JSON-over-HTTP scoring service.
+#
+# A small HTTP/1.1 server on asyncio streams (standard library only) with
+# persistent keep-alive connections. Scoring is CPU-bound, so it runs in a
+# pool of worker processes; single-password requests arriving within a few
+# milliseconds of each other are coalesced into one batch per pool task,
+# which keeps per-request overhead low at high request rates. The number
+# of passwords queued or in flight is capped: past the cap, requests get
+# 503 with Retry-After instead of piling up in memory.
+#
+# Evaluations may name a password policy (see policy.py); policies are
+# loaded from --policies in the server and in every worker, and each
+# process picks up changed policy files on its own.
+#
+#     python -m password_strength.service --port 8080 --policies policies/
+#
+#     POST /evaluate        {"password": "...", "policy": "tenant-a"}  ("policy" is optional)
+#     POST /evaluate/batch  {"passwords": ["...", ...], "policy": "tenant-a"}
+#     POST /breach          {"password": "..."}
+#     POST /generate        {"count": 5, "length": 16} or {"passphrase": true, "words": 6}
+#     POST /profile         {"captures": 5, "rate": 0.1}  (sampled cProfile captures of worker batches)
+#     GET  /health
+#     GET  /metrics         Prometheus text (recorded with --metrics)
+#
+# Passwords longer than MAX_PASSWORD_LENGTH and oversized /generate
+# requests get 413.
+#
+# With --metrics, workers return what they recorded with each batch and
+# the server merges it, so /metrics covers the whole pool.
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from . import metrics
+from .audit import _init_worker as _configure_worker
+from .cache import breach_cached, evaluate_cached
+from .engine import evaluate_password_strength
+from .generator import generate_passwords
+from .passphrase import generate_passphrases
+from .policy import configure_policies, get_policy
+
+DEFAULT_PORT = 8080
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_BATCH_DELAY = 0.002
+DEFAULT_MAX_PENDING = 20000
+MAX_BATCH_PASSWORDS = 10000
+MAX_PASSWORD_LENGTH = 1024
+# /generate runs on a thread of the event loop's default executor, and
+# each request is held to a small amount of work: count * length
+# characters, or count * words words
+MAX_GENERATE = 1000
+MAX_GENERATE_LENGTH = 256
+MAX_GENERATE_WORDS = 32
+# Passphrase separators /generate accepts; every new combination of
+# settings scans the whole word list once, so clients pick from a few
+GENERATE_SEPARATORS = ("-", "_", ".", " ", "+", "=", ":", "/", ",", "~")
+MAX_GENERATE_TOTAL = 20000
+MAX_BODY_BYTES = 1 << 20
+MAX_HEADER_BYTES = 16384
+IDLE_TIMEOUT = 15.0
+
+ROUTES = ("/evaluate", "/evaluate/batch", "/breach", "/generate", "/profile")
+# Routes counted by name in requests_total; anything else counts as "other"
+COUNTED_ROUTES = ROUTES + ("/health", "/metrics")
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Function to set up a worker process and load its dictionaries and policies up front
+def _init_worker(breach_index, banned_terms, policies, record_metrics):
+    _configure_worker(breach_index, banned_terms, record_metrics)
+    if policies:
+        configure_policies(policies)
+    evaluate_password_strength("warm-up")
+    metrics.reset()
+
+
+# Function to run one batch of an operation inside a worker, returning the
+# results and the metrics recorded; repeated passwords are answered from
+# the worker's result cache. profile_dir asks for a cProfile capture.
+def _run_batch(operation, passwords, policy=None, profile_dir=None):
+    if profile_dir:
+        metrics.request_profiles(1, 1.0, profile_dir)
+    with metrics.stage("service." + operation, sample=True):
+        if operation == "evaluate":
+            results = [evaluate_cached(password, policy).to_dict() for password in passwords]
+        else:
+            results = []
+            for password in passwords:
+                breached, count = breach_cached(password)
+                results.append({"breached": breached, "count": count})
+    if metrics.enabled:
+        metrics.count("passwords_total", len(passwords), source="service")
+    return results, metrics.drain()
+
+
+# Function to read a password field from a request body
+def _password(body, key="password"):
+    value = body.get(key)
+    if not isinstance(value, str):
+        raise HTTPError(400, "%r must be a string" % key)
+    if len(value) > MAX_PASSWORD_LENGTH:
+        raise HTTPError(413, "%r is longer than %d characters" % (key, MAX_PASSWORD_LENGTH))
+    return value
+
+
+# Function to check an optional integer option of /generate against its
+# limit; returns the value, or default when it is not given
+def _generate_size(options, key, default, limit):
+    value = options.get(key, default)
+    if isinstance(value, int) and not isinstance(value, bool) and value > limit:
+        raise HTTPError(413, "%r must be at most %d" % (key, limit))
+    return value
+
+
+# Function to read the optional policy name of a request body
+def _policy(body):
+    name = body.get("policy")
+    if name is None:
+        return None
+    if not isinstance(name, str):
+        raise HTTPError(400, "'policy' must be a string")
+    try:
+        get_policy(name)
+    except ValueError as error:
+        raise HTTPError(400, str(error)) from None
+    return name
+
+
+class ScoringService:
+    # Set up the worker pool and batching limits; call start() to listen
+    def __init__(self, workers=None, batch_size=DEFAULT_BATCH_SIZE, batch_delay=DEFAULT_BATCH_DELAY,
+                 max_pending=DEFAULT_MAX_PENDING, breach_index=None, banned_terms=None, policies=None,
+                 record_metrics=False):
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.max_pending = max_pending
+        self.pending = 0
+        if policies:
+            configure_policies(policies)
+        if record_metrics:
+            metrics.configure_metrics()
+        # Workers are started on demand; forked from the server they would
+        # inherit its client sockets and keep closed connections open
+        context = None
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=_init_worker,
+                                         initargs=(breach_index, banned_terms, policies, metrics.enabled))
+        # Queued (password, future) pairs and flush timers, by (operation, policy)
+        self._queues = {}
+        self._timers = {}
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self._server = await asyncio.start_server(self._handle_connection, host, port, limit=MAX_HEADER_BYTES)
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    # Function to reserve room for passwords, or refuse when the pool is saturated
+    def _admit(self, count):
+        if self.pending + count > self.max_pending:
+            raise HTTPError(503, "overloaded, retry shortly")
+        self.pending += count
+
+    # Function to queue one password for the next coalesced batch of its
+    # operation and policy
+    async def submit(self, operation, password, policy=None):
+        self._admit(1)
+        future = asyncio.get_running_loop().create_future()
+        key = (operation, policy)
+        queue = self._queues.setdefault(key, [])
+        queue.append((password, future))
+        if len(queue) >= self.batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.get_running_loop().call_later(self.batch_delay, self._flush, key)
+        return await future
+
+    # Function to send the queued passwords of an operation and policy to the pool
+    def _flush(self, key):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        queue = self._queues.pop(key, None)
+        if not queue:
+            return
+        operation, policy = key
+        passwords = [password for password, _ in queue]
+        futures = [future for _, future in queue]
+        try:
+            task = asyncio.get_running_loop().run_in_executor(self._pool, _run_batch, operation, passwords, policy,
+                                                              metrics.take_profile_sample())
+        except Exception as error:
+            # A broken or shut-down pool refuses the batch; often called from
+            # a timer, so fail the waiting requests here or none would return
+            self.pending -= len(futures)
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        task.add_done_callback(lambda done: self._resolve(done, futures))
+
+    # Function to hand a finished batch's results back to the waiting requests
+    def _resolve(self, done, futures):
+        self.pending -= len(futures)
+        error = done.exception()
+        if error is None:
+            results, recorded = done.result()
+            metrics.merge(recorded)
+        for index, future in enumerate(futures):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[index])
+
+    # Function to score a whole batch request, split across the workers
+    async def evaluate_batch(self, passwords, policy=None):
+        self._admit(len(passwords))
+        loop = asyncio.get_running_loop()
+        size = max(self.batch_size, -(-len(passwords) // self.workers))
+        try:
+            parts = await asyncio.gather(*(
+                loop.run_in_executor(self._pool, _run_batch, "evaluate", passwords[start:start + size], policy,
+                                     metrics.take_profile_sample())
+                for start in range(0, len(passwords), size)))
+        finally:
+            self.pending -= len(passwords)
+        for _, recorded in parts:
+            metrics.merge(recorded)
+        return [result for part, _ in parts for result in part]
+
+    # Function to route one request to its handler
+    async def dispatch(self, method, path, body):
+        if path == "/health":
+            return {"status": "ok", "workers": self.workers, "pending": self.pending}
+        if path == "/metrics":
+            return metrics.render_metrics()
+        if path not in ROUTES:
+            raise HTTPError(404, "not found")
+        if method != "POST":
+            raise HTTPError(405, "use POST")
+        if path == "/evaluate":
+            return await self.submit("evaluate", _password(body), _policy(body))
+        if path == "/breach":
+            return await self.submit("breach", _password(body))
+        if path == "/evaluate/batch":
+            passwords = body.get("passwords")
+            if not isinstance(passwords, list) or not all(isinstance(password, str) for password in passwords):
+                raise HTTPError(400, "'passwords' must be a list of strings")
+            if len(passwords) > MAX_BATCH_PASSWORDS:
+                raise HTTPError(413, "at most %d passwords per batch" % MAX_BATCH_PASSWORDS)
+            if any(len(password) > MAX_PASSWORD_LENGTH for password in passwords):
+                raise HTTPError(413, "passwords must be at most %d characters" % MAX_PASSWORD_LENGTH)
+            return {"results": await self.evaluate_batch(passwords, _policy(body))}
+        if path == "/profile":
+            return self.request_profiles(body)
+        return {"passwords": await self.generate(body)}
+
+    # Function to request cProfile captures of the next sampled worker batches
+    def request_profiles(self, body):
+        captures = body.get("captures", 1)
+        rate = body.get("rate", 1.0)
+        if not isinstance(captures, int) or isinstance(rate, bool) or not isinstance(rate, (int, float)):
+            raise HTTPError(400, "'captures' must be an integer and 'rate' a number")
+        try:
+            return {"directory": metrics.request_profiles(captures, rate)}
+        except ValueError as error:
+            raise HTTPError(400, str(error)) from None
+
+    # Function to generate passwords or passphrases off the event loop; the
+    # passphrase settings check scans the word list in Python
+    async def generate(self, body):
+        options = dict(body)
+        count = options.pop("count", 1)
+        if not isinstance(count, int) or not 1 <= count <= MAX_GENERATE:
+            raise HTTPError(400, "'count' must be between 1 and %d" % MAX_GENERATE)
+        try:
+            if options.pop("passphrase", False):
+                allowed = ("words", "separator", "capitalize", "digits", "unique")
+                generator = generate_passphrases
+                size_key, size = "words", _generate_size(options, "words", 6, MAX_GENERATE_WORDS)
+                if options.get("separator", "-") not in GENERATE_SEPARATORS:
+                    raise HTTPError(400, "'separator' must be one of %s" % ", ".join(map(repr, GENERATE_SEPARATORS)))
+            else:
+                allowed = ("length", "include_uppercase", "include_lowercase", "include_numbers",
+                           "include_special", "unique")
+                generator = generate_passwords
+                size_key, size = "length", _generate_size(options, "length", 12, MAX_GENERATE_LENGTH)
+            unknown = set(options) - set(allowed)
+            if unknown:
+                raise HTTPError(400, "unknown option %r" % sorted(unknown)[0])
+            if isinstance(size, int) and count * size > MAX_GENERATE_TOTAL:
+                raise HTTPError(413, "'count' times %r must be at most %d" % (size_key, MAX_GENERATE_TOTAL))
+            return await asyncio.get_running_loop().run_in_executor(
+                None, lambda: list(generator(count, **options)))
+        except (TypeError, ValueError) as error:
+            raise HTTPError(400, str(error)) from None
+
+    # Function to serve requests on one connection until it closes or idles out
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 413, {"error": "headers too large"}, False)
+                    break
+
+                keep_alive, status, payload = await self._handle_request(reader, head)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            # Cancelled when the service shuts down with idle connections open
+            pass
+        finally:
+            writer.close()
+
+    # Function to parse and answer one request; returns (keep-alive, status, payload)
+    async def _handle_request(self, reader, head):
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, path, version = lines[0].split(" ", 2)
+        except ValueError:
+            return False, 400, {"error": "malformed request line"}
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name:
+                headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+        if "transfer-encoding" in headers:
+            return False, 411, {"error": "send a Content-Length body"}
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            return False, 400, {"error": "bad Content-Length"}
+        if length > MAX_BODY_BYTES:
+            return False, 413, {"error": "body too large"}
+        body = {}
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except asyncio.IncompleteReadError:
+                return False, 400, {"error": "truncated body"}
+            except ValueError:
+                return keep_alive, 400, {"error": "body must be JSON"}
+            if not isinstance(body, dict):
+                return keep_alive, 400, {"error": "body must be a JSON object"}
+
+        route = path.split("?", 1)[0]
+        with metrics.stage("request"):
+            try:
+                status, payload = 200, await self.dispatch(method, route, body)
+            except HTTPError as error:
+                status, payload = error.status, {"error": str(error)}
+            except Exception as error:
+                status, payload = 500, {"error": "%s: %s" % (type(error).__name__, error)}
+        if metrics.enabled:
+            metrics.count("requests_total", route=route if route in COUNTED_ROUTES else "other", status=status)
+        return keep_alive, status, payload
+
+    # Function to write a JSON response (or a text one, for /metrics)
+    async def _respond(self, writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            data, content_type = payload.encode("utf-8"), metrics.CONTENT_TYPE
+        else:
+            data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        head = ["HTTP/1.1 %d %s" % (status, REASONS.get(status, "Error")),
+                "Content-Type: %s" % content_type,
+                "Content-Length: %d" % len(data),
+                "Connection: %s" % ("keep-alive" if keep_alive else "close")]
+        if status == 503:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+        await writer.drain()
+
+
+# Function to run the service until interrupted or terminated
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, **options):
+    service = ScoringService(**options)
+    await service.start(host, port)
+    print("Serving on http://%s:%d with %d worker%s" % (
+        host, port, service.workers, "" if service.workers == 1 else "s"), file=sys.stderr)
+    # SIGTERM stops the server like Ctrl+C, so the worker processes are shut down too
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stopped.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    try:
+        await stopped.wait()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve password scoring over JSON HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="single-password requests coalesced into one pool task")
+    parser.add_argument("--batch-delay-ms", type=float, default=DEFAULT_BATCH_DELAY * 1000,
+                        help="longest a request waits for its batch to fill")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                        help="passwords queued or in flight before requests get 503")
+    parser.add_argument("--breach-index", default=None, help="breach index or range server URL to check against")
+    parser.add_argument("--banned-terms", default=None, help="file of extra banned terms")
+    parser.add_argument("--policies", default=None, help="password policy file or directory of them")
+    parser.add_argument("--metrics", action="store_true", help="record stage timings and counters for GET /metrics")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers, batch_size=args.batch_size,
+                          batch_delay=args.batch_delay_ms / 1000, max_pending=args.max_pending,
+                          breach_index=args.breach_index, banned_terms=args.banned_terms,
+                          policies=args.policies, record_metrics=args.metrics))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
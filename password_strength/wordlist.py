@@ -0,0 +1,219 @@
+# Memory-mapped word lists for passphrase generation.
+#
+# A compiled list is one file: a header, an array of count + 1
+# little-endian uint64 offsets, then every word's UTF-8 bytes packed back
+# to back. Word i is blob[offsets[i]:offsets[i + 1]], so picking a word is
+# two integer reads and one slice of the map, whatever the size of the
+# list, and the list itself never becomes Python objects.
+#
+# Plain text lists (one word per line, "#" comments, and the dice-roll
+# column of EFF-style lists ignored) are compiled to "<list>.wl" on first
+# use and recompiled when the source changes; when the list's directory is
+# read-only, the compiled copy goes to a cache directory only the current
+# user can write to, since its words are trusted. The built-in default is the
+# small list in data/english.txt; point PASSWORD_WORDLIST (or
+# configure_wordlist) at a real diceware list such as the EFF large list.
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+
+from .banned import read_terms
+
+MAGIC = b"PSWORDS1"
+# Magic, word count, SHA-256 of the source list
+HEADER = struct.Struct(">8sQ32s")
+OFFSET = struct.Struct("<Q")
+OFFSET_PAIR = struct.Struct("<2Q")
+COMPILED_SUFFIX = ".wl"
+
+# Environment variable naming the word list to use for passphrases
+WORDLIST_ENV = "PASSWORD_WORDLIST"
+DEFAULT_WORDLIST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "english.txt")
+CACHE_DIR_NAME = "password-strength"
+
+
+# Function to read the words of a plain text list, skipping dice-roll numbers
+def read_words(path):
+    for line in read_terms(path):
+        fields = line.split()
+        if len(fields) > 1 and fields[0].isdigit():
+            fields = fields[1:]
+        yield " ".join(fields)
+
+
+# Function to hash a source file the way compiled lists record it
+def source_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+class Wordlist:
+    # Open a compiled list read-only
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._map = None
+        self._offsets = None
+        self._file = open(self.path, "rb")
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError("%s is not a compiled word list (file too small)" % self.path)
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self._count, self.source_digest = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError("%s is not a compiled word list (bad magic)" % self.path)
+            self._blob = HEADER.size + (self._count + 1) * OFFSET.size
+            if self._blob > size or self._blob + OFFSET.unpack_from(self._map, self._blob - OFFSET.size)[0] > size:
+                raise ValueError("%s is truncated" % self.path)
+            # Offsets are read straight from the map on little-endian hosts
+            self._offsets = None
+            if sys.byteorder == "little":
+                self._offsets = memoryview(self._map)[HEADER.size:self._blob].cast("Q")
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self):
+        return self._count
+
+    # Function to read one word in O(1)
+    def __getitem__(self, index):
+        if not 0 <= index < self._count:
+            raise IndexError("word index out of range")
+        start, end = OFFSET_PAIR.unpack_from(self._map, HEADER.size + index * OFFSET.size)
+        return self._map[self._blob + start:self._blob + end].decode("utf-8")
+
+    # Function to read many words at once as UTF-8 bytes, for bulk generation
+    def raw_words(self, indexes):
+        data = self._map
+        blob = self._blob
+        offsets = self._offsets
+        if offsets is None:
+            pairs = (OFFSET_PAIR.unpack_from(data, HEADER.size + index * OFFSET.size) for index in indexes)
+            return [data[blob + start:blob + end] for start, end in pairs]
+        return [data[blob + offsets[index]:blob + offsets[index + 1]] for index in indexes]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._offsets is not None:
+            self._offsets.release()
+            self._offsets = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+# Function to compile words into a list file; duplicates keep their first
+# position, since a repeated word would make the entropy figure a lie
+def write_wordlist(words, path, digest=b"\0" * 32):
+    path = os.fspath(path)
+    offsets = array("Q", [0])
+    blob = bytearray()
+    seen = set()
+    for word in words:
+        if word and word not in seen:
+            seen.add(word)
+            blob += word.encode("utf-8")
+            offsets.append(len(blob))
+    if len(offsets) < 2:
+        raise ValueError("word list is empty")
+    if array("Q", [1]).tobytes() != OFFSET.pack(1):
+        offsets.byteswap()
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(HEADER.pack(MAGIC, len(offsets) - 1, digest))
+        handle.write(offsets.tobytes())
+        handle.write(blob)
+    os.replace(tmp_path, path)
+    return len(offsets) - 1
+
+
+# Function to get the per-user cache directory for compiled lists, creating
+# it private; refuses one that other users could write to
+def _private_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    directory = os.path.join(base, CACHE_DIR_NAME)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if hasattr(os, "getuid"):
+        info = os.stat(directory)
+        if info.st_uid != os.getuid() or info.st_mode & 0o022:
+            raise PermissionError("%s is writable by other users; not caching word lists there" % directory)
+    return directory
+
+
+# Function to open a compiled list if it was built from the given source digest
+def _open_compiled(path, digest):
+    try:
+        wordlist = Wordlist(path)
+    except (OSError, ValueError):
+        return None
+    if wordlist.source_digest == digest:
+        return wordlist
+    wordlist.close()
+    return None
+
+
+# Function to open a word list, compiling a plain text list if needed
+def open_wordlist(path):
+    path = os.fspath(path)
+    with open(path, "rb") as handle:
+        if handle.read(len(MAGIC)) == MAGIC:
+            return Wordlist(path)
+
+    digest = source_digest(path)
+    compiled_path = path + COMPILED_SUFFIX
+    wordlist = _open_compiled(compiled_path, digest)
+    if wordlist is not None:
+        return wordlist
+    try:
+        write_wordlist(read_words(path), compiled_path, digest)
+    except OSError:
+        # Read-only install: use the per-user cache instead
+        compiled_path = os.path.join(_private_cache_dir(), "%s%s" % (digest.hex(), COMPILED_SUFFIX))
+        wordlist = _open_compiled(compiled_path, digest)
+        if wordlist is not None:
+            return wordlist
+        write_wordlist(read_words(path), compiled_path, digest)
+    return Wordlist(compiled_path)
+
+
+_wordlist = None
+# Guards swapping and closing the active list (reentrant, as get_wordlist
+# configures the default list while holding it)
+_wordlist_lock = threading.RLock()
+
+
+# Function to choose the word list used for passphrases; the previous list
+# is closed, so its map and file are not leaked
+def configure_wordlist(path=None):
+    global _wordlist
+    # Opened first, so a list that fails to open leaves the active one in place
+    wordlist = open_wordlist(path or DEFAULT_WORDLIST)
+    with _wordlist_lock:
+        previous, _wordlist = _wordlist, wordlist
+        if previous is not None:
+            previous.close()
+    return wordlist
+
+
+# Function to get the active word list
+def get_wordlist():
+    if _wordlist is None:
+        with _wordlist_lock:
+            if _wordlist is None:
+                configure_wordlist(os.environ.get(WORDLIST_ENV) or None)
+    return _wordlist
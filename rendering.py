@@ -0,0 +1,353 @@
+# HTML rendering for the Streamlit app.
+#
+# Every block the app shows is built here as one HTML string from templates
+# defined once at import, so a rerun sends one element per block instead
+# of one st.markdown call per line. Imported modules outlive Streamlit
+# reruns, so none of this is rebuilt per rerun or per session. No Streamlit
+# import: the markup can be built and timed without a running server.
+import html
+
+from password_strength import ATTACK_MODELS, metrics
+from password_strength.engine import CRITERIA, DESCRIBED_ATTACK, STRENGTH_LEVELS, strength_description
+
+# Page styles, sent as a single element
+VIP_CSS = """<style>
+/* Main styling */
+.main {
+    background: linear-gradient(135deg, #0a192f, #172a45);
+    color: white;
+    padding: 20px;
+}
+
+/* VIP container */
+.vip-container {
+    border: 3px solid #64ffda;
+    border-radius: 15px;
+    padding: 20px;
+    background: rgba(10, 25, 47, 0.7);
+    box-shadow: 0 0 20px rgba(100, 255, 218, 0.5);
+    margin-bottom: 20px;
+    animation: border-glow 2s infinite;
+}
+
+/* Header styling */
+.vip-header {
+    text-align: center;
+    color: #64ffda;
+    font-size: 2.5rem;
+    font-weight: bold;
+    text-shadow: 0 0 10px rgba(100, 255, 218, 0.7);
+    margin-bottom: 20px;
+}
+
+/* Strength meter */
+.strength-meter {
+    height: 20px;
+    border-radius: 10px;
+    margin: 20px 0;
+    background: rgba(255, 255, 255, 0.1);
+    overflow: hidden;
+    box-shadow: inset 0 0 5px rgba(0, 0, 0, 0.2);
+}
+
+.strength-fill {
+    height: 100%;
+    border-radius: 10px;
+    transition: width 0.5s ease, background 0.5s ease;
+}
+
+/* Strength label */
+.strength-label {
+    text-align: center;
+    font-size: 1.5rem;
+    font-weight: bold;
+    margin: 10px 0;
+    text-shadow: 0 0 5px rgba(0, 0, 0, 0.5);
+}
+
+/* Criteria styling */
+.criteria-container {
+    display: flex;
+    flex-wrap: wrap;
+    justify-content: space-between;
+    margin-top: 20px;
+}
+
+.criteria-item {
+    background: rgba(0, 0, 0, 0.2);
+    border-radius: 10px;
+    padding: 10px;
+    margin: 5px;
+    flex: 1 1 200px;
+    border-left: 4px solid var(--criteria-color, gray);
+}
+
+.criteria-met {
+    --criteria-color: #00cc00;
+}
+
+.criteria-not-met {
+    --criteria-color: #ff3333;
+}
+
+/* Suggestions styling */
+.suggestions {
+    background: rgba(0, 0, 0, 0.2);
+    border-radius: 10px;
+    padding: 15px;
+    margin-top: 20px;
+    border-left: 4px solid #8892b0;
+}
+
+/* Card styling */
+.card {
+    background: rgba(10, 25, 47, 0.7);
+    border-radius: 10px;
+    padding: 15px;
+    margin: 10px 0;
+    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+}
+
+/* Footer styling */
+.footer {
+    text-align: center;
+    margin-top: 30px;
+    font-size: 0.8rem;
+    color: #64ffda;
+    background-color: #0a192f;
+    padding: 15px;
+    border-radius: 10px;
+}
+
+/* Animation for the border */
+@keyframes border-glow {
+    0% { box-shadow: 0 0 10px rgba(100, 255, 218, 0.5); }
+    50% { box-shadow: 0 0 20px rgba(100, 255, 218, 0.8); }
+    100% { box-shadow: 0 0 10px rgba(100, 255, 218, 0.5); }
+}
+
+/* Section navigation, drawn as tabs */
+.stRadio [role="radiogroup"] {
+    gap: 10px;
+}
+
+.stRadio [role="radiogroup"] > label {
+    background-color: rgba(10, 25, 47, 0.7);
+    border-radius: 10px 10px 0 0;
+    padding: 10px 20px;
+    color: white;
+}
+
+.stRadio [role="radiogroup"] > label:has(input:checked) {
+    background-color: #64ffda !important;
+    color: #0a192f !important;
+}
+
+/* Button styling */
+.stButton > button {
+    background: linear-gradient(45deg, #0a192f, #8892b0);
+    color: #64ffda;
+    border: none;
+    border-radius: 10px;
+    padding: 10px 20px;
+    font-weight: bold;
+    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+}
+
+.stButton > button:hover {
+    transform: translateY(-2px);
+    box-shadow: 0 6px 8px rgba(0, 0, 0, 0.2);
+}
+
+/* Password input styling */
+.stTextInput > div > div > input {
+    background-color: rgba(255, 255, 255, 0.1);
+    color: white;
+    border: 2px solid rgba(100, 255, 218, 0.5);
+    border-radius: 10px;
+    padding: 10px;
+    font-size: 1.2rem;
+}
+
+.stTextInput > div > div > input:focus {
+    border-color: #64ffda;
+    box-shadow: 0 0 10px rgba(100, 255, 218, 0.3);
+}
+
+/* History table styling */
+.history-table {
+    width: 100%;
+    border-collapse: collapse;
+}
+
+.history-table th, .history-table td {
+    padding: 10px;
+    text-align: left;
+    border-bottom: 1px solid rgba(255, 255, 255, 0.1);
+}
+
+.history-table th {
+    background-color: rgba(0, 0, 0, 0.2);
+    color: #64ffda;
+}
+
+/* Developer attribution */
+.developer-attribution {
+    text-align: center;
+    padding: 10px;
+    background-color: #0a192f;
+    color: #64ffda;
+    font-weight: bold;
+    margin-bottom: 15px;
+    border-radius: 10px;
+}
+</style>
+"""
+
+# Page header and footer
+HEADER_HTML = (
+    '<div class="developer-attribution">Developed by Atfa Siddiqui</div>'
+    '<div class="vip-container"><h1 class="vip-header">VIP Password Strength Meter</h1>'
+    '<p style="text-align:center; font-size:1.2rem;">Check how strong and secure your password is with our premium strength meter</p></div>'
+)
+FOOTER_HTML = (
+    '<div class="footer">Password Strength Meter © 2025 | Secure your digital life with strong passwords'
+    '<br>Developed by Atfa Siddiqui</div>'
+)
+
+# Checker output before anything is typed
+EMPTY_CHECKER_HTML = (
+    '<div class="strength-meter"><div class="strength-fill" style="width:0%; background:#ccc;"></div></div>'
+    '<div class="strength-label" style="color:#ccc;">Enter a password to check its strength</div>'
+)
+
+CHECKER_TEMPLATE = (
+    '<div class="strength-meter"><div class="strength-fill" style="width:{percentage}%; background:{color};"></div></div>'
+    '<div class="strength-label" style="color:{color};">{name} ({whole_percentage}%)</div>'
+    '<p style="text-align:center;">{description}</p>'
+    '<div class="card"><h3>Estimated Time to Crack</h3>'
+    '<p>About 10<sup>{guesses_log10:.1f}</sup> guesses needed.</p>'
+    '<table style="width:100%;">{crack_rows}</table></div>'
+    '<div class="criteria-container">{criteria}</div>'
+    '{breach}{suggestions}'
+)
+# One row per attack model, with the model description already filled in
+CRACK_ROW_TEMPLATES = tuple(
+    (key, '<tr><td>%s</td><td style="text-align:right;">{}</td></tr>' % html.escape(description))
+    for key, description, _ in ATTACK_MODELS
+)
+CRITERION_MET = '<div class="criteria-item criteria-met"><span style="font-weight:bold;">✓ {}</span></div>'
+CRITERION_NOT_MET = '<div class="criteria-item criteria-not-met"><span style="font-weight:bold;">✗ {}</span></div>'
+BREACHED_TEMPLATE = (
+    '<div class="card" style="border-left: 4px solid #FF0000; margin-top: 20px;">'
+    '<h3>⚠️ Password Breach Alert</h3>'
+    '<p>This password appears to have been found in data breaches.{seen_text} It is not safe to use!</p></div>'
+)
+NOT_BREACHED_HTML = (
+    '<div class="card" style="border-left: 4px solid #00CC00; margin-top: 20px;">'
+    '<h3>✅ No Breaches Found</h3>'
+    '<p>This password does not appear in our breach database. However, always use unique passwords for each account.</p></div>'
+)
+SUGGESTIONS_TEMPLATE = '<div class="suggestions"><h3>Suggestions to improve:</h3>{}</div>'
+SUGGESTION_TEMPLATE = '<p>• {}</p>'
+
+
+# Function to render the whole checker result (meter, crack times, criteria,
+# breach card and suggestions) of a PasswordResult as one HTML fragment
+@metrics.timed("render.checker")
+def checker_html(result, breached, seen_count=None):
+    crack_times = result.crack_times
+    criteria = "".join(
+        (CRITERION_MET if result.met(key) else CRITERION_NOT_MET).format(html.escape(description))
+        for key, description, _ in CRITERIA
+    )
+    if breached:
+        seen_text = " It has been seen {:,} times.".format(seen_count) if seen_count else ""
+        breach = BREACHED_TEMPLATE.format(seen_text=seen_text)
+    else:
+        breach = NOT_BREACHED_HTML
+    suggestions = result.suggestions
+    if suggestions:
+        suggestions = SUGGESTIONS_TEMPLATE.format(
+            "".join(SUGGESTION_TEMPLATE.format(html.escape(suggestion)) for suggestion in suggestions))
+    return CHECKER_TEMPLATE.format(
+        percentage=result.strength_percentage,
+        color=result.level_color,
+        name=result.level_name,
+        whole_percentage=int(result.strength_percentage),
+        description=html.escape(strength_description(crack_times[DESCRIBED_ATTACK])),
+        guesses_log10=result.guesses_log10,
+        crack_rows="".join(template.format(crack_times[key]) for key, template in CRACK_ROW_TEMPLATES),
+        criteria=criteria,
+        breach=breach,
+        suggestions=suggestions or "",
+    )
+
+
+GENERATED_CARD_TEMPLATE = (
+    '<div class="card" style="margin-bottom: 15px;"><h4>Password {number}:</h4>'
+    '<div style="display: flex; align-items: center; justify-content: space-between;">'
+    '<code style="font-size: 1.2rem; padding: 10px; background: rgba(0,0,0,0.1); border-radius: 5px;">{password}</code></div>'
+    '<p>Strength: <span style="color:{color};">{name} ({whole_percentage}%)</span></p>'
+    '<div class="strength-meter"><div class="strength-fill" style="width:{percentage}%; background:{color};"></div></div></div>'
+)
+
+
+# Function to render the generated password cards (with their
+# PasswordResults) as one fragment; generated passwords may contain "<" and
+# "&", so they are escaped
+@metrics.timed("render.generated")
+def generated_cards_html(passwords, results):
+    return "".join(
+        GENERATED_CARD_TEMPLATE.format(
+            number=number,
+            password=html.escape(password),
+            color=result.level_color,
+            name=result.level_name,
+            whole_percentage=int(result.strength_percentage),
+            percentage=result.strength_percentage,
+        )
+        for number, (password, result) in enumerate(zip(passwords, results), 1)
+    )
+
+
+LEVEL_COLORS = {name: color for _, name, color in STRENGTH_LEVELS}
+HISTORY_TEMPLATE = (
+    '<p>Below is a history of passwords you\'ve checked (only showing masked versions for security).</p>'
+    '<table class="history-table"><tr><th>Password (Masked)</th><th>Strength</th><th>Date &amp; Time</th></tr>'
+    '{rows}</table>'
+)
+HISTORY_ROW_TEMPLATE = '<tr><td>{password}</td><td style="color:{color};">{strength}</td><td>{timestamp}</td></tr>'
+
+
+# Function to render the history, newest first, as one complete table
+@metrics.timed("render.history")
+def history_html(entries):
+    return HISTORY_TEMPLATE.format(rows="".join(
+        HISTORY_ROW_TEMPLATE.format(
+            password=html.escape(entry["password"]),
+            color=LEVEL_COLORS.get(entry["strength"], "#FF0000"),
+            strength=html.escape(entry["strength"]),
+            timestamp=entry["timestamp"],
+        )
+        for entry in reversed(entries)
+    ))
+
+
+TIPS = (
+    "Use a different password for each of your important accounts",
+    "Use a password manager to generate and store strong passwords",
+    "Enable two-factor authentication (2FA) whenever possible",
+    "Consider using a passphrase (a sequence of random words) for better security and memorability",
+    "Avoid using personal information in your passwords (birthdays, names, etc.)",
+    "Change your passwords periodically, especially for critical accounts",
+    "Be cautious of phishing attempts asking for your password",
+    "Check if your accounts have been involved in data breaches at haveibeenpwned.com",
+    "Use biometric authentication when available (fingerprint, face recognition)",
+    "Consider using a hardware security key for critical accounts",
+)
+# The tips never change, so their markup is built once per process
+TIPS_HTML = "<h2>Password Security Tips</h2>" + "".join(
+    '<p style="margin: 10px 0; padding: 10px; background: rgba(0,0,0,0.1); border-radius: 5px;">• %s</p>' % tip
+    for tip in TIPS
+)